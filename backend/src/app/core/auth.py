@@ -1,46 +1,28 @@
-from app.core.config import settings
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
-from datetime import datetime, timedelta, UTC
+from app.core.security import pwd_context
+from app.core.tokens import token_service
+from datetime import timedelta
 from app.schemas.token import TokenData
-import jwt
 from fastapi import HTTPException
 from starlette.status import HTTP_401_UNAUTHORIZED
 from jwt import InvalidTokenError
 
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = "RS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
-    to_encode = data.copy()
-    expire = datetime.now(UTC) + (
-        expires_delta if expires_delta else timedelta(minutes=15)
-    )
-
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return token_service.create_access_token(data, expires_delta)
 
 
 def decode_access_token(token: str) -> TokenData:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(payload)
-        username = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=HTTP_401_UNAUTHORIZED, detail="Invalid token"
-            )
-        return TokenData(username=username)
+        payload = token_service.decode(token)
     except InvalidTokenError:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return TokenData(username=payload["sub"])
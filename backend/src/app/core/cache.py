@@ -0,0 +1,193 @@
+import asyncio
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = self._timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+class MemoryBackend:
+    """Read-cache backend kept in this process, backed by :class:`TTLCache`."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 30.0):
+        self.store = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def set(self, key: str, value, ttl: float):
+        self.store.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str):
+        self.store.pop(key)
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+class ExternalBackend:
+    """Read-cache backend on a shared store such as Redis.
+
+    ``client`` needs async ``get(key)``, ``set(key, value, ex=seconds)`` and
+    ``delete(key)``, the subset of ``redis.asyncio.Redis`` used here. Values
+    are pickled, so every worker sees the same entries and invalidations.
+    """
+
+    def __init__(self, client, prefix: str = "waymark:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    async def set(self, key: str, value, ttl: float):
+        await self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def stats(self) -> dict:
+        return {}
+
+
+# Handed to waiters when the load they were sharing was cancelled
+_ABANDONED = object()
+
+
+class ReadCache:
+    """Namespaced read-through cache with single-flight loading.
+
+    Keys live in namespaces such as ``trip:42``. Each namespace carries a
+    random generation token that is part of every key stored under it, so
+    :meth:`invalidate` drops a whole namespace with one write and stale
+    entries simply age out. Concurrent misses for the same key share one
+    loader call instead of all hitting the database.
+    """
+
+    def __init__(self, backend, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def _generation(self, namespace: str) -> str:
+        generation = await self.backend.get(f"gen:{namespace}")
+        if generation is None:
+            generation = await self._new_generation(namespace)
+        return generation
+
+    async def _new_generation(self, namespace: str) -> str:
+        generation = uuid.uuid4().hex[:12]
+        # Outlives the entries it guards; losing it only causes misses
+        await self.backend.set(f"gen:{namespace}", generation, ttl=self.ttl * 10)
+        return generation
+
+    async def get_or_load(self, namespace: str, key: str, loader):
+        """Return the cached value for ``key`` or store the result of ``await loader()``.
+
+        ``None`` results are not cached.
+        """
+        full_key = f"{namespace}:{await self._generation(namespace)}:{key}"
+        value = await self.backend.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        while (pending := self._inflight.get(full_key)) is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(pending)
+            if value is not _ABANDONED:
+                return value
+            # The leader's caller went away; the first waiter back loads instead
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+            if value is not None:
+                await self.backend.set(full_key, value, ttl=self.ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # Only the leader was cancelled; its waiters retry rather than fail
+            future.set_result(_ABANDONED)
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters get the error; retrieve it so an unawaited future stays quiet
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            await self._new_generation(namespace)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "backend": self.backend.stats(),
+        }
@@ -0,0 +1,126 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: pip install "interactive-travel-planner[brotli]"
+    brotli = None
+
+# Sent as they are: already encoded, or read by the client as they arrive
+_EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """Content codings of an Accept-Encoding header with their q-values (RFC 9110 section 12.5.3)."""
+    accepted = {}
+    for entry in header.split(","):
+        coding, *params = (part.strip() for part in entry.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: str, offered: tuple[str, ...]) -> str | None:
+    """The first of ``offered`` the client accepts with a non-zero q, or None for identity."""
+    accepted = accepted_encodings(header)
+    for coding in offered:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class BrotliResponder:
+    """Brotli-encodes one response, leaving small and excluded ones as they are.
+
+    Streamed bodies are compressed chunk by chunk and flushed after each, so
+    every chunk reaches the client right away.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        self.app, self.minimum_size = app, minimum_size
+        self.compressor = brotli.Compressor(quality=quality)
+        self.send: Send | None = None
+        self.initial_message: Message = {}
+        self.started = self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk decides the headers
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith(
+                _EXCLUDED_CONTENT_TYPES
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        if self.started:
+            if not self.passthrough:
+                message["body"] = self.compress(body, more_body)
+            await self.send(message)
+            return
+
+        self.started = True
+        if not self.passthrough and len(body) < self.minimum_size and not more_body:
+            self.passthrough = True
+        if not self.passthrough:
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            headers["Content-Encoding"] = "br"
+            message["body"] = self.compress(body, more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(self.initial_message)
+        await self.send(message)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Brotli when the client accepts it and the module is installed, gzip otherwise.
+
+    Accept-Encoding q-values are honoured, so ``br;q=0`` falls back to gzip
+    and a client refusing both gets the body as it is. Responses smaller
+    than ``minimum_size`` bytes are sent as they are, and streamed bodies
+    are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 4
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+        self.offered = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""), self.offered)
+        if encoding == "br":
+            await BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)(scope, receive, send)
+        elif encoding == "gzip":
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -10,6 +10,86 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     JWT_ALGORITHM: str = Field(default="HS256", alias="JWT_ALGORITHM")
 
+    # Token signing keys. HS256 signs with SECRET_KEY; RS256/EdDSA use the PEM
+    # keys below. JWT_PREVIOUS_KEYS maps retired key ids to verification keys.
+    JWT_KEY_ID: str = "primary"
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    JWT_PREVIOUS_KEYS: dict[str, str] = {}
+    TOKEN_CACHE_SIZE: int = 4096
+
+    # Users allowed to change data shared by everyone, such as exchange rates
+    ADMIN_USERNAMES: list[str] = []
+
+    # Password hashing: bcrypt cost factor and size of the hashing thread pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Authenticated-principal cache used by get_current_user
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+
+    # Response compression (gzip, or brotli when installed) and streamed exports
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSLEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    STREAM_BATCH_SIZE: int = 500
+
+    # Threads running route and schedule solves off the event loop, and the largest
+    # trips they accept; bigger requests are refused with a 422
+    SOLVER_WORKERS: int = 2
+    ROUTE_MAX_STOPS: int = 1000
+    SCHEDULE_MAX_ITEMS: int = 1000
+
+    # Itinerary items of a trip closer together than this are reported as conflicts
+    CONFLICT_ITINERARY_SLOT_MINUTES: int = 30
+
+    # Offline geocoding of destination and itinerary locations. The gazetteer is
+    # a CSV of name,country,latitude,longitude,alternate_names; unset uses the
+    # bundled list of major cities.
+    GEOCODER_GAZETTEER_PATH: str | None = None
+    GEOCODE_CACHE_SIZE: int = 4096
+
+    # Longest range accepted by the free/busy and day-view endpoints
+    CALENDAR_VIEW_MAX_DAYS: int = 366
+
+    # Read cache for trips, destinations, itinerary lists and calendar views. Set READ_CACHE_URL
+    # (redis://...) to share it between workers; otherwise it is per process, and a write
+    # only invalidates the worker that made it.
+    READ_CACHE_SIZE: int = 4096
+    READ_CACHE_TTL_SECONDS: float = 30.0
+    READ_CACHE_URL: str | None = None
+
+    # Worker processes serving the app, as gunicorn and uvicorn read it. More than one
+    # requires READ_CACHE_URL, or workers would serve each other's stale rows.
+    WEB_CONCURRENCY: int = 1
+
+    # Rows a live trip connection may fall behind by before it is told to resync
+    LIVE_QUEUE_SIZE: int = 256
+
+    # Serve /metrics/* (pool sizes, cache keys and hit rates) to signed-in users.
+    # Off by default; the endpoints answer 404 while disabled.
+    METRICS_ENABLED: bool = False
+
+    # Apply Alembic migrations when the app starts (disable when deploys run them)
+    AUTO_MIGRATE: bool = True
+
+    # Connection pool (ignored by SQLite, which uses SQLAlchemy's default pool)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+
+    # Cache-Control sent with ETag-validated responses; clients revalidate each time
+    HTTP_CACHE_CONTROL: str = "private, no-cache"
+
+    # SQLite connect pragmas
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,89 @@
+"""Offline geocoding and great-circle helpers.
+
+A resolver turns a free-text location into ``(latitude, longitude)`` or
+``None``. The bundled one reads a local gazetteer CSV, so nothing leaves
+the server; any object with a ``resolve(location)`` method can replace it.
+"""
+import csv
+import math
+import re
+import unicodedata
+from pathlib import Path
+from typing import Protocol
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_GAZETTEER = Path(__file__).resolve().parent.parent / "data" / "gazetteer.csv"
+
+Coordinates = tuple[float, float]
+
+
+class Resolver(Protocol):
+    def resolve(self, location: str) -> Coordinates | None: ...
+
+
+def normalize_location(location: str) -> str:
+    """Case-, accent- and punctuation-insensitive key for a location string."""
+    decomposed = unicodedata.normalize("NFKD", location)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", stripped.casefold()))
+
+
+def _candidates(location: str):
+    # The whole string, then each comma-separated part from the most
+    # specific, then ever shorter leading word runs ("lisbon portugal")
+    yield normalize_location(location)
+    for part in location.split(","):
+        yield normalize_location(part)
+    words = normalize_location(location).split()
+    for end in range(len(words) - 1, 0, -1):
+        yield " ".join(words[:end])
+
+
+class GazetteerResolver:
+    """Resolves names found in a CSV of ``name,country,latitude,longitude,alternate_names``.
+
+    Alternate names are separated by ``|``. Earlier rows win when two
+    places share a name.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_GAZETTEER):
+        self.places: dict[str, Coordinates] = {}
+        with open(path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                point = (float(row["latitude"]), float(row["longitude"]))
+                names = [row["name"], *filter(None, (row.get("alternate_names") or "").split("|"))]
+                for name in names:
+                    self.places.setdefault(normalize_location(name), point)
+
+    def resolve(self, location: str) -> Coordinates | None:
+        for candidate in _candidates(location):
+            if candidate in self.places:
+                return self.places[candidate]
+        return None
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(lat: float, lon: float, radius_km: float) -> list[tuple[float, float, float, float]]:
+    """``(south, west, north, east)`` boxes covering every point within ``radius_km``.
+
+    A circle crossing the antimeridian is split into two boxes, and one
+    reaching a pole covers every longitude.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    south, north = lat - math.degrees(angle), lat + math.degrees(angle)
+    ratio = math.sin(angle) / math.cos(math.radians(lat)) if abs(lat) < 90 else 2.0
+    if south <= -90 or north >= 90 or ratio >= 1:
+        return [(max(south, -90.0), -180.0, min(north, 90.0), 180.0)]
+    spread = math.degrees(math.asin(ratio))
+    west, east = lon - spread, lon + spread
+    if west < -180:
+        return [(south, west + 360, north, 180.0), (south, -180.0, north, east)]
+    if east > 180:
+        return [(south, west, north, 180.0), (south, -180.0, north, east - 360)]
+    return [(south, west, north, east)]
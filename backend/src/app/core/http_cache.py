@@ -0,0 +1,104 @@
+import hashlib
+from datetime import UTC, date, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.pagination import Page, PageParams
+
+settings = get_settings()
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over ``parts``; equal inputs always give the same tag."""
+    raw = "|".join(
+        part.isoformat() if isinstance(part, (datetime, date)) else str(part) for part in parts
+    )
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def row_etag(row, table: str | None = None) -> str:
+    return make_etag(table or row.__tablename__, row.id, row.updated_at)
+
+
+def page_etag(table: str, params: PageParams, page: Page) -> str:
+    """ETag of a page as served, from its rows' ids and versions.
+
+    Taken from the rows that make up the body, which may come from the read
+    cache, so a client can never hold a current tag for a stale body.
+    """
+    rows = (f"{row['id']}:{row['version']}" for row in page.items)
+    return make_etag(table, params.limit, params.cursor, page.next_cursor, *rows)
+
+
+async def collection_validators(
+    db: AsyncSession, stmt, model, page: PageParams | None = None
+) -> tuple[str, datetime | None]:
+    """ETag and last modification time of the rows selected by ``stmt``.
+
+    Inserts move ``max(id)``, deletes change the count and updates bump
+    ``max(updated_at)``, so a single aggregate query is enough to tell
+    whether a cached list is still current. The modification time misses
+    deletes; clients that can send If-None-Match should prefer it.
+    """
+    rows = stmt.with_only_columns(model.id, model.updated_at).order_by(None).subquery()
+    count, last_id, last_update = (
+        await db.execute(select(func.count(), func.max(rows.c.id), func.max(rows.c.updated_at)))
+    ).one()
+    parts = [model.__tablename__, count, last_id, last_update]
+    if page is not None:
+        parts += [page.limit, page.cursor]
+    return make_etag(*parts), last_update
+
+
+async def collection_etag(db: AsyncSession, stmt, model, page: PageParams | None = None) -> str:
+    """ETag for the rows selected by ``stmt``, computed without loading them."""
+    etag, _ = await collection_validators(db, stmt, model, page)
+    return etag
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 section 13.1.2): ignore the W/ prefix
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _unmodified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(
+    request: Request, response: Response, etag: str, last_modified: datetime | None = None
+) -> Response | None:
+    """Attach caching headers to ``response``; return a 304 when the client's copy is current.
+
+    If-None-Match wins over If-Modified-Since when both are sent (RFC 9110
+    section 13.2.2). Naive ``last_modified`` values are taken as UTC.
+    """
+    headers = {"ETag": etag, "Cache-Control": settings.HTTP_CACHE_CONTROL}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=UTC)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(UTC), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match:
+        current = _matches(if_none_match, etag)
+    else:
+        current = bool(if_modified_since and last_modified and _unmodified_since(if_modified_since, last_modified))
+    if current:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
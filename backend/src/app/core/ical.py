@@ -0,0 +1,188 @@
+"""Minimal iCalendar (RFC 5545) writer and incremental VEVENT reader.
+
+Only what calendar sync needs: VEVENTs with text, date and date-time
+properties. Times are written and read as local wall-clock values, the
+way the app stores them; zone information on imported times is dropped.
+"""
+import codecs
+import re
+from datetime import UTC, date, datetime, timedelta
+from typing import AsyncIterator
+
+PRODID = "-//Waymark//Travel Planner//EN"
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+_PARAM = re.compile(r';([^=;:]+)=("[^"]*"|[^;:]*)')
+_DURATION = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+class ICalendarError(ValueError):
+    pass
+
+
+# Writing
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences."""
+    encoded = line.encode()
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def format_utc(value: datetime) -> str:
+    """UTC form required by DTSTAMP; naive values are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return format_datetime(value) + "Z"
+
+
+def vevent(
+    uid: str,
+    start: datetime,
+    summary: str,
+    end: datetime | None = None,
+    description: str | None = None,
+    location: str | None = None,
+    stamp: datetime | None = None,
+) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_utc(stamp or datetime.now(UTC))}",
+        f"DTSTART:{format_datetime(start)}",
+    ]
+    if end is not None:
+        lines.append(f"DTEND:{format_datetime(end)}")
+    lines.append(f"SUMMARY:{escape_text(summary)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+async def stream_calendar(
+    batches: AsyncIterator[list[dict]], to_vevent, name: str | None = None
+) -> AsyncIterator[bytes]:
+    """Encode row batches as one VCALENDAR, a batch per chunk."""
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"]
+    if name:
+        header.append(f"X-WR-CALNAME:{escape_text(name)}")
+    yield "".join(fold(line) for line in header).encode()
+    async for batch in batches:
+        yield "".join(to_vevent(row) for row in batch).encode()
+    yield b"END:VCALENDAR\r\n"
+
+
+# Reading
+
+def unescape_text(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def parse_line(line: str) -> tuple[str, dict[str, str], str]:
+    """Split ``NAME;PARAM=x:value`` into its name, parameters and raw value."""
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            break
+    else:
+        raise ICalendarError(f"Malformed content line {line[:40]!r}")
+    head, value = line[:index], line[index + 1:]
+    name, _, raw_params = head.partition(";")
+    params = {key.upper(): val.strip('"') for key, val in _PARAM.findall(";" + raw_params)}
+    return name.upper(), params, value
+
+
+def parse_datetime(value: str, params: dict[str, str] | None = None) -> datetime:
+    value = value.strip()
+    try:
+        if (params or {}).get("VALUE") == "DATE" or len(value) == 8:
+            return datetime.combine(date(int(value[:4]), int(value[4:6]), int(value[6:8])), datetime.min.time())
+        return datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise ICalendarError(f"Invalid date-time {value!r}")
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ICalendarError(f"Invalid duration {value!r}")
+    parts = {key: int(val or 0) for key, val in match.groupdict().items() if key != "sign"}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+async def _physical_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Unfolded content lines, produced as the chunks arrive
+    pending = None
+    async for line in _physical_lines(chunks):
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+async def iter_vevents(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, tuple[dict, str]]]:
+    """Yield each VEVENT as ``{NAME: (params, raw value)}`` while the input is read.
+
+    Only the first occurrence of a property is kept, and properties of
+    nested components such as VALARM are ignored.
+    """
+    event, nested = None, 0
+    async for line in _lines(chunks):
+        name, params, value = parse_line(line)
+        component = value.strip().upper()
+        if name == "BEGIN" and component == "VEVENT" and event is None:
+            event, nested = {}, 0
+        elif event is None:
+            continue
+        elif name == "BEGIN":
+            nested += 1
+        elif name == "END" and component == "VEVENT" and nested == 0:
+            yield event
+            event = None
+        elif name == "END":
+            nested -= 1
+        elif nested == 0:
+            event.setdefault(name, (params, value))
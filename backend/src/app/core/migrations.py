@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Tables the migrations manage outside the models: the FTS5 search index,
+# the destinations R-tree and the shadow tables SQLite creates for them
+UNMODELLED_TABLE_PREFIXES = ("search_documents_fts", "destinations_rtree")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate from proposing to drop tables the models do not describe."""
+    return not (type_ == "table" and reflected and name.startswith(UNMODELLED_TABLE_PREFIXES))
+
+
+def alembic_config() -> Config:
+    """Alembic config pointing at the migrations shipped inside the package."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_database(revision: str = "head"):
+    command.upgrade(alembic_config(), revision)
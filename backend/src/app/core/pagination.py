@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+import operator
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Date, DateTime, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    """Query parameters shared by every keyset-paginated list endpoint."""
+
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: str | None = None
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: str | None = None
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None:
+            if isinstance(sort_column.type, DateTime):
+                sort_value = datetime.fromisoformat(sort_value)
+            elif isinstance(sort_column.type, Date):
+                sort_value = date.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor"
+        )
+
+
+def _after(sort_column, id_column, sort_value, row_id):
+    # Rows strictly after (sort_value, row_id) in "sort NULLS FIRST, id" order
+    if sort_value is None:
+        return or_(
+            sort_column.is_not(None),
+            and_(sort_column.is_(None), id_column > row_id),
+        )
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > row_id),
+    )
+
+
+async def paginate(
+    db: AsyncSession, stmt, sort_column, id_column, page: PageParams, rows: bool = False
+) -> Page:
+    """Run ``stmt`` as one keyset page ordered by ``(sort_column, id_column)``.
+
+    With ``rows=True`` the page holds plain dicts of the selected columns
+    instead of ORM objects; ``stmt`` must then select both sort columns.
+    """
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor, sort_column)
+        stmt = stmt.where(_after(sort_column, id_column, sort_value, row_id))
+    stmt = stmt.order_by(sort_column.asc().nulls_first(), id_column.asc()).limit(page.limit + 1)
+
+    result = await db.execute(stmt)
+    if rows:
+        items = [dict(row) for row in result.mappings()]
+        value = operator.getitem
+    else:
+        items = list(result.scalars().all())
+        value = getattr
+    if len(items) <= page.limit:
+        return Page(items=items)
+    items = items[:page.limit]
+    last = items[-1]
+    return Page(
+        items=items,
+        next_cursor=encode_cursor(value(last, sort_column.key), value(last, id_column.key)),
+    )
+
+
+def set_next_cursor(response: Response, page: Page):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
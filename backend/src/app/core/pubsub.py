@@ -0,0 +1,96 @@
+"""Publish/subscribe for compact change events.
+
+A change names the rows it touched: ``{"kind": "destinations", "op":
+"upsert", "ids": [4, 7]}``. Subscribers do not receive each message.
+They hold the set of rows that changed since their last read, so a row
+updated ten times before a slow client reads counts once.
+
+If a subscriber falls more than ``maxsize`` rows behind, its pending
+set is replaced by a single ``{"op": "resync"}``. Memory per connection
+stays bounded however far a client lags, and the client knows to reload.
+
+``LocalBroker`` fans out within one process. To share channels across
+workers, a networked broker sends ``publish`` to the other workers, and
+its listener calls ``deliver`` in each of them.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Protocol
+
+RESYNC = {"op": "resync"}
+
+
+class Subscription:
+    def __init__(self, broker: "LocalBroker", channel: str, maxsize: int):
+        self.broker, self.channel, self.maxsize = broker, channel, maxsize
+        # (kind, id) -> op, oldest change first
+        self.pending: dict[tuple[str, int], str] = {}
+        self.overflowed = False
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, message: dict):
+        if self.overflowed:
+            return
+        for row_id in message["ids"]:
+            key = (message["kind"], row_id)
+            # Moving the row to the end keeps changes in causal order
+            self.pending.pop(key, None)
+            self.pending[key] = message["op"]
+        if len(self.pending) > self.maxsize:
+            self.overflowed = True
+        if self.overflowed:
+            self.pending.clear()
+        self._ready.set()
+
+    async def next_batch(self) -> list[dict]:
+        """Wait for changes and take them all, grouped into runs of the same kind and op."""
+        while not (self.pending or self.overflowed or self.closed):
+            self._ready.clear()
+            await self._ready.wait()
+        if self.overflowed:
+            self.overflowed = False
+            return [dict(RESYNC)]
+        batch = []
+        for (kind, row_id), op in self.pending.items():
+            if batch and (batch[-1]["kind"], batch[-1]["op"]) == (kind, op):
+                batch[-1]["ids"].append(row_id)
+            else:
+                batch.append({"kind": kind, "op": op, "ids": [row_id]})
+        self.pending = {}
+        return batch
+
+    def close(self):
+        self.closed = True
+        self.broker.unsubscribe(self)
+        self._ready.set()
+
+
+class Broker(Protocol):
+    async def publish(self, channel: str, message: dict) -> None: ...
+
+    def subscribe(self, channel: str, maxsize: int) -> Subscription: ...
+
+
+class LocalBroker:
+    def __init__(self):
+        self.channels: dict[str, set[Subscription]] = defaultdict(set)
+
+    async def publish(self, channel: str, message: dict):
+        self.deliver(channel, message)
+
+    def deliver(self, channel: str, message: dict):
+        for subscription in list(self.channels.get(channel, ())):
+            subscription.push(message)
+
+    def subscribe(self, channel: str, maxsize: int = 256) -> Subscription:
+        subscription = Subscription(self, channel, maxsize)
+        self.channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self.channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.channels[subscription.channel]
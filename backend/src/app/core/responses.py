@@ -0,0 +1,81 @@
+from typing import AsyncIterator, Literal
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import ical
+
+StreamFormat = Literal["ndjson", "json"]
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def schema_columns(model, schema) -> list:
+    """Columns of ``model`` for each field of ``schema``, for row-level selects."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(rows: list[dict], response: Response) -> ORJSONResponse:
+    """Encode plain row dicts straight to JSON, skipping ``response_model`` validation.
+
+    Headers already set on the injected ``response`` (cursor, ETag) are kept.
+    """
+    return ORJSONResponse(rows, headers=dict(response.headers))
+
+
+async def iter_row_batches(
+    sessionmaker: async_sessionmaker, stmt, batch_size: int
+) -> AsyncIterator[list[dict]]:
+    """Rows of ``stmt`` as lists of at most ``batch_size`` dicts, from a server-side cursor."""
+    # The request's session is closed once the endpoint returns, so the
+    # stream owns its own session and cursor.
+    async with sessionmaker() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+
+async def _encode_rows(
+    sessionmaker: async_sessionmaker, stmt, fmt: StreamFormat, batch_size: int
+) -> AsyncIterator[bytes]:
+    first = True
+    if fmt == "json":
+        yield b"["
+    async for batch in iter_row_batches(sessionmaker, stmt, batch_size):
+        encoded = [orjson.dumps(row) for row in batch]
+        if fmt == "ndjson":
+            yield b"\n".join(encoded) + b"\n"
+        else:
+            yield (b"" if first else b",") + b",".join(encoded)
+        first = False
+    if fmt == "json":
+        yield b"]"
+
+
+def stream_rows_response(
+    sessionmaker: async_sessionmaker, stmt, fmt: StreamFormat = "ndjson", batch_size: int = 500
+) -> StreamingResponse:
+    """Stream every row of ``stmt`` as NDJSON or one JSON array, ``batch_size`` rows at a time.
+
+    Only one batch is held in memory, however many rows match.
+    """
+    return StreamingResponse(
+        _encode_rows(sessionmaker, stmt, fmt, batch_size), media_type=STREAM_MEDIA_TYPES[fmt]
+    )
+
+
+def calendar_response(
+    sessionmaker: async_sessionmaker,
+    stmt,
+    to_vevent,
+    response: Response,
+    name: str | None = None,
+    batch_size: int = 500,
+) -> StreamingResponse:
+    """Stream the rows of ``stmt`` as an iCalendar file, one VEVENT per row."""
+    return StreamingResponse(
+        ical.stream_calendar(iter_row_batches(sessionmaker, stmt, batch_size), to_vevent, name),
+        media_type=ical.MEDIA_TYPE,
+        headers=dict(response.headers),
+    )
@@ -0,0 +1,204 @@
+"""Packing itinerary items into the free time of a date range.
+
+Times are whole minutes from midnight of the first day. Each day offers
+the minutes between ``day_start`` and ``day_end``. Busy intervals are
+removed from that time, and so are an item's own opening hours where
+they are narrower. Travel between two consecutive items on the same day
+comes from a minutes matrix indexed by ``Task.index``.
+
+The greedy pass walks the free gaps in time order. A heap holds the
+items that are already open, best priority first. A second heap holds
+the items that open later in the day, earliest first. At each step the
+best open item that fits is placed.
+
+The local search then moves single items within a day, wherever that
+cuts the day's travel. Finally it tries to fit items that are still
+unplaced into the time this freed. A time limit bounds both steps.
+"""
+import heapq
+import time
+from dataclasses import dataclass
+
+DAY = 24 * 60
+
+
+@dataclass
+class Task:
+    id: int
+    index: int
+    duration: int
+    # Minutes of the day the item may run in; None follows the day's own hours
+    opens: int | None = None
+    closes: int | None = None
+    priority: int = 0
+    # Ties in priority keep the items' previous order
+    rank: int = 0
+
+
+def _ceil(value: int, step: int) -> int:
+    return -(-value // step) * step
+
+
+def free_gaps(days: int, day_start: int, day_end: int, busy: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """``[start, end)`` spans of each day's hours not covered by ``busy`` (sorted by start)."""
+    gaps, position = [], 0
+    for day in range(days):
+        low, high = day * DAY + day_start, day * DAY + day_end
+        while position < len(busy) and busy[position][1] <= low:
+            position += 1
+        scan = position
+        while low < high:
+            if scan < len(busy) and busy[scan][0] < high:
+                if busy[scan][0] > low:
+                    gaps.append((low, busy[scan][0]))
+                low = max(low, busy[scan][1])
+                scan += 1
+            else:
+                gaps.append((low, high))
+                break
+    return gaps
+
+
+class Planner:
+    def __init__(self, tasks: list[Task], travel, gaps, day_start: int, day_end: int, step: int = 1):
+        self.tasks, self.travel, self.step = tasks, travel, step
+        self.day_start, self.day_end = day_start, day_end
+        self.gaps_by_day: dict[int, list[tuple[int, int]]] = {}
+        for gap in gaps:
+            self.gaps_by_day.setdefault(gap[0] // DAY, []).append(gap)
+        self.days: dict[int, list[Task]] = {}
+        self.unplaced: list[Task] = []
+
+    def _window(self, task: Task, day: int) -> tuple[int, int]:
+        opens = self.day_start if task.opens is None else max(task.opens, self.day_start)
+        closes = self.day_end if task.closes is None else min(task.closes, self.day_end)
+        return day * DAY + opens, day * DAY + closes
+
+    def _start(self, task: Task, previous: Task | None, free_from: int, previous_end: int | None) -> int:
+        start = free_from
+        if previous is not None:
+            start = max(start, previous_end + self.travel[previous.index][task.index])
+        return _ceil(max(start, self._window(task, free_from // DAY)[0]), self.step)
+
+    def greedy(self):
+        waiting = list(self.tasks)
+        for day, gaps in sorted(self.gaps_by_day.items()):
+            if not waiting:
+                break
+            placed = self.days.setdefault(day, [])
+            previous, previous_end = None, None
+            for gap_start, gap_end in gaps:
+                # Items open at the gap's start, best first, and the rest by opening time
+                ready, later = [], []
+                for task in waiting:
+                    opens = self._window(task, day)[0]
+                    entry = (-task.priority, task.rank, task.index, task)
+                    if opens <= gap_start:
+                        ready.append(entry)
+                    elif opens < gap_end:
+                        later.append((opens, task.index, task))
+                heapq.heapify(ready)
+                heapq.heapify(later)
+                now = gap_start
+                while ready or later:
+                    while later and later[0][0] <= now:
+                        task = heapq.heappop(later)[2]
+                        heapq.heappush(ready, (-task.priority, task.rank, task.index, task))
+                    # Start times only grow, so an item that does not fit now
+                    # will not fit later in this gap either
+                    chosen = None
+                    while ready:
+                        task = heapq.heappop(ready)[3]
+                        start = self._start(task, previous, now, previous_end)
+                        if start + task.duration <= min(gap_end, self._window(task, day)[1]):
+                            chosen = task, start
+                            break
+                    if chosen:
+                        task, start = chosen
+                        placed.append(task)
+                        previous, previous_end = task, start + task.duration
+                        now = previous_end
+                    elif later:
+                        now = later[0][0]
+                    else:
+                        break
+                placed_ids = {id(task) for task in placed}
+                waiting = [task for task in waiting if id(task) not in placed_ids]
+        self.unplaced = waiting
+
+    def timetable(self, day: int, order: list[Task]) -> list[int] | None:
+        """Start minute of each item of ``order`` on ``day``, or None if they do not all fit."""
+        starts, gaps = [], self.gaps_by_day.get(day, [])
+        previous, previous_end, gap = None, None, 0
+        for task in order:
+            _, closes = self._window(task, day)
+            while gap < len(gaps):
+                free_from = gaps[gap][0] if previous_end is None else max(gaps[gap][0], previous_end)
+                start = self._start(task, previous, free_from, previous_end)
+                if start + task.duration <= gaps[gap][1]:
+                    break
+                gap += 1
+            else:
+                return None
+            if start + task.duration > closes:
+                return None
+            starts.append(start)
+            previous, previous_end = task, start + task.duration
+        return starts
+
+    def travel_time(self, order: list[Task]) -> int:
+        return sum(self.travel[a.index][b.index] for a, b in zip(order, order[1:]))
+
+    def improve(self, deadline: float):
+        """Relocate single items within their day while that shortens the day's travel."""
+        for day, order in self.days.items():
+            cost, improved = self.travel_time(order), True
+            while improved:
+                improved = False
+                for source in range(len(order)):
+                    for target in range(len(order)):
+                        if time.perf_counter() >= deadline:
+                            return
+                        if target == source:
+                            continue
+                        moved = order[:source] + order[source + 1:]
+                        moved.insert(target, order[source])
+                        moved_cost = self.travel_time(moved)
+                        if moved_cost < cost and self.timetable(day, moved) is not None:
+                            order[:], cost, improved = moved, moved_cost, True
+
+    def fill(self, deadline: float):
+        """Insert still-unplaced items wherever they now fit, best priority first."""
+        for task in sorted(self.unplaced, key=lambda task: (-task.priority, task.rank)):
+            placed = False
+            for day, order in sorted(self.days.items()):
+                for position in range(len(order) + 1):
+                    if time.perf_counter() >= deadline:
+                        return
+                    candidate = order[:position] + [task] + order[position:]
+                    if self.timetable(day, candidate) is not None:
+                        order[:] = candidate
+                        placed = True
+                        break
+                if placed:
+                    break
+            if placed:
+                self.unplaced.remove(task)
+
+    def solve(self, time_limit: float = 0.1) -> dict[int, int]:
+        """Start minute per placed task id; ``unplaced`` then lists the rest."""
+        deadline = time.perf_counter() + time_limit
+        self.greedy()
+        self.improve(deadline)
+        self.fill(deadline)
+        starts = {}
+        for day, order in self.days.items():
+            timetable = self.timetable(day, order)
+            if timetable is None:
+                # Never expected, but a day that does not fit must not lose its items
+                self.unplaced.extend(order)
+                order.clear()
+                continue
+            for task, start in zip(order, timetable):
+                starts[task.id] = start
+        return starts
@@ -1,30 +1,56 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jwt import InvalidTokenError
 from fastapi import HTTPException, status
 
 from app.core.config import get_settings
+from app.core.tokens import token_service
 
 
 settings = get_settings()
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.JWT_ALGORITHM
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small dedicated pool keeps logins off the event
+# loop without letting a burst of them starve the default executor.
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+async def _run_in_hashing_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, func, *args)
 
 
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hashing_pool(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Verify a password in the hashing pool.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash uses
+    outdated settings (e.g. a lower bcrypt cost) and should be replaced.
+    """
+    return await _run_in_hashing_pool(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def decode_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception()
-        return username
-    except JWTError:
+        return token_service.decode(token)["sub"]
+    except InvalidTokenError:
         raise credentials_exception()
 
 
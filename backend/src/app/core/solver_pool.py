@@ -0,0 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import get_settings
+
+# Route and schedule solves are CPU-bound and run for up to their time limit,
+# so they run here rather than on the event loop. The pool is small so a burst
+# of solves queues instead of taking every core from the request handlers.
+solver_executor = ThreadPoolExecutor(
+    max_workers=get_settings().SOLVER_WORKERS, thread_name_prefix="solver"
+)
+
+
+async def run_in_solver_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(solver_executor, func, *args)
@@ -0,0 +1,92 @@
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from functools import cached_property
+
+import jwt
+from jwt import InvalidTokenError
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, get_settings
+
+SUPPORTED_ALGORITHMS = ("HS256", "RS256", "EdDSA")
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+
+class TokenService:
+    """Signs and verifies access tokens with keys parsed once per process.
+
+    The current key signs new tokens and is advertised through the ``kid``
+    header; keys listed in ``JWT_PREVIOUS_KEYS`` still verify tokens issued
+    before a rotation. Verified payloads are cached until the token expires,
+    so repeat requests with the same bearer token skip signature checks.
+    """
+
+    def __init__(self, settings: Settings):
+        if settings.JWT_ALGORITHM not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm {settings.JWT_ALGORITHM!r}")
+        self.settings = settings
+        self.algorithm = settings.JWT_ALGORITHM
+        self.key_id = settings.JWT_KEY_ID
+        self.cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+    @cached_property
+    def _algorithm(self):
+        return jwt.get_algorithm_by_name(self.algorithm)
+
+    @cached_property
+    def signing_key(self):
+        if self.algorithm in ASYMMETRIC_ALGORITHMS:
+            if not self.settings.JWT_PRIVATE_KEY:
+                raise ValueError(f"JWT_PRIVATE_KEY must be set to sign {self.algorithm} tokens")
+            return self._algorithm.prepare_key(self.settings.JWT_PRIVATE_KEY)
+        return self._algorithm.prepare_key(self.settings.SECRET_KEY)
+
+    @cached_property
+    def verification_keys(self) -> dict:
+        if self.algorithm in ASYMMETRIC_ALGORITHMS:
+            if self.settings.JWT_PUBLIC_KEY:
+                current = self._algorithm.prepare_key(self.settings.JWT_PUBLIC_KEY)
+            else:
+                current = self.signing_key.public_key()
+        else:
+            current = self.signing_key
+        keys = {
+            kid: self._algorithm.prepare_key(material)
+            for kid, material in self.settings.JWT_PREVIOUS_KEYS.items()
+        }
+        keys[self.key_id] = current
+        return keys
+
+    def create_access_token(self, data: dict, expires_delta: timedelta | None = None) -> str:
+        now = datetime.now(UTC)
+        to_encode = data.copy()
+        to_encode.update({
+            "iat": now,
+            "exp": now + (expires_delta if expires_delta else timedelta(minutes=15)),
+            "jti": uuid.uuid4().hex,
+        })
+        return jwt.encode(
+            to_encode, self.signing_key, algorithm=self.algorithm, headers={"kid": self.key_id}
+        )
+
+    def decode(self, token: str) -> dict:
+        """Return the verified payload, raising ``InvalidTokenError`` otherwise."""
+        payload = self.cache.get(token)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                return payload
+            self.cache.pop(token)
+
+        kid = jwt.get_unverified_header(token).get("kid", self.key_id)
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown signing key {kid!r}")
+        payload = jwt.decode(
+            token, key, algorithms=[self.algorithm], options={"require": ["exp", "sub"]}
+        )
+        self.cache.set(token, payload, ttl=payload["exp"] - time.time())
+        return payload
+
+
+token_service = TokenService(get_settings())
@@ -1,32 +1,78 @@
-from app.core.database import SessionLocal
-from fastapi import Depends, HTTPException
+from app.core.database import AsyncSessionLocal
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.security import decode_token
-from app.services.user import get_user_by_username
+from app.schemas.user import Principal
+from app.services.collaborators import WRITE_ROLES, check_trip_access
+from app.services.user import get_principal
 from starlette.status import HTTP_401_UNAUTHORIZED
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(
+def get_sessionmaker():
+    # For streamed responses, which outlive the request's get_db session
+    return AsyncSessionLocal
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     username = decode_token(token)
-    user = get_user_by_username(db, username=username)
-    if not user:
+    principal = await get_principal(db, username=username)
+    if not principal:
         raise credentials_exception()
-    return user
+    return principal
+
+
+async def get_admin_user(current_user: Principal = Depends(get_current_user)):
+    if current_user.username not in get_settings().ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin rights required")
+    return current_user
+
+
+async def get_optional_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal | None:
+    """The signed-in user, or None without a token; a bad token is still a 401."""
+    if not token:
+        return None
+    return await get_current_user(token, db)
+
+
+def trip_access(roles: tuple[str, ...], model=None, param: str = "trip_id"):
+    """Dependency checking the caller holds one of ``roles`` on the trip a route uses.
+
+    The trip is the ``trip_id`` path parameter, or with ``model`` the trip
+    of the row whose id is in ``param``. Unknown ids are left to the route's 404.
+    """
+    async def check(
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+        current_user: Principal | None = Depends(get_optional_user),
+    ):
+        trip_id = int(request.path_params[param])
+        if model is not None:
+            trip_id = await db.scalar(select(model.trip_id).where(model.id == trip_id))
+        if trip_id is not None:
+            await check_trip_access(db, trip_id, current_user and current_user.id, roles)
+
+    return check
+
+
+def trip_writer(model=None, param: str = "trip_id"):
+    return trip_access(WRITE_ROLES, model, param)
 
 
 def credentials_exception():
@@ -1,10 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from app.core.database import Base, engine
+from app.core.compression import CompressionMiddleware
+from app.core.config import get_settings
+from app.core.database import async_engine
+from app.core.migrations import upgrade_database
 from app.routes import api_router
 
-Base.metadata.create_all(bind=engine)
-app = FastAPI()
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.AUTO_MIGRATE:
+        await asyncio.to_thread(upgrade_database)
+    yield
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESSLEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
 app.include_router(api_router, prefix="")
 
 
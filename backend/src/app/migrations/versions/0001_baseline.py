@@ -0,0 +1,117 @@
+"""Baseline schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations existed already have these tables, so
+each one is only created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String()),
+            sa.Column("email", sa.String()),
+            sa.Column("password_hash", sa.String()),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("is_verified", sa.Boolean()),
+            sa.Column("verification_code", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "trips" not in existing:
+        op.create_table(
+            "trips",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("title", sa.String()),
+            sa.Column("description", sa.String()),
+            sa.Column("start_date", sa.DateTime()),
+            sa.Column("end_date", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_trips_id", "trips", ["id"])
+
+    if "calendar_events" not in existing:
+        op.create_table(
+            "calendar_events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String()),
+            sa.Column("start_date", sa.DateTime(), nullable=True),
+            sa.Column("end_date", sa.DateTime(), nullable=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        )
+        op.create_index("ix_calendar_events_id", "calendar_events", ["id"])
+
+    if "destinations" not in existing:
+        op.create_table(
+            "destinations",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("location", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("order", sa.String(), nullable=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id")),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_destinations_id", "destinations", ["id"])
+
+    if "itineraries" not in existing:
+        op.create_table(
+            "itineraries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("destinations.id"), nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("time", sa.DateTime(), nullable=False),
+            sa.Column("description", sa.String(255)),
+            sa.Column("location", sa.String(100)),
+        )
+
+    if "dates" not in existing:
+        op.create_table(
+            "dates",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("destinations.id"), nullable=False, unique=True),
+            sa.Column("start_date", sa.Date(), nullable=False),
+            sa.Column("end_date", sa.Date(), nullable=False),
+        )
+
+    if "budget" not in existing:
+        op.create_table(
+            "budget",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("currency", sa.String(), nullable=False),
+            sa.Column("description", sa.String()),
+            sa.Column("category", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_budget_id", "budget", ["id"])
+
+
+def downgrade():
+    for table in ("budget", "dates", "itineraries", "destinations", "calendar_events", "trips", "users"):
+        op.drop_table(table)
@@ -0,0 +1,68 @@
+"""Link itineraries, dates and calendar events to trips; add collaborations
+
+Itineraries and dates referenced destinations.id although every route treats
+their trip_id as a trip. Calendar events gain an optional trip_id, and the
+collaborations association table backs Trips.collaborators.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Names reflected-but-unnamed SQLite foreign keys so batch mode can drop them
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _retarget_trip_fk(table, referred_table):
+    inspector = sa.inspect(op.get_bind())
+    current = next(
+        fk for fk in inspector.get_foreign_keys(table) if fk["constrained_columns"] == ["trip_id"]
+    )
+    if current["referred_table"] == referred_table:
+        return
+    name = current["name"] or f"fk_{table}_trip_id_{current['referred_table']}"
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.create_foreign_key(
+            f"fk_{table}_trip_id_{referred_table}", referred_table, ["trip_id"], ["id"]
+        )
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    _retarget_trip_fk("itineraries", "trips")
+    _retarget_trip_fk("dates", "trips")
+
+    event_columns = {column["name"] for column in inspector.get_columns("calendar_events")}
+    if "trip_id" not in event_columns:
+        with op.batch_alter_table("calendar_events") as batch_op:
+            batch_op.add_column(sa.Column("trip_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                "fk_calendar_events_trip_id_trips", "trips", ["trip_id"], ["id"]
+            )
+
+    if "collaborations" not in inspector.get_table_names():
+        op.create_table(
+            "collaborations",
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        )
+
+
+def downgrade():
+    op.drop_table("collaborations")
+    with op.batch_alter_table("calendar_events", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint("fk_calendar_events_trip_id_trips", type_="foreignkey")
+        batch_op.drop_column("trip_id")
+    _retarget_trip_fk("dates", "destinations")
+    _retarget_trip_fk("itineraries", "destinations")
@@ -0,0 +1,37 @@
+"""Composite indexes for the per-trip and per-user list queries
+
+Each index leads with the foreign key the list endpoints filter on and
+continues with the column they order and paginate by.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-05-07
+
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_trips_user_id_start_date", "trips", ["user_id", "start_date"]),
+    ("ix_destinations_trip_id_order", "destinations", ["trip_id", "order"]),
+    ("ix_itineraries_trip_id_time", "itineraries", ["trip_id", "time"]),
+    ("ix_budget_trip_id_created_at", "budget", ["trip_id", "created_at"]),
+    ("ix_budget_trip_id_category_created_at", "budget", ["trip_id", "category", "created_at"]),
+    ("ix_calendar_events_user_id_start_date", "calendar_events", ["user_id", "start_date"]),
+    ("ix_calendar_events_trip_id", "calendar_events", ["trip_id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,35 @@
+"""Trip base currency and the local exchange-rate table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-05-07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.add_column(
+            sa.Column("base_currency", sa.String(3), nullable=False, server_default="USD")
+        )
+
+    op.create_table(
+        "exchange_rates",
+        sa.Column("currency", sa.String(3), primary_key=True),
+        sa.Column("units_per_usd", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade():
+    op.drop_table("exchange_rates")
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("base_currency")
@@ -0,0 +1,27 @@
+"""Flag trips that are reusable templates
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-05-09
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.add_column(
+            sa.Column("is_template", sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("is_template")
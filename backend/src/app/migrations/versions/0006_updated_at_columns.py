@@ -0,0 +1,29 @@
+"""updated_at on itineraries, dates and calendar events
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-05-10
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+TABLES = ("itineraries", "dates", "calendar_events")
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime()))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,42 @@
+"""Event durations for indexed overlap queries
+
+Conflict checks scan calendar_events by (user_id, start_date) from
+``start - longest event`` onwards; the duration index makes looking up
+that longest duration a single index probe.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-05-12
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("calendar_events") as batch_op:
+        batch_op.add_column(sa.Column("duration_seconds", sa.Integer()))
+    op.create_index(
+        "ix_calendar_events_user_id_duration", "calendar_events", ["user_id", "duration_seconds"]
+    )
+
+    if op.get_bind().dialect.name == "sqlite":
+        seconds = "MAX(0, CAST((julianday(end_date) - julianday(start_date)) * 86400 AS INTEGER))"
+    else:
+        seconds = "GREATEST(0, CAST(EXTRACT(EPOCH FROM end_date - start_date) AS INTEGER))"
+    op.execute(
+        f"UPDATE calendar_events SET duration_seconds = {seconds} "
+        "WHERE start_date IS NOT NULL AND end_date IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_calendar_events_user_id_duration", table_name="calendar_events")
+    with op.batch_alter_table("calendar_events") as batch_op:
+        batch_op.drop_column("duration_seconds")
@@ -0,0 +1,98 @@
+"""Full-text search over trips, destinations and itinerary items
+
+search_documents holds one row per searchable record. On SQLite an
+external-content FTS5 table indexes it, kept current by triggers; on
+Postgres GIN indexes cover a tsvector of the text and trigrams of the
+title. Existing rows are indexed here.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-05-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Must match the expression services.search queries with, or the index is not used
+PG_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(body, ''))"
+
+BACKFILL = (
+    "INSERT INTO search_documents (kind, entity_id, trip_id, user_id, title, body) "
+    "SELECT 'trip', id, id, user_id, title, coalesce(description, '') "
+    "FROM trips WHERE user_id IS NOT NULL",
+    "INSERT INTO search_documents (kind, entity_id, trip_id, user_id, title, body) "
+    "SELECT 'destination', d.id, d.trip_id, t.user_id, d.name, "
+    "coalesce(d.location, '') || ' ' || coalesce(d.description, '') "
+    "FROM destinations d JOIN trips t ON t.id = d.trip_id WHERE t.user_id IS NOT NULL",
+    "INSERT INTO search_documents (kind, entity_id, trip_id, user_id, title, body) "
+    "SELECT 'itinerary', i.id, i.trip_id, t.user_id, i.name, "
+    "coalesce(i.location, '') || ' ' || coalesce(i.description, '') "
+    "FROM itineraries i JOIN trips t ON t.id = i.trip_id WHERE t.user_id IS NOT NULL",
+)
+
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "title, body, user_id, content='search_documents', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts (rowid, title, body, user_id) "
+    "VALUES (new.id, new.title, new.body, new.user_id); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts (search_documents_fts, rowid, title, body, user_id) "
+    "VALUES ('delete', old.id, old.title, old.body, old.user_id); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts (search_documents_fts, rowid, title, body, user_id) "
+    "VALUES ('delete', old.id, old.title, old.body, old.user_id); "
+    "INSERT INTO search_documents_fts (rowid, title, body, user_id) "
+    "VALUES (new.id, new.title, new.body, new.user_id); END",
+)
+
+POSTGRES_INDEXES = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX ix_search_documents_document ON search_documents USING gin ({PG_DOCUMENT})",
+    "CREATE INDEX ix_search_documents_title_trgm ON search_documents USING gin (title gin_trgm_ops)",
+)
+
+
+def upgrade():
+    op.create_table(
+        "search_documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String()),
+        sa.Column("body", sa.String()),
+    )
+    op.create_index(
+        "ix_search_documents_kind_entity_id", "search_documents", ["kind", "entity_id"], unique=True
+    )
+    op.create_index("ix_search_documents_trip_id", "search_documents", ["trip_id"])
+    op.create_index("ix_search_documents_user_id", "search_documents", ["user_id"])
+
+    statements = SQLITE_FTS if op.get_bind().dialect.name == "sqlite" else POSTGRES_INDEXES
+    for statement in statements:
+        op.execute(statement)
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("search_documents_au", "search_documents_ad", "search_documents_ai"):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE search_documents_fts")
+    else:
+        op.drop_index("ix_search_documents_title_trgm", table_name="search_documents")
+        op.drop_index("ix_search_documents_document", table_name="search_documents")
+    op.drop_index("ix_search_documents_user_id", table_name="search_documents")
+    op.drop_index("ix_search_documents_trip_id", table_name="search_documents")
+    op.drop_index("ix_search_documents_kind_entity_id", table_name="search_documents")
+    op.drop_table("search_documents")
@@ -0,0 +1,81 @@
+"""Coordinates for destinations and itinerary items, and a geocoding cache
+
+Destinations get a spatial index for radius queries: an R-tree kept
+current by triggers on SQLite, a GiST index over point(longitude,
+latitude) on Postgres. Existing rows are geocoded when next written.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-05-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("destinations", "itineraries")
+
+_RTREE_INSERT = (
+    "INSERT INTO destinations_rtree (id, min_lat, max_lat, min_lon, max_lon) "
+    "SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+    "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; "
+)
+
+SQLITE_RTREE = (
+    "CREATE VIRTUAL TABLE destinations_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    f"CREATE TRIGGER destinations_rtree_ai AFTER INSERT ON destinations BEGIN {_RTREE_INSERT}END",
+    "CREATE TRIGGER destinations_rtree_au AFTER UPDATE OF latitude, longitude ON destinations BEGIN "
+    f"DELETE FROM destinations_rtree WHERE id = old.id; {_RTREE_INSERT}END",
+    "CREATE TRIGGER destinations_rtree_ad AFTER DELETE ON destinations BEGIN "
+    "DELETE FROM destinations_rtree WHERE id = old.id; END",
+    "INSERT INTO destinations_rtree (id, min_lat, max_lat, min_lon, max_lon) "
+    "SELECT id, latitude, latitude, longitude, longitude FROM destinations "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+)
+
+# Must match the expression services.destinations filters on
+POSTGRES_INDEX = (
+    "CREATE INDEX ix_destinations_point ON destinations USING gist (point(longitude, latitude)) "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+)
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("latitude", sa.Float()))
+            batch_op.add_column(sa.Column("longitude", sa.Float()))
+
+    op.create_table(
+        "geocoded_locations",
+        sa.Column("query", sa.String(), primary_key=True),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_RTREE:
+            op.execute(statement)
+    else:
+        op.execute(POSTGRES_INDEX)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("destinations_rtree_ad", "destinations_rtree_au", "destinations_rtree_ai"):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE destinations_rtree")
+    else:
+        op.drop_index("ix_destinations_point", table_name="destinations")
+
+    op.drop_table("geocoded_locations")
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("longitude")
+            batch_op.drop_column("latitude")
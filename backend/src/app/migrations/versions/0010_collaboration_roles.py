@@ -0,0 +1,33 @@
+"""Collaborator roles
+
+Collaborations record whether the collaborator may edit or only view
+the trip, and when they were added. The user_id index serves "trips
+shared with me" and the access check of the live trip channel.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-05-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("collaborations") as batch_op:
+        batch_op.add_column(sa.Column("role", sa.String(16), nullable=False, server_default="editor"))
+        batch_op.add_column(sa.Column("created_at", sa.DateTime()))
+    op.create_index("ix_collaborations_user_id", "collaborations", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_collaborations_user_id", table_name="collaborations")
+    with op.batch_alter_table("collaborations") as batch_op:
+        batch_op.drop_column("created_at")
+        batch_op.drop_column("role")
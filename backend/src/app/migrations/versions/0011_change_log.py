@@ -0,0 +1,59 @@
+"""Change log for delta sync
+
+One entry per synced row, rewritten on every change, with tombstones
+for deletes. Existing rows are entered as upserts so that syncing from
+cursor 0 returns everything.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-05-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# kind, table, column holding the trip id
+BACKFILL = (
+    ("trips", "trips", "id"),
+    ("destinations", "destinations", "trip_id"),
+    ("itineraries", "itineraries", "trip_id"),
+    ("budget", "budget", "trip_id"),
+    ("dates", "dates", "trip_id"),
+)
+
+
+def upgrade():
+    op.create_table(
+        "changes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("trip_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(8), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_changes_trip_id_id", "changes", ["trip_id", "id"])
+    op.create_index("ix_changes_trip_id_kind_row_id", "changes", ["trip_id", "kind", "row_id"])
+    op.create_index("ix_changes_user_id_id", "changes", ["user_id", "id"])
+
+    for kind, table, trip_column in BACKFILL:
+        op.execute(
+            f"INSERT INTO changes (trip_id, kind, row_id, op, created_at) "
+            f"SELECT {trip_column}, '{kind}', id, 'upsert', CURRENT_TIMESTAMP FROM {table} "
+            f"WHERE {trip_column} IS NOT NULL ORDER BY id"
+        )
+
+
+def downgrade():
+    op.drop_index("ix_changes_user_id_id", table_name="changes")
+    op.drop_index("ix_changes_trip_id_kind_row_id", table_name="changes")
+    op.drop_index("ix_changes_trip_id_id", table_name="changes")
+    op.drop_table("changes")
@@ -0,0 +1,34 @@
+"""Row versions
+
+A version counter on every row clients edit. Each write bumps it, and
+PATCH updates only apply when the row is still at the version the client
+last read, so concurrent edits are reported instead of lost.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-05-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+TABLES = ("trips", "destinations", "itineraries", "budget", "dates")
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade():
+    # A plain DROP COLUMN; rebuilding destinations would lose the R-tree triggers of 0009
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, recreate="never") as batch_op:
+            batch_op.drop_column("version")
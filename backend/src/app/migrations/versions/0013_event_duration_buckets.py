@@ -0,0 +1,45 @@
+"""Duration buckets for event overlap queries
+
+Overlap checks bounded the (user_id, start_date) scan by the user's
+longest event, so a single multi-week event made every check read weeks
+of events. Events now fall into duration buckets (an hour, a day, a week,
+longer) and each bucket is scanned back by its own bound through
+(user_id, duration_bucket, start_date).
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-05-22
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+# Must match models.calendar_event.DURATION_BUCKETS
+BUCKETS = (3600, 24 * 3600, 7 * 24 * 3600)
+
+
+def upgrade():
+    with op.batch_alter_table("calendar_events", recreate="never") as batch_op:
+        batch_op.add_column(sa.Column("duration_bucket", sa.SmallInteger()))
+    cases = " ".join(f"WHEN duration_seconds <= {bound} THEN {index}" for index, bound in enumerate(BUCKETS))
+    op.execute(
+        f"UPDATE calendar_events SET duration_bucket = CASE {cases} ELSE {len(BUCKETS)} END "
+        "WHERE duration_seconds IS NOT NULL"
+    )
+    op.create_index(
+        "ix_calendar_events_user_id_bucket_start_date",
+        "calendar_events",
+        ["user_id", "duration_bucket", "start_date"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_calendar_events_user_id_bucket_start_date", table_name="calendar_events")
+    with op.batch_alter_table("calendar_events", recreate="never") as batch_op:
+        batch_op.drop_column("duration_bucket")
@@ -0,0 +1,15 @@
+# Import every model so the declarative registry can resolve string relationships
+from app.models import (  # noqa: F401
+    budget,
+    calendar_event,
+    change,
+    collaboration,
+    dates,
+    destinations,
+    exchange_rate,
+    geocode,
+    itinerary,
+    search,
+    trips,
+    user,
+)
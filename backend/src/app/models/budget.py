@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -7,6 +7,10 @@ from app.core.database import Base
 
 class Budget(Base):
     __tablename__ = "budget"
+    __table_args__ = (
+        Index("ix_budget_trip_id_created_at", "trip_id", "created_at"),
+        Index("ix_budget_trip_id_category_created_at", "trip_id", "category", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)  # Assuming you have a `trip` table
@@ -16,5 +20,7 @@ class Budget(Base):
     category = Column(String, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Bumped by every write; PATCH only applies to the version the client read
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
-    trip = relationship("Trip", back_populates="budgets")
+    trip = relationship("Trips", back_populates="budgets")
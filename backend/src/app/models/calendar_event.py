@@ -1,17 +1,63 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from bisect import bisect_left
+
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
+from datetime import datetime, UTC
 from app.core.database import Base
 
+# Upper bounds (seconds) of the duration buckets: up to an hour, a day, a
+# week, and longer. Overlap queries scan each bucket back from the window
+# by that bucket's bound only, so a few long events do not widen the scan
+# over every short one.
+DURATION_BUCKETS = (3600, 24 * 3600, 7 * 24 * 3600)
+
+
+def duration_seconds(start_date, end_date):
+    if start_date is None or end_date is None:
+        return None
+    return max(0, int((end_date - start_date).total_seconds()))
+
+
+def duration_bucket(seconds):
+    return None if seconds is None else bisect_left(DURATION_BUCKETS, seconds)
+
+
+def _default_duration(context):
+    # Also runs for Core executemany inserts, e.g. the .ics import
+    params = context.get_current_parameters()
+    return duration_seconds(params.get("start_date"), params.get("end_date"))
+
+
+def _default_bucket(context):
+    return duration_bucket(_default_duration(context))
+
+
 class CalendarEvent(Base):
     __tablename__ = "calendar_events"
+    __table_args__ = (
+        Index("ix_calendar_events_user_id_start_date", "user_id", "start_date"),
+        Index("ix_calendar_events_user_id_duration", "user_id", "duration_seconds"),
+        Index("ix_calendar_events_user_id_bucket_start_date", "user_id", "duration_bucket", "start_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String)
     start_date = Column(DateTime, nullable=True)
     end_date = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    # Bounds the start_date range scanned by overlap queries
+    duration_seconds = Column(Integer, default=_default_duration)
+    duration_bucket = Column(SmallInteger, default=_default_bucket)  # index into DURATION_BUCKETS
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="events")
-    
-    trip = relationship("Trip", back_populates="calendar_events")
+
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=True, index=True)
+    trip = relationship("Trips", back_populates="calendar_events")
+
+
+@event.listens_for(CalendarEvent, "before_update")
+def _update_duration(mapper, connection, target):
+    target.duration_seconds = duration_seconds(target.start_date, target.end_date)
+    target.duration_bucket = duration_bucket(target.duration_seconds)
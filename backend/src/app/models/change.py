@@ -0,0 +1,33 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from app.core.database import Base
+
+
+class Change(Base):
+    """Latest change to one synced row; ``id`` is the sync cursor.
+
+    Each write replaces the row's previous entry, so the log holds one
+    entry per live row or tombstone rather than one per write. Entries
+    with a ``user_id`` concern only that user: a trip they lost access to,
+    or one newly shared with them. There are no foreign keys, since
+    tombstones outlive their rows.
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_trip_id_id", "trip_id", "id"),
+        Index("ix_changes_trip_id_kind_row_id", "trip_id", "kind", "row_id"),
+        Index("ix_changes_user_id_id", "user_id", "id"),
+        # Never reuse an id, or a cursor could skip a later change
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, nullable=False)
+    kind = Column(String(20), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
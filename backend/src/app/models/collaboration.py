@@ -1,4 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from datetime import datetime
-#from app.database import Base
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table
+from app.core.database import Base
+
+# Association table behind Trips.collaborators / User.collaborations
+collaborations = Table(
+    "collaborations",
+    Base.metadata,
+    Column("trip_id", Integer, ForeignKey("trips.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    # "editor" or "viewer"; the trip's owner is never listed here
+    Column("role", String(16), nullable=False, default="editor", server_default="editor"),
+    Column("created_at", DateTime, default=lambda: datetime.now(UTC)),
+    # Trips shared with a user
+    Index("ix_collaborations_user_id", "user_id"),
+)
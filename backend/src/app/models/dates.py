@@ -1,16 +1,17 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
+from datetime import datetime, UTC
 from app.core.database import Base
 
 class Dates(Base):
     __tablename__ = 'dates'
 
     id = Column(Integer, primary_key=True)  # unique ID for the date entry
-    trip_id = Column(Integer, ForeignKey('destinations.id'), nullable=False, unique=True)  # links to destination
+    trip_id = Column(Integer, ForeignKey('trips.id'), nullable=False, unique=True)  # links to trip
     start_date = Column(Date, nullable=False)  # trip start
     end_date = Column(Date, nullable=False)  # trip end
-
-    destination = relationship('Destinations', back_populates='dates', uselist=False)  # one-to-one with destination
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))  # drives ETags
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # bumped by every write, checked by PATCH
 
     def to_dict(self):
         return {
@@ -20,4 +21,4 @@ class Dates(Base):
             'end_date': self.end_date.isoformat() if self.end_date else None
         }
     
-    trip = relationship("Trip", back_populates="dates")
+    trip = relationship("Trips", back_populates="dates")
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from datetime import datetime, UTC
 
@@ -7,6 +7,9 @@ from app.core.database import Base
 
 class Destinations(Base):
     __tablename__ = "destinations"
+    __table_args__ = (
+        Index("ix_destinations_trip_id_order", "trip_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -14,10 +17,15 @@ class Destinations(Base):
 
     description = Column(String, nullable=True)
     order = Column(String, nullable=True)
+    # Resolved from location unless given; indexed spatially by migration 0009
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     trip_id = Column(Integer, ForeignKey("trips.id"))
 
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    # Bumped by every write; PATCH only applies to the version the client read
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
-    trip = relationship("Trip", back_populates="destinations")
\ No newline at end of file
+    trip = relationship("Trips", back_populates="destinations")
\ No newline at end of file
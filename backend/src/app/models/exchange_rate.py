@@ -0,0 +1,11 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, String
+from app.core.database import Base
+
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+
+    currency = Column(String(3), primary_key=True)  # ISO 4217 code
+    units_per_usd = Column(Float, nullable=False)  # how many units one US dollar buys
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,16 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, Float, String
+
+from app.core.database import Base
+
+
+class GeocodedLocation(Base):
+    """Memoized geocoder answer for a normalized location string; misses are kept too."""
+
+    __tablename__ = "geocoded_locations"
+
+    query = Column(String, primary_key=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
@@ -1,18 +1,26 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Float, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime, UTC
 from app.core.database import Base
 
 class Itinerary(Base):
     __tablename__ = 'itineraries'
+    __table_args__ = (
+        Index('ix_itineraries_trip_id_time', 'trip_id', 'time'),  # trip itinerary in time order
+    )
 
     id = Column(Integer, primary_key=True)  # unique ID for each itinerary
-    trip_id = Column(Integer, ForeignKey('destinations.id'), nullable=False)  # links to a destination
+    trip_id = Column(Integer, ForeignKey('trips.id'), nullable=False)  # links to a trip
     name = Column(String(100), nullable=False)  # name of the itinerary item
     time = Column(DateTime, nullable=False)  # when it's scheduled
     description = Column(String(255))  # optional description
     location = Column(String(100))  # optional location
+    latitude = Column(Float)  # resolved from location unless given
+    longitude = Column(Float)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))  # drives ETags
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # bumped by every write, checked by PATCH
 
-    destination = relationship('Destinations', back_populates='itineraries')  # connect back to destination
+    trip = relationship('Trips', back_populates='itineraries')  # connect back to trip
 
     def to_dict(self):
         return {
@@ -21,5 +29,7 @@ class Itinerary(Base):
             'name': self.name,
             'time': self.time.isoformat() if self.time else None,  # format datetime for JSON
             'description': self.description,
-            'location': self.location
+            'location': self.location,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
         }
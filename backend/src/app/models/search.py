@@ -0,0 +1,26 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from app.core.database import Base
+
+
+class SearchDocument(Base):
+    """One searchable row (trip, destination or itinerary item) and its owner.
+
+    The service layer keeps these rows in step with the source tables. The
+    full-text index over them is created by the migrations: an FTS5 table
+    kept current by triggers on SQLite, and GIN tsvector and trigram
+    indexes on Postgres.
+    """
+
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        Index("ix_search_documents_kind_entity_id", "kind", "entity_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String)
+    body = Column(String)
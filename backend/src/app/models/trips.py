@@ -1,31 +1,37 @@
 from datetime import UTC, datetime
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, false
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
 
 
 class Trips(Base):
     __tablename__ = "trips"
+    __table_args__ = (
+        Index("ix_trips_user_id_start_date", "user_id", "start_date"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String)
     description = Column(String)
+    base_currency = Column(String(3), nullable=False, default="USD", server_default="USD")
+    is_template = Column(Boolean, nullable=False, default=False, server_default=false())
 
     start_date = Column(DateTime, default=datetime.now(UTC))
     end_date = Column(DateTime, default=datetime.now(UTC))
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    # Bumped by every write; PATCH only applies to the version the client read
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     user = relationship("User", back_populates="trips")
-    destinations = relationship("Destination", back_populates="trip", cascade="all, delete-orphan")
-    budgets = relationship("Budget", back_populates="trip", cascade="all, delete-orphan")
-    calendar_events = relationship("CalendarEvent", back_populates="trip", cascade="all, delete-orphan")
-    dates = relationship("Date", back_populates="trip", cascade="all, delete-orphan")
+    destinations = relationship("Destinations", back_populates="trip", cascade="all, delete-orphan", order_by="(Destinations.order, Destinations.id)")
+    itineraries = relationship("Itinerary", back_populates="trip", cascade="all, delete-orphan", order_by="(Itinerary.time, Itinerary.id)")
+    budgets = relationship("Budget", back_populates="trip", cascade="all, delete-orphan", order_by="(Budget.created_at, Budget.id)")
+    calendar_events = relationship("CalendarEvent", back_populates="trip", cascade="all, delete-orphan", order_by="(CalendarEvent.start_date, CalendarEvent.id)")
+    dates = relationship("Dates", back_populates="trip", cascade="all, delete-orphan")
     collaborators = relationship("User", secondary="collaborations", back_populates="collaborations")
 
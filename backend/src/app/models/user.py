@@ -22,3 +22,4 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan"
     )
+    collaborations = relationship("Trips", secondary="collaborations", back_populates="collaborators")
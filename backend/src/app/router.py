@@ -7,4 +7,4 @@ from app.models.dates import Dates
 from app.models.calendar_event import CalendarEvent
 from app.models.budget import Budget
 from app.models.dates import Dates
-from app.models.collaboration import Colaboration
+from app.models.collaboration import collaborations
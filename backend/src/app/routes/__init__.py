@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 
-from app.routes import user, trips, destinations, calendar_event, itinerary, dates, budget, collaborators
+from app.routes import user, trips, destinations, calendar_event, itinerary, dates, budget, collaborators, metrics, search, sync
 
 api_router = APIRouter()
 
@@ -12,4 +12,7 @@ api_router.include_router(calendar_event.router, tags=["Calendar Events"])
 api_router.include_router(itinerary.router, tags=["Itinerary"])
 api_router.include_router(dates.router, tags=["Dates"])
 api_router.include_router(budget.router, tags=["Budget"])
-#api_router.include_router(collaborators.router, tags=["Collaborators"])
+api_router.include_router(search.router, tags=["Search"])
+api_router.include_router(sync.router, tags=["Sync"])
+api_router.include_router(metrics.router, tags=["Metrics"])
+api_router.include_router(collaborators.router, tags=["Collaborators"])
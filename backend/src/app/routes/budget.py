@@ -1,57 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.dependencies import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.core.pagination import PageParams, page_params, paginate, set_next_cursor
+from app.core.responses import rows_response, schema_columns
+from app.dependencies import get_admin_user, get_db, trip_writer
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from uuid import UUID
-from app.schemas.budget import BudgetOut
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.budget import BudgetOut, BudgetSummary, ExchangeRateOut, ExchangeRateUpdate
 from app.models.budget import Budget
+from app.models.trips import Trips
+import app.services.budget as budget_service
+from app.schemas.bulk import BatchRequest, BatchResult
+from app.services.bulk import apply_batch
+from app.services.changes import record_changes
+from app.services.patch import patch_row
+from app.services.realtime import publish_change
 
 router = APIRouter()
 
 # Retrieve budget based off of trip_id
-@router.get("/trips/{trip_Id}/budget", )
-async def get_trip_budget(trip_id: int, db: Session = Depends(get_db)):
-    budget = db.query(Budget).filter(Budget.trip_id == trip_id).all()
+@router.get("/trips/{trip_id}/budget", response_model=list[BudgetOut])
+async def get_trip_budget(
+    trip_id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    category: str | None = None,
+    currency: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    stmt = select(*schema_columns(Budget, BudgetOut)).filter(Budget.trip_id == trip_id)
+    if category:
+        stmt = stmt.filter(Budget.category == category)
+    if currency:
+        stmt = stmt.filter(Budget.currency == currency)
+    budget = await paginate(db, stmt, Budget.created_at, Budget.id, page, rows=True)
     
-    if not budget:
+    if not budget.items and not page.cursor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No budget found for trip {trip_id}"
         )
 
-    return budget
+    set_next_cursor(response, budget)
+    return rows_response(budget.items, response)
+
+# Totals per category and currency, converted to the trip's base currency
+@router.get("/trips/{trip_id}/budget/summary", response_model=BudgetSummary)
+async def get_trip_budget_summary(
+    trip_id: int,
+    base_currency: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    trip = await db.get(Trips, trip_id)
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with ID {trip_id} not found")
+    return await budget_service.get_budget_summary(db, trip_id, base_currency or trip.base_currency)
+
+# Rates are shared by every trip's summary, so only admins may change them
+@router.put(
+    "/exchange-rates/{currency}", response_model=ExchangeRateOut, dependencies=[Depends(get_admin_user)],
+)
+async def set_exchange_rate(currency: str, rate: ExchangeRateUpdate, db: AsyncSession = Depends(get_db)):
+    return await budget_service.set_exchange_rate(db, currency, rate.units_per_usd)
 
 from app.schemas.budget import BudgetCreate
 
-@router.post("/trips/{trip_id}/budget", response_model=BudgetOut)
-async def create_trip_budget(trip_id: UUID, budget_data: BudgetCreate, db: Session = Depends(get_db)):
-    new_budget = Budget(**budget_data.dict(), trip_id=trip_id)
+@router.post("/trips/{trip_id}/budget", response_model=BudgetOut, dependencies=[Depends(trip_writer())])
+async def create_trip_budget(trip_id: int, budget_data: BudgetCreate, db: AsyncSession = Depends(get_db)):
+    new_budget = Budget(**budget_data.model_dump(), trip_id=trip_id)
     db.add(new_budget)
-    db.commit()
-    db.refresh(new_budget)
+    await db.flush()
+    await record_changes(db, trip_id, "budget", "upsert", [new_budget.id])
+    await db.commit()
+    await db.refresh(new_budget)
+    await publish_change(trip_id, "budget", "upsert", [new_budget.id])
     return new_budget
  
-from app.schemas.budget import BudgetUpdate
+# Create, update and delete many budget entries in one transaction
+@router.post(
+    "/trips/{trip_id}/budget/batch", response_model=BatchResult[BudgetOut], dependencies=[Depends(trip_writer())],
+)
+async def batch_trip_budget(trip_id: int, batch: BatchRequest, db: AsyncSession = Depends(get_db)):
+    return await apply_batch(db, Budget, trip_id, BudgetCreate, batch)
 
-@router.put("/budget/{budget_id}", response_model=BudgetOut)
-async def update_budget(budget_id: UUID, budget_data: BudgetUpdate, db: Session = Depends(get_db)):
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+from app.schemas.budget import BudgetPatch, BudgetUpdate
+
+async def _write_budget(db: AsyncSession, budget_id: int, values: dict, version: int | None = None):
+    budget = await patch_row(db, Budget, BudgetOut, Budget.id == budget_id, values, version)
     if not budget:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
-    
-    for key, value in budget_data.dict(exclude_unset=True).items():
-        setattr(budget, key, value)
 
-    db.commit()
-    db.refresh(budget)
+    await record_changes(db, budget["trip_id"], "budget", "upsert", [budget_id])
+    await db.commit()
+    await publish_change(budget["trip_id"], "budget", "upsert", [budget_id])
     return budget
 
-@router.delete("/budget/{budget_id}")
-async def delete_budget(budget_id: UUID, db: Session = Depends(get_db)):
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+@router.put(
+    "/budget/{budget_id}", response_model=BudgetOut, dependencies=[Depends(trip_writer(Budget, "budget_id"))],
+)
+async def update_budget(budget_id: int, budget_data: BudgetUpdate, db: AsyncSession = Depends(get_db)):
+    return await _write_budget(db, budget_id, budget_data.model_dump(exclude_unset=True))
+
+# Change only the fields sent; 409 if the entry moved past the client's version
+@router.patch(
+    "/budget/{budget_id}", response_model=BudgetOut, dependencies=[Depends(trip_writer(Budget, "budget_id"))],
+)
+async def patch_budget(budget_id: int, patch: BudgetPatch, db: AsyncSession = Depends(get_db)):
+    return await _write_budget(db, budget_id, patch.changes(), patch.version)
+
+@router.delete("/budget/{budget_id}", dependencies=[Depends(trip_writer(Budget, "budget_id"))])
+async def delete_budget(budget_id: int, db: AsyncSession = Depends(get_db)):
+    budget = await db.get(Budget, budget_id)
     if not budget:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
 
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await record_changes(db, budget.trip_id, "budget", "delete", [budget_id])
+    await db.commit()
+    await publish_change(budget.trip_id, "budget", "delete", [budget_id])
     return {"detail": "Budget deleted successfully"}
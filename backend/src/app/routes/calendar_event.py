@@ -1,46 +1,178 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.calendar_event import CalendarEvent, CalendarEventCreate
-from app.services.calendar_event import create_event, get_events, get_event, delete_event
-from app.dependencies import get_db, get_current_user
+from contextlib import aclosing
+from datetime import date, datetime, time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.http_cache import collection_etag, collection_validators, not_modified
+from app.core.ical import ICalendarError, iter_vevents
+from app.models.calendar_event import CalendarEvent as CalendarEventModel
+from app.core.pagination import PageParams, page_params, set_next_cursor
+from app.core.config import get_settings
+from app.core.responses import StreamFormat, calendar_response, rows_response, stream_rows_response
+from app.schemas.user import Principal
+from app.schemas.calendar_event import CalendarEvent, CalendarEventCreate, CalendarEventCreated
+from app.schemas.calendar_view import DayBucket, FreeBusy
+from app.schemas.conflict import Conflict
+from app.services.calendar_view import check_range, get_days, get_freebusy
+from app.services.conflicts import find_event_conflicts, iter_user_conflicts
+from app.services.calendar_event import (
+    create_event, delete_event, event_ics_query, event_rows_query, event_to_vevent, events_query,
+    get_event, get_events, import_events,
+)
+from app.services.collaborators import check_write_access
+from app.dependencies import get_db, get_current_user, get_sessionmaker
 
 router = APIRouter()
 
-@router.post("/events/", response_model=CalendarEvent)
-def create_calendar_event(
+@router.post("/events/", response_model=CalendarEventCreated)
+async def create_calendar_event(
     event: CalendarEventCreate,
-    db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    return create_event(db, event, user_id)
+    db_event = await create_event(db, event, current_user.id)
+    conflicts = await find_event_conflicts(
+        db, current_user.id, db_event.start_date, db_event.end_date, exclude_id=db_event.id
+    )
+    return CalendarEventCreated.model_validate(db_event).model_copy(update={"conflicts": conflicts})
+
+
+# Overlapping events and too-close itinerary items, found in one sweep
+@router.get("/users/me/conflicts", response_model=List[Conflict])
+async def read_conflicts(
+    limit: int = Query(500, ge=1, le=5000),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    sessionmaker=Depends(get_sessionmaker),
+    current_user: Principal = Depends(get_current_user)
+):
+    conflicts = []
+    pairs = iter_user_conflicts(
+        sessionmaker, current_user.id, date_from, date_to, batch_size=get_settings().STREAM_BATCH_SIZE
+    )
+    async with aclosing(pairs):
+        async for conflict in pairs:
+            conflicts.append(conflict)
+            if len(conflicts) >= limit:
+                break
+    return conflicts
 
 
 @router.get("/events/", response_model=List[CalendarEvent])
-def read_calendar_events(
-    db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user)
+async def read_calendar_events(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    trip_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    etag = await collection_etag(
+        db, events_query(current_user.id, date_from, date_to, trip_id), CalendarEventModel, page
+    )
+    if cached := not_modified(request, response, etag):
+        return cached
+    events = await get_events(
+        db, current_user.id, page=page, date_from=date_from, date_to=date_to, trip_id=trip_id
+    )
+    set_next_cursor(response, events)
+    return rows_response(events.items, response)
+
+# Every matching event in one response, streamed from a server-side cursor
+@router.get("/events/stream", response_model=List[CalendarEvent])
+async def stream_calendar_events(
+    fmt: StreamFormat = Query("ndjson", alias="format"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    trip_id: Optional[int] = None,
+    sessionmaker=Depends(get_sessionmaker),
+    current_user: Principal = Depends(get_current_user)
+):
+    stmt = event_rows_query(current_user.id, date_from, date_to, trip_id)
+    return stream_rows_response(sessionmaker, stmt, fmt, get_settings().STREAM_BATCH_SIZE)
+
+# Subscribable iCalendar feed of the current user's events
+@router.get("/events/export.ics", response_class=Response, responses={200: {"content": {"text/calendar": {}}}})
+async def export_calendar_events(
+    request: Request,
+    response: Response,
+    trip_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    sessionmaker=Depends(get_sessionmaker),
+    current_user: Principal = Depends(get_current_user)
+):
+    etag, last_modified = await collection_validators(
+        db, events_query(current_user.id, trip_id=trip_id), CalendarEventModel
+    )
+    if cached := not_modified(request, response, etag, last_modified):
+        return cached
+    return calendar_response(
+        sessionmaker, event_ics_query(current_user.id, trip_id), event_to_vevent, response,
+        batch_size=get_settings().STREAM_BATCH_SIZE,
+    )
+
+# Merged busy intervals between two times, optionally widened to a grid
+@router.get("/events/freebusy", response_model=FreeBusy)
+async def read_freebusy(
+    date_from: datetime = Query(..., alias="from"),
+    date_to: datetime = Query(..., alias="to"),
+    granularity: Optional[int] = Query(None, ge=1, le=1440, description="Grid size in minutes"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    start, end = check_range(date_from, date_to)
+    return await get_freebusy(db, current_user.id, start, end, granularity)
+
+# Per-day event lists and busy time for month and week views; 'to' is exclusive
+@router.get("/events/days", response_model=List[DayBucket])
+async def read_event_days(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    check_range(datetime.combine(date_from, time()), datetime.combine(date_to, time()))
+    return await get_days(db, current_user.id, date_from, date_to)
+
+# Import a .ics body, parsed and inserted batch by batch as it is received
+@router.post("/events/import.ics")
+async def import_calendar_events(
+    request: Request,
+    trip_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    return get_events(db, user_id)
+    if trip_id is not None:
+        await check_write_access(db, trip_id, current_user.id, open_unshared=False)
+    try:
+        return await import_events(
+            db, current_user.id, iter_vevents(request.stream()), trip_id=trip_id,
+            batch_size=get_settings().STREAM_BATCH_SIZE,
+        )
+    except ICalendarError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
 
 @router.get("/events/{event_id}", response_model=CalendarEvent)
-def read_calendar_event(
+async def read_calendar_event(
     event_id: int,
-    db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    db_event = get_event(db, event_id, user_id)
+    db_event = await get_event(db, event_id, current_user.id)
     if db_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return db_event
 
 @router.delete("/events/{event_id}")
-def delete_calendar_event(
+async def delete_calendar_event(
     event_id: int,
-    db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    success = delete_event(db, event_id, user_id)
+    success = await delete_event(db, event_id, current_user.id)
     if not success:
         raise HTTPException(status_code=404, detail="Event not found")
     return {"detail": "Event deleted"}
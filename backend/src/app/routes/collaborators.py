@@ -0,0 +1,111 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
+from jwt import InvalidTokenError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tokens import token_service
+from app.dependencies import get_current_user, get_db, get_sessionmaker
+from app.schemas.collaboration import CollaboratorAdd, CollaboratorOut
+from app.schemas.user import Principal
+from app.services.realtime import subscribe_trip
+from app.services.user import get_principal, get_user_by_username
+import app.services.collaborators as collaborator_service
+
+router = APIRouter()
+
+
+async def _require_access(db: AsyncSession, trip_id: int, user_id: int) -> str:
+    role = await collaborator_service.trip_role(db, trip_id, user_id)
+    if role is None:
+        # Trips the user cannot see are reported as missing
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with ID {trip_id} not found")
+    return role
+
+# People a trip is shared with
+@router.get("/trips/{trip_id}/collaborators", response_model=list[CollaboratorOut])
+async def get_collaborators(
+    trip_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await _require_access(db, trip_id, current_user.id)
+    return await collaborator_service.list_collaborators(db, trip_id)
+
+# Share a trip, or change a collaborator's role; owner only
+@router.post("/trips/{trip_id}/collaborators", response_model=CollaboratorOut)
+async def add_collaborator(
+    trip_id: int,
+    collaborator: CollaboratorAdd,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if await _require_access(db, trip_id, current_user.id) != "owner":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the trip's owner can share it")
+    user = await get_user_by_username(db, username=collaborator.username)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if user.id == current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The owner cannot be a collaborator")
+    return await collaborator_service.add_collaborator(db, trip_id, user.id, collaborator.role.value)
+
+# Stop sharing a trip with someone; the owner, or collaborators leaving themselves
+@router.delete("/trips/{trip_id}/collaborators/{user_id}")
+async def remove_collaborator(
+    trip_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    role = await _require_access(db, trip_id, current_user.id)
+    if role != "owner" and user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the trip's owner can remove others")
+    if not await collaborator_service.remove_collaborator(db, trip_id, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collaborator not found")
+    return {"detail": "Collaborator removed"}
+
+
+async def _watch_disconnect(websocket: WebSocket, subscription):
+    # Clients have nothing to say; reading only notices when they leave
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        subscription.close()
+
+# Live change events for a trip, for its owner and collaborators.
+# Browsers cannot set headers on a WebSocket, so the access token comes in ?token=.
+@router.websocket("/trips/{trip_id}/live")
+async def trip_live(websocket: WebSocket, trip_id: int, token: str = "", sessionmaker=Depends(get_sessionmaker)):
+    try:
+        username = token_service.decode(token)["sub"]
+    except (InvalidTokenError, KeyError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    async with sessionmaker() as db:
+        principal = await get_principal(db, username=username)
+        role = principal and await collaborator_service.trip_role(db, trip_id, principal.id)
+    if not role:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    # Subscribed before accepting, so nothing written after the handshake is missed
+    subscription = subscribe_trip(trip_id)
+    await websocket.accept()
+    watcher = asyncio.create_task(_watch_disconnect(websocket, subscription))
+    try:
+        while batch := await subscription.next_batch():
+            # Each send waits for the client; changes arriving meanwhile coalesce in the subscription
+            await websocket.send_json(batch)
+            if any(change.get("kind") == "trips" and change["op"] == "delete" for change in batch):
+                await websocket.close()
+                break
+            if any(
+                change.get("kind") == "collaborations" and change["op"] == "delete" and principal.id in change["ids"]
+                for change in batch
+            ):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                break
+    finally:
+        subscription.close()
+        watcher.cancel()
@@ -1,55 +1,79 @@
 # ✅ Full FastAPI Dates Router — Linked to `trip_id`
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.http_cache import not_modified, row_etag
 from app.models.dates import Dates
-from app.schemas.dates import DatesCreate, DatesRead
-from app.dependencies import get_db
+from app.schemas.dates import DatesCreate, DatesPatch, DatesRead
+from app.dependencies import get_db, trip_writer
+from app.services.changes import record_changes
+from app.services.patch import patch_row
+from app.services.realtime import publish_change
 
 router = APIRouter(
     prefix="",
     tags=["Dates"]
 )
 
+
+async def _get_trip_dates(db: AsyncSession, trip_id: int):
+    result = await db.execute(select(Dates).filter(Dates.trip_id == trip_id))
+    return result.scalars().first()
+
 # ✅ Get date range for a specific trip
 @router.get("/trips/{trip_id}/dates", response_model=DatesRead)
-def get_dates(trip_id: int, db: Session = Depends(get_db)):
-    dates = db.query(Dates).filter(Dates.trip_id == trip_id).first()
+async def get_dates(trip_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    dates = await _get_trip_dates(db, trip_id)
     if not dates:
         raise HTTPException(status_code=404, detail="No dates found")
+    if cached := not_modified(request, response, row_etag(dates)):
+        return cached
     return dates
 
 # ✅ Create date range for a trip
-@router.post("/trips/{trip_id}/dates", response_model=DatesRead)
-def create_dates(trip_id: int, payload: DatesCreate, db: Session = Depends(get_db)):
-    existing = db.query(Dates).filter(Dates.trip_id == trip_id).first()
+@router.post("/trips/{trip_id}/dates", response_model=DatesRead, dependencies=[Depends(trip_writer())])
+async def create_dates(trip_id: int, payload: DatesCreate, db: AsyncSession = Depends(get_db)):
+    existing = await _get_trip_dates(db, trip_id)
     if existing:
         raise HTTPException(status_code=400, detail="Trip already has a date range")
 
-    dates = Dates(**payload.dict(), trip_id=trip_id)
+    dates = Dates(**payload.model_dump(), trip_id=trip_id)
     db.add(dates)
-    db.commit()
-    db.refresh(dates)
+    await db.flush()
+    await record_changes(db, trip_id, "dates", "upsert", [dates.id])
+    await db.commit()
+    await db.refresh(dates)
+    await publish_change(trip_id, "dates", "upsert", [dates.id])
     return dates
 
-# ✅ Update an existing date entry by trip ID
-@router.put("/trips/{trip_id}/dates", response_model=DatesRead)
-def update_dates(trip_id: int, update: DatesCreate, db: Session = Depends(get_db)):
-    dates = db.query(Dates).filter(Dates.trip_id == trip_id).first()
+async def _write_dates(db: AsyncSession, trip_id: int, values: dict, version: int | None = None):
+    dates = await patch_row(db, Dates, DatesRead, Dates.trip_id == trip_id, values, version)
     if not dates:
         raise HTTPException(status_code=404, detail="Date entry not found")
-    for key, value in update.dict().items():
-        setattr(dates, key, value)
-    db.commit()
-    db.refresh(dates)
+    await record_changes(db, trip_id, "dates", "upsert", [dates["id"]])
+    await db.commit()
+    await publish_change(trip_id, "dates", "upsert", [dates["id"]])
     return dates
 
+# ✅ Update an existing date entry by trip ID
+@router.put("/trips/{trip_id}/dates", response_model=DatesRead, dependencies=[Depends(trip_writer())])
+async def update_dates(trip_id: int, update: DatesCreate, db: AsyncSession = Depends(get_db)):
+    return await _write_dates(db, trip_id, update.model_dump())
+
+# ✅ Change one end of the range; 409 if it moved past the client's version
+@router.patch("/trips/{trip_id}/dates", response_model=DatesRead, dependencies=[Depends(trip_writer())])
+async def patch_dates(trip_id: int, patch: DatesPatch, db: AsyncSession = Depends(get_db)):
+    return await _write_dates(db, trip_id, patch.changes(), patch.version)
+
 # ✅ Delete a date entry by internal date ID
-@router.delete("/dates/{date_id}")
-def delete_dates(date_id: int, db: Session = Depends(get_db)):
-    dates = db.query(Dates).filter(Dates.id == date_id).first()
+@router.delete("/dates/{date_id}", dependencies=[Depends(trip_writer(Dates, "date_id"))])
+async def delete_dates(date_id: int, db: AsyncSession = Depends(get_db)):
+    dates = await db.get(Dates, date_id)
     if not dates:
         raise HTTPException(status_code=404, detail="Date entry not found")
-    db.delete(dates)
-    db.commit()
+    await db.delete(dates)
+    await record_changes(db, dates.trip_id, "dates", "delete", [date_id])
+    await db.commit()
+    await publish_change(dates.trip_id, "dates", "delete", [date_id])
     return {"message": f"Date entry {date_id} deleted"}
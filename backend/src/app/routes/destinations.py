@@ -1,62 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.schemas.destinations import DestinationCreate, DestinationResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.http_cache import not_modified, page_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, page_params, set_next_cursor
+from app.core.responses import rows_response
+from app.dependencies import get_current_user, get_db, trip_writer
+from app.schemas.destinations import (
+    DestinationCreate, DestinationNearby, DestinationPatch, DestinationResponse, RouteOptimization,
+    RouteOptimizeRequest,
+)
+from app.schemas.user import Principal
 from app.models.destinations import Destinations
+from app.models.trips import Trips
+from app.schemas.bulk import BatchRequest, BatchResult
+from app.services.bulk import apply_batch
+import app.services.destinations as destination_service
 
 router = APIRouter()
 
 @router.get("/trips/{trip_id}/destinations", response_model=list[DestinationResponse])
-def get_trip_destinations(trip_id: int, db: Session = Depends(get_db)):
-    destinations = db.query(Destinations).filter(Destinations.trip_id == trip_id).all()
+async def get_trip_destinations(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_db),
+):
+    destinations = await destination_service.get_destinations_by_trip(trip_id, db, page=page)
+    if cached := not_modified(request, response, page_etag("destinations", page, destinations)):
+        return cached
 
-    if not destinations:
+    if not destinations.items and not page.cursor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No destinations found for trip {trip_id}"
         )
 
-    return destinations
+    set_next_cursor(response, destinations)
+    return rows_response(destinations.items, response)
 
-@router.post("/trips/{trip_id}/destinations", response_model=DestinationResponse)
-def create_trip_destination(
+@router.post(
+    "/trips/{trip_id}/destinations", response_model=DestinationResponse, dependencies=[Depends(trip_writer())],
+)
+async def create_trip_destination(
     trip_id: int,
     destination_data: DestinationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    from app.models.trips import Trips  # make sure this is imported
-    trip = db.query(Trips).get(trip_id)
+    trip = await db.get(Trips, trip_id)
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Trip with ID {trip_id} not found"
         )
 
-    destination = Destinations(**destination_data.dict(), trip_id=trip_id)
-    db.add(destination)
-    db.commit()
-    db.refresh(destination)
-    return destination
+    return await destination_service.create_trip_destination(trip_id, destination_data, db)
+
+@router.post(
+    "/trips/{trip_id}/destinations/batch",
+    response_model=BatchResult[DestinationResponse],
+    dependencies=[Depends(trip_writer())],
+)
+async def batch_trip_destinations(
+    trip_id: int,
+    batch: BatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    trip = await db.get(Trips, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trip with ID {trip_id} not found"
+        )
+
+    return await apply_batch(db, Destinations, trip_id, DestinationCreate, batch)
+
+# Reorder the trip's destinations into a short visiting route and save that order
+@router.post(
+    "/trips/{trip_id}/destinations/optimize",
+    response_model=RouteOptimization,
+    dependencies=[Depends(trip_writer())],
+)
+async def optimize_trip_destinations(
+    trip_id: int,
+    options: RouteOptimizeRequest = RouteOptimizeRequest(),
+    db: AsyncSession = Depends(get_db)
+):
+    trip = await db.get(Trips, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trip with ID {trip_id} not found"
+        )
+
+    return await destination_service.optimize_route(db, trip_id, options)
+
+# The current user's destinations within radius km of a point, nearest first
+@router.get("/destinations/nearby", response_model=list[DestinationNearby])
+async def get_nearby_destinations(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(..., gt=0, le=destination_service.NEARBY_MAX_RADIUS_KM, description="Kilometres"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    trip_id: int | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    destinations = await destination_service.nearby_destinations(
+        db, current_user.id, lat, lon, radius, limit, trip_id=trip_id
+    )
+    return rows_response(destinations, response)
 
 @router.get("/destinations/{destination_id}")
-def get_destination(destination_id: int, db: Session = Depends(get_db)):
-    destinations = db.query(Destinations).get(destination_id)
+async def get_destination(destination_id: int, db: AsyncSession = Depends(get_db)):
+    destinations = await destination_service.get_destination(destination_id, db)
 
     if not destinations:
         raise HTTPException(
             status_code = status.HTTP_404_NOT_FOUND,
-            detail = f"Destination for {trip_id} not found")
+            detail = f"Destination with ID {destination_id} not found")
 
     return destinations
 
 
-@router.put("/destinations/{destination_id}", response_model=DestinationResponse)
-def update_destination(
+@router.put(
+    "/destinations/{destination_id}",
+    response_model=DestinationResponse,
+    dependencies=[Depends(trip_writer(Destinations, "destination_id"))],
+)
+async def update_destination(
     destination_id: int,
     destination_data: DestinationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    destinations = db.query(Destinations).get(destination_id)
+    destinations = await destination_service.update_destination(destination_id, destination_data, db)
 
     if not destinations:
         raise HTTPException(
@@ -64,26 +141,35 @@ def update_destination(
             detail=f"Destination with ID {destination_id} not found"
         )
 
-    for key, value in destination_data.dict().items():
-        setattr(destinations, key, value)
+    return destinations
 
-    db.commit()
-    db.refresh(destinations)
+# Change only the fields sent; 409 if the destination moved past the client's version
+@router.patch(
+    "/destinations/{destination_id}",
+    response_model=DestinationResponse,
+    dependencies=[Depends(trip_writer(Destinations, "destination_id"))],
+)
+async def patch_destination(destination_id: int, patch: DestinationPatch, db: AsyncSession = Depends(get_db)):
+    destination = await destination_service.patch_destination(destination_id, patch, db)
 
-    return destinations
+    if not destination:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Destination with ID {destination_id} not found"
+        )
 
+    return destination
 
 
-@router.delete("/destinations/{destination_id}")
-def delete_destination(destination_id: int, db: Session = Depends(get_db)):
-    destinations = db.query(Destinations).get(destination_id)
+@router.delete(
+    "/destinations/{destination_id}", dependencies=[Depends(trip_writer(Destinations, "destination_id"))],
+)
+async def delete_destination(destination_id: int, db: AsyncSession = Depends(get_db)):
+    destinations = await destination_service.delete_destination(destination_id, db)
 
     if not destinations:
         raise HTTPException(
             status_code = status.HTTP_404_NOT_FOUND,
-            detail = f"Destination for {trip_id} not found")
-
-    db.delete(destinations)
-    db.commit()
+            detail = f"Destination with ID {destination_id} not found")
 
     return None
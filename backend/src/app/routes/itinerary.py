@@ -1,8 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.http_cache import collection_validators, not_modified, page_etag
+from app.core.pagination import PageParams, page_params, set_next_cursor
+from app.core.responses import calendar_response, rows_response
 from app.models.itinerary import Itinerary
-from app.schemas.itinerary import ItineraryCreate, ItineraryRead
-from app.dependencies import get_db
+from app.schemas.itinerary import (
+    ItineraryCreate, ItineraryCreated, ItineraryPatch, ItineraryRead, ScheduleRequest, ScheduleResult,
+)
+from app.services.conflicts import find_itinerary_conflicts
+from app.dependencies import get_db, get_sessionmaker, trip_writer
+from app.models.trips import Trips
+import app.services.itinerary as itinerary_service
+from app.services.read_cache import invalidate_trip
+from app.services.changes import record_changes
+from app.services.patch import patch_row
+from app.services.realtime import publish_change
+from app.services.geocoding import drop_stale_coordinates, locate
+from app.services.search import index_rows, unindex_rows
+from app.schemas.bulk import BatchRequest, BatchResult
+from app.services.bulk import apply_batch
 
 # Set up FastAPI router for itinerary-related endpoints
 router = APIRouter(
@@ -12,36 +30,127 @@ router = APIRouter(
 
 # Get all itinerary items for a specific trip
 @router.get("/trips/{trip_id}/itinerary", response_model=list[ItineraryRead])
-def get_trip_itinerary(trip_id: int, db: Session = Depends(get_db)):
-    return db.query(Itinerary).filter(Itinerary.trip_id == trip_id).all()
+async def get_trip_itinerary(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    time_from: datetime | None = Query(None, alias="from"),
+    time_to: datetime | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_db),
+):
+    items = await itinerary_service.get_itineraries_by_trip(
+        db, trip_id, page=page, time_from=time_from, time_to=time_to
+    )
+    if cached := not_modified(request, response, page_etag("itineraries", page, items)):
+        return cached
+    set_next_cursor(response, items)
+    return rows_response(items.items, response)
+
+# A trip's itinerary as an iCalendar file
+@router.get("/trips/{trip_id}/itinerary.ics", response_class=Response, responses={200: {"content": {"text/calendar": {}}}})
+async def export_trip_itinerary(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    sessionmaker=Depends(get_sessionmaker),
+):
+    trip = await db.get(Trips, trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    etag, last_modified = await collection_validators(
+        db, itinerary_service.itineraries_query(trip_id), Itinerary
+    )
+    if cached := not_modified(request, response, etag, last_modified):
+        return cached
+    return calendar_response(
+        sessionmaker, itinerary_service.itinerary_ics_query(trip_id), itinerary_service.itinerary_to_vevent,
+        response, name=trip.title, batch_size=get_settings().STREAM_BATCH_SIZE,
+    )
 
 # Create a new itinerary item for a trip
-@router.post("/trips/{trip_id}/itinerary", response_model=ItineraryRead)
-def create_itinerary_event(trip_id: int, itinerary: ItineraryCreate, db: Session = Depends(get_db)):
-    event = Itinerary(**itinerary.dict(), trip_id=trip_id)
-    db.add(event)
-    db.commit()
-    db.refresh(event)
-    return event
+@router.post(
+    "/trips/{trip_id}/itinerary", response_model=ItineraryCreated, dependencies=[Depends(trip_writer())],
+)
+async def create_itinerary_event(trip_id: int, itinerary: ItineraryCreate, db: AsyncSession = Depends(get_db)):
+    item = await itinerary_service.create_itinerary(db, itinerary, trip_id)
+    conflicts = await find_itinerary_conflicts(db, trip_id, item.time, exclude_id=item.id)
+    return ItineraryCreated.model_validate(item).model_copy(update={"conflicts": conflicts})
+
+# Create, update and delete many itinerary items in one transaction
+@router.post(
+    "/trips/{trip_id}/itinerary/batch",
+    response_model=BatchResult[ItineraryRead],
+    dependencies=[Depends(trip_writer())],
+)
+async def batch_itinerary_events(trip_id: int, batch: BatchRequest, db: AsyncSession = Depends(get_db)):
+    return await apply_batch(db, Itinerary, trip_id, ItineraryCreate, batch)
+
+# Lay the trip's items out over its dates, around the owner's calendar, and save the times
+@router.post(
+    "/trips/{trip_id}/itinerary/schedule", response_model=ScheduleResult, dependencies=[Depends(trip_writer())],
+)
+async def schedule_trip_itinerary(
+    trip_id: int, options: ScheduleRequest = ScheduleRequest(), db: AsyncSession = Depends(get_db)
+):
+    trip = await db.get(Trips, trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return await itinerary_service.schedule_itinerary(db, trip, options)
 
 # Update an existing itinerary item
-@router.put("/itinerary/{event_id}", response_model=ItineraryRead)
-def update_itinerary_event(event_id: int, update: ItineraryCreate, db: Session = Depends(get_db)):
-    event = db.query(Itinerary).filter(Itinerary.id == event_id).first()
+@router.put(
+    "/itinerary/{event_id}",
+    response_model=ItineraryRead,
+    dependencies=[Depends(trip_writer(Itinerary, "event_id"))],
+)
+async def update_itinerary_event(event_id: int, update: ItineraryCreate, db: AsyncSession = Depends(get_db)):
+    event = await db.get(Itinerary, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    for key, value in update.dict().items():
+    values = update.model_dump()
+    drop_stale_coordinates(values, event)
+    await locate(db, [values])
+    for key, value in values.items():
         setattr(event, key, value)
-    db.commit()
-    db.refresh(event)
+    event.version = Itinerary.version + 1
+    await db.flush()
+    await index_rows(db, Itinerary, [event_id])
+    await record_changes(db, event.trip_id, "itineraries", "upsert", [event_id])
+    await db.commit()
+    await db.refresh(event)
+    await invalidate_trip(event.trip_id)
+    await publish_change(event.trip_id, "itineraries", "upsert", [event_id])
+    return event
+
+# Change only the fields sent; 409 if the item moved past the client's version
+@router.patch(
+    "/itinerary/{event_id}",
+    response_model=ItineraryRead,
+    dependencies=[Depends(trip_writer(Itinerary, "event_id"))],
+)
+async def patch_itinerary_event(event_id: int, patch: ItineraryPatch, db: AsyncSession = Depends(get_db)):
+    event = await patch_row(db, Itinerary, ItineraryRead, Itinerary.id == event_id, patch.changes(), patch.version)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await index_rows(db, Itinerary, [event_id])
+    await record_changes(db, event["trip_id"], "itineraries", "upsert", [event_id])
+    await db.commit()
+    await invalidate_trip(event["trip_id"])
+    await publish_change(event["trip_id"], "itineraries", "upsert", [event_id])
     return event
 
 # Delete an itinerary item
-@router.delete("/itinerary/{event_id}")
-def delete_itinerary_event(event_id: int, db: Session = Depends(get_db)):
-    event = db.query(Itinerary).filter(Itinerary.id == event_id).first()
+@router.delete("/itinerary/{event_id}", dependencies=[Depends(trip_writer(Itinerary, "event_id"))])
+async def delete_itinerary_event(event_id: int, db: AsyncSession = Depends(get_db)):
+    event = await db.get(Itinerary, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    db.delete(event)
-    db.commit()
+    await db.delete(event)
+    await unindex_rows(db, Itinerary, [event_id])
+    await record_changes(db, event.trip_id, "itineraries", "delete", [event_id])
+    await db.commit()
+    await invalidate_trip(event.trip_id)
+    await publish_change(event.trip_id, "itineraries", "delete", [event_id])
     return {"message": f"Event {event_id} deleted"}
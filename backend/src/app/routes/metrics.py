@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.config import get_settings
+from app.core.database import async_engine, pool_status
+from app.dependencies import get_current_user
+from app.services.read_cache import read_cache
+from app.services.user import principal_cache
+
+
+def metrics_enabled():
+    if not get_settings().METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+# Internals are only exposed when switched on, and then only to signed-in users
+router = APIRouter(prefix="/metrics", dependencies=[Depends(metrics_enabled), Depends(get_current_user)])
+
+
+@router.get("/db")
+def database_pool_metrics():
+    return pool_status(async_engine.sync_engine)
+
+
+@router.get("/principal-cache")
+def principal_cache_metrics():
+    return principal_cache.stats()
+
+
+@router.get("/read-cache")
+def read_cache_metrics():
+    return read_cache.stats()
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.pagination import PageParams, page_params, set_next_cursor
+from app.core.responses import rows_response
+from app.dependencies import get_current_user, get_db
+from app.schemas.search import SearchKind, SearchResult
+from app.schemas.user import Principal
+from app.services import search as search_service
+
+router = APIRouter()
+
+# Prefix search over the current user's trips, destinations and itinerary items, best match first
+@router.get("/search", response_model=List[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[SearchKind] = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    results = await search_service.search(db, current_user.id, q, kind=kind, page=page)
+    set_next_cursor(response, results)
+    return rows_response(results.items, response)
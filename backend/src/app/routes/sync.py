@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import MAX_PAGE_SIZE
+from app.core.responses import rows_response
+from app.dependencies import get_current_user, get_db
+from app.schemas.sync import SyncBatch
+from app.schemas.user import Principal
+from app.services import changes as change_service
+
+router = APIRouter()
+
+# Rows changed since a cursor across the current user's own and shared trips.
+# Start from since=0 for a full copy; a trip first seen as an upsert without
+# its rows (newly shared with you) is best fetched whole from /trips/{id}/full.
+@router.get("/sync", response_model=SyncBatch)
+async def sync(
+    response: Response,
+    since: int = Query(0, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    batch = await change_service.get_changes(db, current_user.id, since, limit)
+    return rows_response(batch, response)
@@ -1,39 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.schemas.trips import Trip, TripCreate
+from datetime import datetime
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.http_cache import not_modified, row_etag
+from app.core.responses import StreamFormat, stream_rows_response
+from app.core.pagination import PageParams, page_params, set_next_cursor
+from app.dependencies import (
+    credentials_exception, get_db, get_optional_user, get_sessionmaker, trip_access, trip_writer,
+)
+from app.schemas.user import Principal
+from app.services.collaborators import OWNER_ROLES, READ_ROLES, trip_role
+from app.schemas.trips import Trip, TripClone, TripCreate, TripExpanded, TripFull, TripPatch
 import app.services.trips as trip
 
 router = APIRouter()
 
-@router.get("/users/{id}/trips", response_model=list[Trip])
-def get_user_trips(id: int, db: Session = Depends(get_db)):
-    return trip.get_user_trips(db, user_id=id)
+def parse_expand(
+    expand: str | None = Query(None, description="Comma-separated relationships to embed"),
+) -> tuple[str, ...]:
+    if not expand:
+        return ()
+    names = tuple(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+    unknown = [name for name in names if name not in trip.TRIP_RELATIONSHIPS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot expand {', '.join(unknown)}; choose from {', '.join(trip.TRIP_RELATIONSHIPS)}",
+        )
+    return names
+
+
+@router.get("/users/{id}/trips", response_model=list[TripExpanded], response_model_exclude_unset=True)
+async def get_user_trips(
+    id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    date_from: datetime | None = Query(None, alias="from"),
+    date_to: datetime | None = Query(None, alias="to"),
+    expand: tuple[str, ...] = Depends(parse_expand),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal | None = Depends(get_optional_user),
+):
+    # Collaborators and calendar events are only expanded for the trips' owner
+    if set(expand) & set(trip.PRIVATE_RELATIONSHIPS):
+        if current_user is None:
+            raise credentials_exception()
+        if current_user.id != id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Only the owner can expand {', '.join(trip.PRIVATE_RELATIONSHIPS)}",
+            )
+    trips = await trip.get_user_trips(
+        db, user_id=id, page=page, date_from=date_from, date_to=date_to, expand=expand
+    )
+    set_next_cursor(response, trips)
+    # Only read the eager-loaded relationships; touching the others would lazy-load
+    return [
+        {**Trip.model_validate(t).model_dump(), **{name: getattr(t, name) for name in expand}}
+        for t in trips.items
+    ]
+
+
+@router.get("/users/{id}/trips/stream", response_model=list[Trip])
+async def stream_user_trips(
+    id: int,
+    fmt: StreamFormat = Query("ndjson", alias="format"),
+    date_from: datetime | None = Query(None, alias="from"),
+    date_to: datetime | None = Query(None, alias="to"),
+    sessionmaker=Depends(get_sessionmaker),
+):
+    stmt = trip.trip_rows_query(id, date_from, date_to)
+    return stream_rows_response(sessionmaker, stmt, fmt, get_settings().STREAM_BATCH_SIZE)
+
+
+@router.get("/users/{id}/templates", response_model=list[Trip])
+async def get_user_templates(
+    id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_db),
+):
+    templates = await trip.get_user_templates(db, user_id=id, page=page)
+    set_next_cursor(response, templates)
+    return templates.items
 
 
 @router.post("/users/{id}/trips", response_model=Trip)
-def create_trip(id: int, trip_data: TripCreate, db: Session = Depends(get_db)):
-    return trip.create_user_trip(db, trip=trip_data, user_id=id)
+async def create_trip(id: int, trip_data: TripCreate, db: AsyncSession = Depends(get_db)):
+    return await trip.create_user_trip(db, trip=trip_data, user_id=id)
 
 
 
 @router.get("/trips/{trip_id}", response_model=Trip)
-def get_trip(trip_id: int, db: Session = Depends(get_db)):
-    db_trip = trip.get_trip_by_id(db, trip_id)
+async def get_trip(trip_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    db_trip = await trip.get_trip_by_id(db, trip_id)
+    if not db_trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if cached := not_modified(request, response, row_etag(db_trip, "trips")):
+        return cached
+    return db_trip
+
+# Calendar events and collaborators are left out for callers without a role on the trip
+@router.get("/trips/{trip_id}/full", response_model=TripFull, dependencies=[Depends(trip_access(READ_ROLES))])
+async def get_trip_full(
+    trip_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal | None = Depends(get_optional_user),
+):
+    role = current_user and await trip_role(db, trip_id, current_user.id)
+    names = tuple(name for name in trip.TRIP_RELATIONSHIPS if role or name not in trip.PRIVATE_RELATIONSHIPS)
+    db_trip = await trip.get_trip_full(db, trip_id, names)
+    if not db_trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    # Only read the eager-loaded relationships; touching the others would lazy-load
+    return {**Trip.model_validate(db_trip).model_dump(), **{name: getattr(db_trip, name) for name in names}}
+
+@router.post(
+    "/trips/{trip_id}/clone", response_model=Trip, status_code=201,
+    dependencies=[Depends(trip_access(READ_ROLES))],
+)
+async def clone_trip(
+    trip_id: int, options: TripClone = Body(default_factory=TripClone), db: AsyncSession = Depends(get_db)
+):
+    db_trip = await trip.clone_trip(db, trip_id, options)
+    if not db_trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return db_trip
+
+@router.put("/trips/{trip_id}", response_model=Trip, dependencies=[Depends(trip_writer())])
+async def update_trip(trip_id: int, trip_data: TripCreate, db: AsyncSession = Depends(get_db)):
+    db_trip = await trip.update_trip(db, trip_id, trip_data)
     if not db_trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return db_trip
 
-@router.put("/trips/{trip_id}", response_model=Trip)
-def update_trip(trip_id: int, trip_data: TripCreate, db: Session = Depends(get_db)):
-    db_trip = trip.update_trip(db, trip_id, trip_data)
+# Change only the fields sent; 409 if the trip moved past the client's version
+@router.patch("/trips/{trip_id}", response_model=Trip, dependencies=[Depends(trip_writer())])
+async def patch_trip(trip_id: int, patch: TripPatch, db: AsyncSession = Depends(get_db)):
+    db_trip = await trip.patch_trip(db, trip_id, patch)
     if not db_trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return db_trip
 
-@router.delete("/trips/{trip_id}")
-def delete_trip(trip_id: int, db: Session = Depends(get_db)):
-    db_trip = trip.delete_trip(db, trip_id)
+# Deleting takes every collaborator's events with it, so only the owner may
+@router.delete("/trips/{trip_id}", dependencies=[Depends(trip_access(OWNER_ROLES))])
+async def delete_trip(trip_id: int, db: AsyncSession = Depends(get_db)):
+    db_trip = await trip.delete_trip(db, trip_id)
     if not db_trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return {"message": f"Trip {trip_id} deleted successfully"}
@@ -7,26 +7,26 @@ from app.schemas.user import UserOut
 from app.schemas.user import UserResponse, UserCreate
 import app.services.user as user_service
 from app.dependencies import get_db, get_current_user
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from datetime import timedelta
-from app.models.user import User
+from app.schemas.user import Principal
 
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    new_user = user_service.create_user(db=db, user=user)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    new_user = await user_service.create_user(db=db, user=user)
     return new_user
 
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
-    user = user_service.authenticate_user(
+    user = await user_service.authenticate_user(
         db, username=form_data.username, password=form_data.password
     )
 
@@ -45,7 +45,7 @@ async def login_for_access_token(
 
 
 @router.get("/users/me")
-def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 
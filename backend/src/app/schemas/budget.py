@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
 from typing import Optional
 
+from app.schemas.patch import Patch
+
 class BudgetBase(BaseModel):
     amount: float
     currency: str
@@ -17,12 +19,47 @@ class BudgetCreate(BudgetBase):
 class BudgetUpdate(BudgetBase):
     pass
 
+# For changing some fields of an existing budget
+class BudgetPatch(Patch):
+    not_null = ("amount", "currency", "category")
+
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+
 # For reading from the database
 class BudgetOut(BudgetBase):
     id: int
     trip_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
+
+    model_config = {"from_attributes": True}
+
+# One GROUP BY (category, currency) row of a trip's budget
+class BudgetGroupTotal(BaseModel):
+    category: str
+    currency: str
+    total: float
+    count: int
+    converted_total: Optional[float] = None  # in the summary's base currency
+
+# Server-side rollup returned by GET /trips/{trip_id}/budget/summary
+class BudgetSummary(BaseModel):
+    trip_id: int
+    base_currency: str
+    total: float
+    by_category: dict[str, float]
+    groups: list[BudgetGroupTotal]
+    missing_rates: list[str] = []  # currencies left out of the converted totals
+
+class ExchangeRateUpdate(BaseModel):
+    units_per_usd: float = Field(..., gt=0)
+
+class ExchangeRateOut(ExchangeRateUpdate):
+    currency: str
+    updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = {"from_attributes": True}
@@ -0,0 +1,26 @@
+from typing import Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_ITEMS = 1000
+
+T = TypeVar("T")
+
+
+# Body of POST /trips/{trip_id}/<collection>/batch. Items are validated one by
+# one on the server so that every invalid item can be reported at once.
+class BatchRequest(BaseModel):
+    create: list[dict[str, Any]] = Field(default=[], max_length=MAX_BATCH_ITEMS)
+    update: list[dict[str, Any]] = Field(default=[], max_length=MAX_BATCH_ITEMS)  # each needs an "id"
+    delete: list[int] = Field(default=[], max_length=MAX_BATCH_ITEMS)
+
+class BatchItemError(BaseModel):
+    op: str  # "create", "update" or "delete"
+    index: int  # position of the item in its list
+    id: Optional[int] = None
+    detail: Any
+
+class BatchResult(BaseModel, Generic[T]):
+    created: list[T] = []
+    updated: list[T] = []
+    deleted: list[int] = []
@@ -2,11 +2,14 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+from app.schemas.conflict import ConflictItem
+
 class CalendarEventBase(BaseModel):
     title: str
     description: Optional[str] = None
     start_date: datetime
     end_date: datetime
+    trip_id: Optional[int] = None
 
 class CalendarEventCreate(CalendarEventBase):
     pass
@@ -15,5 +18,8 @@ class CalendarEvent(CalendarEventBase):
     id: int
     user_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = {"from_attributes": True}
+
+# Returned on create: the new event plus the events it overlaps
+class CalendarEventCreated(CalendarEvent):
+    conflicts: list[ConflictItem] = []
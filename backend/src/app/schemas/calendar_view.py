@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class BusyInterval(BaseModel):
+    start: datetime
+    end: datetime
+
+# Merged busy time of the current user's events within [start, end)
+class FreeBusy(BaseModel):
+    start: datetime
+    end: datetime
+    granularity_minutes: int | None = None
+    busy: list[BusyInterval]
+
+class DayEvent(BaseModel):
+    id: int
+    title: str
+    start: datetime
+    end: datetime
+
+# One calendar day of a month or week view; busy_seconds counts
+# overlapping events once
+class DayBucket(BaseModel):
+    day: date
+    event_count: int
+    busy_seconds: int
+    events: list[DayEvent]
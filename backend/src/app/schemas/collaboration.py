@@ -0,0 +1,24 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CollaboratorRole(str, Enum):
+    editor = "editor"
+    viewer = "viewer"
+
+
+class CollaboratorAdd(BaseModel):
+    username: str
+    role: CollaboratorRole = CollaboratorRole.editor
+
+
+class CollaboratorOut(BaseModel):
+    id: int
+    username: str
+    role: CollaboratorRole
+    created_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ConflictItem(BaseModel):
+    id: int
+    title: str
+    start: datetime
+    end: Optional[datetime] = None
+
+# Two calendar events that overlap, or two itinerary items of a trip
+# scheduled closer together than CONFLICT_ITINERARY_SLOT_MINUTES
+class Conflict(BaseModel):
+    kind: Literal["event", "itinerary"]
+    trip_id: Optional[int] = None
+    first: ConflictItem
+    second: ConflictItem
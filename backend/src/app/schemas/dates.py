@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from datetime import date
 
+from app.schemas.patch import Patch
+
 # Base schema with shared fields
 class DatesBase(BaseModel):
     start_date: date
@@ -10,9 +12,17 @@ class DatesBase(BaseModel):
 class DatesCreate(DatesBase):
     pass
 
+# Schema for moving one end of the range
+class DatesPatch(Patch):
+    not_null = ("start_date", "end_date")
+
+    start_date: date | None = None
+    end_date: date | None = None
+
 # Schema for reading date entries (includes ID and trip ID)
 class DatesRead(DatesBase):
     id: int
     trip_id: int
+    version: int
 
     model_config = {"from_attributes": True}  # enables ORM parsing
@@ -1,22 +1,54 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
 from typing import Optional
 
+from app.schemas.patch import Patch
+
 class DestinationBase(BaseModel):
     name: str
     location: str
     description: Optional[str] = None
     order: Optional[str] = None
+    # Resolved from location when omitted
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class DestinationCreate(DestinationBase):
     pass
 
+class DestinationPatch(Patch):
+    not_null = ("name", "location")
+
+    name: Optional[str] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    order: Optional[str] = None
+    # Re-resolved when the location changes without new coordinates
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
 class DestinationResponse(DestinationBase):
     id: int
     trip_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
+
+    model_config = {"from_attributes": True}
+
+class DestinationNearby(DestinationResponse):
+    distance_km: float
+
+class RouteOptimizeRequest(BaseModel):
+    # Pin the first and/or last stop of the route
+    start_id: Optional[int] = None
+    end_id: Optional[int] = None
+    time_limit_ms: int = Field(500, ge=1, le=5000)
 
-    class Config:
-        orm_mode = True
+class RouteOptimization(BaseModel):
+    distance_km: float
+    previous_distance_km: float
+    # Destinations without coordinates keep their relative order after the route
+    unrouted: list[int]
+    destinations: list[DestinationResponse]
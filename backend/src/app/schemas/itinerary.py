@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import datetime, time
+
+from app.schemas.conflict import ConflictItem
+from app.schemas.patch import Patch
 
 # Base schema shared across create and read
 class ItineraryBase(BaseModel):
@@ -7,14 +10,62 @@ class ItineraryBase(BaseModel):
     time: datetime
     description: str | None = None
     location: str | None = None
+    # Resolved from location when omitted
+    latitude: float | None = Field(None, ge=-90, le=90)
+    longitude: float | None = Field(None, ge=-180, le=180)
 
 # Schema for creating an itinerary (same fields as base)
 class ItineraryCreate(ItineraryBase):
     pass
 
+# Schema for a partial update (only the fields sent change)
+class ItineraryPatch(Patch):
+    not_null = ("name", "time")
+
+    name: str | None = None
+    time: datetime | None = None
+    description: str | None = None
+    location: str | None = None
+    latitude: float | None = Field(None, ge=-90, le=90)
+    longitude: float | None = Field(None, ge=-180, le=180)
+
 # Schema for reading an itinerary (includes ID and trip ID)
 class ItineraryRead(ItineraryBase):
     id: int
     trip_id: int
+    version: int
 
     model_config = {"from_attributes": True}  # allows ORM-style parsing
+
+# Returned on create: the new item plus the items scheduled too close to it
+class ItineraryCreated(ItineraryRead):
+    conflicts: list[ConflictItem] = []
+
+# Per-item scheduling hints; items left out use the request's defaults
+class ScheduleItem(BaseModel):
+    id: int
+    duration_minutes: int | None = Field(None, ge=1, le=24 * 60)
+    opens: time | None = None
+    closes: time | None = None
+    # Higher goes first when not everything fits
+    priority: int = 0
+    # Keep the current time and plan around it
+    fixed: bool = False
+
+class ScheduleRequest(BaseModel):
+    items: list[ScheduleItem] = []
+    day_start: time = time(9)
+    day_end: time = time(21)
+    default_duration_minutes: int = Field(60, ge=1, le=24 * 60)
+    # Travel between items with coordinates is distance over this speed
+    travel_speed_kmh: float = Field(30, gt=0, le=1000)
+    default_travel_minutes: int = Field(15, ge=0, le=24 * 60)
+    granularity_minutes: int = Field(5, ge=1, le=60)
+    avoid_calendar: bool = True
+    time_limit_ms: int = Field(100, ge=0, le=2000)
+
+class ScheduleResult(BaseModel):
+    items: list[ItineraryRead]
+    # Items that did not fit keep their previous time
+    unscheduled: list[int]
+    travel_minutes: int
@@ -0,0 +1,22 @@
+from typing import ClassVar
+
+from pydantic import BaseModel, model_validator
+
+
+# Body of a PATCH: only the fields sent are changed, and only if the row is
+# still at ``version``, the one the client last read
+class Patch(BaseModel):
+    version: int
+
+    # Fields that may be left out but not set to null
+    not_null: ClassVar[tuple[str, ...]] = ()
+
+    @model_validator(mode="after")
+    def _check_nulls(self):
+        nulls = [name for name in self.not_null if name in self.model_fields_set and getattr(self, name) is None]
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} cannot be null")
+        return self
+
+    def changes(self) -> dict:
+        return self.model_dump(exclude_unset=True, exclude={"version"})
@@ -0,0 +1,13 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+SearchKind = Literal["trip", "destination", "itinerary"]
+
+
+class SearchResult(BaseModel):
+    kind: SearchKind
+    id: int
+    trip_id: int
+    title: Optional[str] = None
+    rank: float
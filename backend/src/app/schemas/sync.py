@@ -0,0 +1,15 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+# One batch of GET /sync; rows are keyed by kind: trips, destinations, itineraries, budget, dates
+# and calendar_events (only events attached to a trip; the others are not synced)
+class SyncBatch(BaseModel):
+    # Send back as ?since= for the next batch
+    cursor: int
+    has_more: bool
+    # Current state of each changed row
+    upserts: dict[str, list[dict[str, Any]]]
+    # Ids of deleted rows; a deleted trip takes its rows with it
+    deletes: dict[str, list[int]]
@@ -1,9 +1,16 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
 from typing import Optional
-from uuid import UUID
+
+from app.schemas.budget import BudgetOut
+from app.schemas.calendar_event import CalendarEvent
+from app.schemas.dates import DatesRead
+from app.schemas.destinations import DestinationResponse
+from app.schemas.itinerary import ItineraryRead
+from app.schemas.patch import Patch
+from app.schemas.user import UserPublic
 
 
 
@@ -12,19 +19,59 @@ class TripBase(BaseModel):
     description: Optional[str] = None
     start_date: datetime
     end_date: datetime
+    base_currency: str = Field(default="USD", min_length=3, max_length=3)
 
-    class Config:
-        orm_mode = True
+    model_config = {"from_attributes": True}
 
 
 class TripCreate(TripBase):
     pass
 
 class Trip(TripBase):
-    id: UUID
+    id: int
     user_id: int
+    is_template: bool = False
     created_at: datetime
     updated_at: datetime
+    version: int
+
+    model_config = {"from_attributes": True}
+
+
+class TripPatch(Patch):
+    not_null = ("start_date", "end_date", "base_currency")
+
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    base_currency: Optional[str] = Field(default=None, min_length=3, max_length=3)
+
+
+# Body of POST /trips/{trip_id}/clone; every field is optional
+class TripClone(BaseModel):
+    title: Optional[str] = None
+    start_date: Optional[datetime] = None  # shifts every date in the copy by the same offset
+    user_id: Optional[int] = None  # owner of the copy, defaults to the source trip's owner
+    as_template: bool = False
+
+
+# Whole trip graph, as returned by GET /trips/{trip_id}/full; calendar events and
+# collaborators stay empty for callers without a role on the trip
+class TripFull(Trip):
+    destinations: list[DestinationResponse] = []
+    itineraries: list[ItineraryRead] = []
+    budgets: list[BudgetOut] = []
+    calendar_events: list[CalendarEvent] = []
+    dates: list[DatesRead] = []
+    collaborators: list[UserPublic] = []
+
 
-    class Config:
-        orm_mode = True
+# Trip with only the relationships requested through ?expand=
+class TripExpanded(Trip):
+    destinations: Optional[list[DestinationResponse]] = None
+    itineraries: Optional[list[ItineraryRead]] = None
+    budgets: Optional[list[BudgetOut]] = None
+    calendar_events: Optional[list[CalendarEvent]] = None
+    dates: Optional[list[DatesRead]] = None
+    collaborators: Optional[list[UserPublic]] = None
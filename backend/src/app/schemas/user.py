@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, constr, EmailStr, Field
 
 
@@ -17,8 +18,7 @@ class User(UserBase):
     email: EmailStr
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
 
 
 class UserResponse(BaseModel):
@@ -27,8 +27,7 @@ class UserResponse(BaseModel):
     email: EmailStr
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
 
 
 class UserOut(BaseModel):
@@ -36,5 +35,24 @@ class UserOut(BaseModel):
     username: str
     email: EmailStr
 
-    class Config:
-        orm_mode = True
+    model_config = {"from_attributes": True}
+
+
+# Another user as shown on a shared trip; no contact details
+class UserPublic(BaseModel):
+    id: int
+    username: str
+
+    model_config = {"from_attributes": True}
+
+
+# Lightweight, cacheable view of the authenticated user
+class Principal(BaseModel):
+    id: int
+    username: str
+    email: str
+    is_active: bool = True
+    is_verified: bool = True
+    created_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True, "frozen": True}
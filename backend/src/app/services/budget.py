@@ -0,0 +1,77 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.budget import Budget
+from app.models.exchange_rate import ExchangeRate
+from app.schemas.budget import BudgetGroupTotal, BudgetSummary
+from app.services.read_cache import RATES_NAMESPACE, read_cache
+
+
+async def get_exchange_rates(db: AsyncSession) -> dict[str, float]:
+    # The whole rate table is small, so it is cached as a single entry
+    async def load():
+        result = await db.execute(select(ExchangeRate.currency, ExchangeRate.units_per_usd))
+        rates = {currency.upper(): units for currency, units in result.all()}
+        rates.setdefault("USD", 1.0)
+        return rates
+
+    return await read_cache.get_or_load(RATES_NAMESPACE, "all", load)
+
+
+async def set_exchange_rate(db: AsyncSession, currency: str, units_per_usd: float):
+    currency = currency.upper()
+    rate = await db.get(ExchangeRate, currency)
+    if rate is None:
+        rate = ExchangeRate(currency=currency)
+        db.add(rate)
+    rate.units_per_usd = units_per_usd
+    await db.commit()
+    await db.refresh(rate)
+    await read_cache.invalidate(RATES_NAMESPACE)
+    return rate
+
+
+def convert(amount: float, currency: str, base_currency: str, rates: dict[str, float]):
+    """Convert between currencies through USD; ``None`` when a rate is unknown."""
+    source, target = rates.get(currency.upper()), rates.get(base_currency.upper())
+    if source is None or target is None:
+        return None
+    return amount / source * target
+
+
+async def get_budget_summary(db: AsyncSession, trip_id: int, base_currency: str) -> BudgetSummary:
+    stmt = (
+        select(
+            Budget.category,
+            Budget.currency,
+            func.sum(Budget.amount).label("total"),
+            func.count(Budget.id).label("count"),
+        )
+        .filter(Budget.trip_id == trip_id)
+        .group_by(Budget.category, Budget.currency)
+        .order_by(Budget.category, Budget.currency)
+    )
+    rows = (await db.execute(stmt)).all()
+    rates = await get_exchange_rates(db)
+
+    groups, by_category, missing = [], {}, set()
+    for category, currency, total, count in rows:
+        converted = convert(total, currency, base_currency, rates)
+        if converted is None:
+            missing.add(currency.upper())
+        else:
+            converted = round(converted, 2)
+            by_category[category] = round(by_category.get(category, 0.0) + converted, 2)
+        groups.append(BudgetGroupTotal(
+            category=category, currency=currency, total=round(total, 2), count=count,
+            converted_total=converted,
+        ))
+
+    return BudgetSummary(
+        trip_id=trip_id,
+        base_currency=base_currency.upper(),
+        total=round(sum(by_category.values()), 2),
+        by_category=by_category,
+        groups=groups,
+        missing_rates=sorted(missing),
+    )
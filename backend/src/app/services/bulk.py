@@ -0,0 +1,99 @@
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.bulk import BatchItemError, BatchRequest
+from app.services.geocoding import drop_stale_coordinates, locate
+from app.services.read_cache import invalidate_trip
+from app.services.changes import record_changes
+from app.services.realtime import publish_change
+from app.services.search import index_rows, unindex_rows
+
+
+def _validation_detail(exc: ValidationError):
+    return exc.errors(include_url=False, include_context=False, include_input=False)
+
+
+async def apply_batch(db: AsyncSession, model, trip_id: int, schema, batch: BatchRequest):
+    """Apply a batch of creates, updates and deletes to one trip's rows.
+
+    Every item is validated before anything is written. If any item fails,
+    nothing is written and a 422 lists each failure. Otherwise each kind of
+    write is one statement (multi-row INSERT ... RETURNING, executemany
+    UPDATE by primary key, DELETE ... WHERE id IN ... RETURNING), all in
+    one transaction.
+    """
+    errors = []
+
+    creates = []
+    for index, item in enumerate(batch.create):
+        try:
+            creates.append({**schema.model_validate(item).model_dump(), "trip_id": trip_id})
+        except ValidationError as exc:
+            errors.append(BatchItemError(op="create", index=index, detail=_validation_detail(exc)))
+
+    # One query finds every row the updates and deletes refer to
+    ids = {item.get("id") for item in batch.update if isinstance(item.get("id"), int)}
+    ids.update(batch.delete)
+    existing = {}
+    if ids:
+        result = await db.scalars(select(model).where(model.trip_id == trip_id, model.id.in_(ids)))
+        existing = {row.id: row for row in result}
+
+    updates = []
+    for index, item in enumerate(batch.update):
+        row_id = item.get("id")
+        if not isinstance(row_id, int) or row_id not in existing:
+            errors.append(BatchItemError(op="update", index=index, id=row_id, detail="Not found"))
+            continue
+        current = schema.model_validate(existing[row_id], from_attributes=True).model_dump()
+        changes = {key: value for key, value in item.items() if key != "id"}
+        try:
+            values = schema.model_validate({**current, **changes}).model_dump()
+            if "latitude" in values:
+                drop_stale_coordinates(values, existing[row_id])
+            updates.append({"id": row_id, **values})
+        except ValidationError as exc:
+            errors.append(BatchItemError(op="update", index=index, id=row_id, detail=_validation_detail(exc)))
+
+    for index, row_id in enumerate(batch.delete):
+        if row_id not in existing:
+            errors.append(BatchItemError(op="delete", index=index, id=row_id, detail="Not found"))
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[error.model_dump() for error in errors],
+        )
+
+    if "latitude" in model.__table__.c:
+        await locate(db, creates + updates)
+    created = list(await db.scalars(insert(model).returning(model), creates)) if creates else []
+    if updates:
+        await db.execute(update(model).values(version=model.version + 1), updates)
+    deleted = []
+    if batch.delete:
+        result = await db.scalars(
+            delete(model).where(model.id.in_(batch.delete)).returning(model.id)
+        )
+        deleted = list(result)
+    updated = []
+    if updates:
+        result = await db.scalars(
+            select(model)
+            .where(model.id.in_([values["id"] for values in updates]))
+            .order_by(model.id)
+            .execution_options(populate_existing=True)
+        )
+        updated = list(result)
+    await index_rows(db, model, [row.id for row in created] + [row.id for row in updated])
+    await unindex_rows(db, model, deleted)
+    kind = model.__tablename__
+    await record_changes(db, trip_id, kind, "upsert", [row.id for row in created] + [row.id for row in updated])
+    await record_changes(db, trip_id, kind, "delete", deleted)
+    await db.commit()
+    await invalidate_trip(trip_id)
+    await publish_change(trip_id, kind, "upsert", [row.id for row in created] + [row.id for row in updated])
+    await publish_change(trip_id, kind, "delete", deleted)
+    return {"created": created, "updated": updated, "deleted": deleted}
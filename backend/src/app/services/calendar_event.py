@@ -1,24 +1,170 @@
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import AsyncIterator
+from app.core import ical
+from app.core.pagination import PageParams, paginate
+from app.core.responses import schema_columns
 from app.models.calendar_event import CalendarEvent
-from app.schemas.calendar_event import CalendarEventCreate
+from app.schemas.calendar_event import CalendarEvent as CalendarEventRead, CalendarEventCreate
+from app.services.changes import record_changes
+from app.services.collaborators import check_write_access
+from app.services.read_cache import invalidate_calendar
+from app.services.realtime import publish_change
 
-def create_event(db: Session, event: CalendarEventCreate, user_id: int):
-    db_event = CalendarEvent(**event.dict(), user_id=user_id)
+async def create_event(db: AsyncSession, event: CalendarEventCreate, user_id: int):
+    # An event shows up in its trip's views and goes with it, so only people who edit the trip attach one
+    if event.trip_id is not None:
+        await check_write_access(db, event.trip_id, user_id, open_unshared=False)
+    db_event = CalendarEvent(**event.model_dump(), user_id=user_id)
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.flush()
+    if event.trip_id is not None:
+        await record_changes(db, event.trip_id, "calendar_events", "upsert", [db_event.id])
+    await db.commit()
+    await db.refresh(db_event)
+    await invalidate_calendar(user_id)
+    if event.trip_id is not None:
+        await publish_change(event.trip_id, "calendar_events", "upsert", [db_event.id])
     return db_event
 
-def get_events(db: Session, user_id: int):
-    return db.query(CalendarEvent).filter(CalendarEvent.user_id == user_id).all()
+def events_query(
+    user_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    trip_id: int | None = None,
+):
+    stmt = select(CalendarEvent).filter(CalendarEvent.user_id == user_id)
+    if date_from:
+        stmt = stmt.filter(CalendarEvent.start_date >= date_from)
+    if date_to:
+        stmt = stmt.filter(CalendarEvent.start_date < date_to)
+    if trip_id is not None:
+        stmt = stmt.filter(CalendarEvent.trip_id == trip_id)
+    return stmt
 
-def get_event(db: Session, event_id: int, user_id:int):
-    return db.query(CalendarEvent).filter(CalendarEvent.id == event_id, CalendarEvent.user_id == user_id).first()
+def event_rows_query(user_id: int, date_from=None, date_to=None, trip_id=None):
+    """Every matching event as plain columns, in list order, for streaming."""
+    return (
+        events_query(user_id, date_from, date_to, trip_id)
+        .with_only_columns(*schema_columns(CalendarEvent, CalendarEventRead))
+        .order_by(CalendarEvent.start_date.asc().nulls_first(), CalendarEvent.id)
+    )
 
-def delete_event(db: Session, event_id: int, user_id: int):
-    event = get_event(db, event_id, user_id)
+async def get_events(
+    db: AsyncSession,
+    user_id: int,
+    page: PageParams | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    trip_id: int | None = None,
+):
+    stmt = events_query(user_id, date_from, date_to, trip_id)
+    stmt = stmt.with_only_columns(*schema_columns(CalendarEvent, CalendarEventRead))
+    return await paginate(db, stmt, CalendarEvent.start_date, CalendarEvent.id, page or PageParams(), rows=True)
+
+async def get_event(db: AsyncSession, event_id: int, user_id:int):
+    result = await db.execute(
+        select(CalendarEvent).filter(CalendarEvent.id == event_id, CalendarEvent.user_id == user_id)
+    )
+    return result.scalars().first()
+
+async def delete_event(db: AsyncSession, event_id: int, user_id: int):
+    event = await get_event(db, event_id, user_id)
     if event:
-        db.delete(event)
-        db.commit()
+        trip_id = event.trip_id
+        await db.delete(event)
+        if trip_id is not None:
+            await record_changes(db, trip_id, "calendar_events", "delete", [event_id])
+        await db.commit()
+        await invalidate_calendar(user_id)
+        if trip_id is not None:
+            await publish_change(trip_id, "calendar_events", "delete", [event_id])
         return True
     return False
+
+
+def event_ics_query(user_id: int, trip_id: int | None = None):
+    return (
+        events_query(user_id, trip_id=trip_id)
+        .filter(CalendarEvent.start_date.is_not(None))
+        .with_only_columns(
+            CalendarEvent.id, CalendarEvent.title, CalendarEvent.description,
+            CalendarEvent.start_date, CalendarEvent.end_date, CalendarEvent.updated_at,
+        )
+        .order_by(CalendarEvent.start_date, CalendarEvent.id)
+    )
+
+def event_to_vevent(row: dict) -> str:
+    return ical.vevent(
+        uid=f"event-{row['id']}@waymark",
+        start=row["start_date"],
+        end=row["end_date"],
+        summary=row["title"],
+        description=row["description"],
+        stamp=row["updated_at"],
+    )
+
+def vevent_to_event(component: dict) -> CalendarEventCreate:
+    """Map a parsed VEVENT onto an event; a missing end falls back to DURATION or the start."""
+    def text(name):
+        return ical.unescape_text(component[name][1]) if name in component else None
+
+    if "DTSTART" not in component:
+        raise ical.ICalendarError("DTSTART is required")
+    start = ical.parse_datetime(component["DTSTART"][1], component["DTSTART"][0])
+    if "DTEND" in component:
+        end = ical.parse_datetime(component["DTEND"][1], component["DTEND"][0])
+    elif "DURATION" in component:
+        end = start + ical.parse_duration(component["DURATION"][1])
+    else:
+        end = start
+    return CalendarEventCreate(
+        title=text("SUMMARY"), description=text("DESCRIPTION"), start_date=start, end_date=end
+    )
+
+async def import_events(
+    db: AsyncSession,
+    user_id: int,
+    vevents: AsyncIterator[dict],
+    trip_id: int | None = None,
+    batch_size: int = 500,
+):
+    """Insert parsed VEVENTs ``batch_size`` rows at a time, in one transaction.
+
+    Events that cannot be mapped are skipped and reported by position.
+    Events imported into a trip are logged for sync by the ids each batch returns.
+    """
+    imported, errors, batch, index, trip_event_ids = 0, [], [], 0, []
+
+    async def flush_batch():
+        if trip_id is None:
+            await db.execute(insert(CalendarEvent), batch)
+        else:
+            ids = (await db.execute(insert(CalendarEvent).returning(CalendarEvent.id), batch)).scalars().all()
+            await record_changes(db, trip_id, "calendar_events", "upsert", ids)
+            trip_event_ids.extend(ids)
+
+    async for component in vevents:
+        try:
+            event = vevent_to_event(component)
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False, include_context=False, include_input=False)})
+        except ical.ICalendarError as exc:
+            errors.append({"index": index, "detail": str(exc)})
+        else:
+            batch.append({**event.model_dump(), "trip_id": trip_id, "user_id": user_id})
+        index += 1
+        if len(batch) >= batch_size:
+            await flush_batch()
+            imported += len(batch)
+            batch.clear()
+    if batch:
+        await flush_batch()
+        imported += len(batch)
+    await db.commit()
+    await invalidate_calendar(user_id)
+    if trip_event_ids:
+        await publish_change(trip_id, "calendar_events", "upsert", trip_event_ids)
+    return {"imported": imported, "errors": errors}
@@ -0,0 +1,114 @@
+from datetime import UTC, date, datetime, time, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.schemas.calendar_view import BusyInterval, DayBucket, DayEvent, FreeBusy
+from app.services.conflicts import event_overlap_query, longest_event_seconds
+from app.services.read_cache import calendar_namespace, read_cache
+
+settings = get_settings()
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time())
+
+
+def _as_stored(value: datetime) -> datetime:
+    """Event times are stored as naive UTC; aware inputs are converted to match."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def check_range(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """Validate a view range, converted to the naive UTC the events are stored in."""
+    start, end = _as_stored(start), _as_stored(end)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.CALENDAR_VIEW_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range is limited to {settings.CALENDAR_VIEW_MAX_DAYS} days",
+        )
+    return start, end
+
+
+async def overlapping_events(db: AsyncSession, user_id: int, start: datetime, end: datetime) -> list:
+    longest = await longest_event_seconds(db, user_id)
+    if longest is None:
+        return []
+    return list(await db.execute(event_overlap_query(user_id, start, end, longest)))
+
+
+def _snap(value: datetime, origin: datetime, step: timedelta, up: bool) -> datetime:
+    steps, rest = divmod(value - origin, step)
+    return origin + (steps + (1 if up and rest else 0)) * step
+
+
+def merge_busy(rows, start: datetime, end: datetime, step: timedelta | None = None) -> list[list[datetime]]:
+    """Union of the rows' ``[start_date, end_date)`` spans, clipped to ``[start, end)``.
+
+    ``rows`` must be ordered by start, so one pass merges them. With
+    ``step`` every span is first widened to a grid of that size aligned on
+    midnight of ``start``.
+    """
+    origin, merged = _midnight(start.date()), []
+    for row in rows:
+        low, high = row.start_date, row.end_date
+        if step:
+            low, high = _snap(low, origin, step, up=False), _snap(high, origin, step, up=True)
+        low, high = max(low, start), min(high, end)
+        if high <= low:
+            continue
+        if merged and low <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+
+def day_buckets(rows, first: date, last: date) -> list[DayBucket]:
+    """One bucket per day in ``[first, last)`` with the events touching it."""
+    start, end = _midnight(first), _midnight(last)
+    days = [first + timedelta(days=offset) for offset in range((last - first).days)]
+    buckets = {day: DayBucket(day=day, event_count=0, busy_seconds=0, events=[]) for day in days}
+    for row in rows:
+        item = DayEvent(id=row.id, title=row.title, start=row.start_date, end=row.end_date)
+        day = max(row.start_date, start).date()
+        # The end is exclusive: an event ending at midnight does not touch that day
+        last_day = max(day, (min(row.end_date, end) - timedelta(microseconds=1)).date())
+        while day <= last_day:
+            buckets[day].event_count += 1
+            buckets[day].events.append(item)
+            day += timedelta(days=1)
+    for low, high in merge_busy(rows, start, end):
+        while low < high:
+            boundary = _midnight(low.date() + timedelta(days=1))
+            buckets[low.date()].busy_seconds += int((min(high, boundary) - low).total_seconds())
+            low = boundary
+    return list(buckets.values())
+
+
+async def get_freebusy(
+    db: AsyncSession, user_id: int, start: datetime, end: datetime, granularity: int | None = None
+) -> FreeBusy:
+    async def load():
+        rows = await overlapping_events(db, user_id, start, end)
+        step = timedelta(minutes=granularity) if granularity else None
+        busy = [BusyInterval(start=low, end=high) for low, high in merge_busy(rows, start, end, step)]
+        return FreeBusy(start=start, end=end, granularity_minutes=granularity, busy=busy)
+
+    key = f"freebusy:{start.isoformat()}:{end.isoformat()}:{granularity}"
+    return await read_cache.get_or_load(calendar_namespace(user_id), key, load)
+
+
+async def get_days(db: AsyncSession, user_id: int, first: date, last: date) -> list[DayBucket]:
+    async def load():
+        rows = await overlapping_events(db, user_id, _midnight(first), _midnight(last))
+        return day_buckets(rows, first, last)
+
+    return await read_cache.get_or_load(
+        calendar_namespace(user_id), f"days:{first.isoformat()}:{last.isoformat()}", load
+    )
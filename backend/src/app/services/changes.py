@@ -0,0 +1,139 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, union, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import schema_columns
+from app.models.budget import Budget
+from app.models.calendar_event import CalendarEvent
+from app.models.change import Change
+from app.models.collaboration import collaborations
+from app.models.dates import Dates
+from app.models.destinations import Destinations
+from app.models.itinerary import Itinerary
+from app.models.trips import Trips
+from app.schemas.budget import BudgetOut
+from app.schemas.calendar_event import CalendarEvent as CalendarEventRead
+from app.schemas.dates import DatesRead
+from app.schemas.destinations import DestinationResponse
+from app.schemas.itinerary import ItineraryRead
+from app.schemas.trips import Trip
+
+# kind -> (model, schema of the synced row, column holding its trip id)
+SYNCED = {
+    "trips": (Trips, Trip, Trips.id),
+    "destinations": (Destinations, DestinationResponse, Destinations.trip_id),
+    "itineraries": (Itinerary, ItineraryRead, Itinerary.trip_id),
+    "budget": (Budget, BudgetOut, Budget.trip_id),
+    "dates": (Dates, DatesRead, Dates.trip_id),
+    # Only events attached to a trip; the rest are in no trip to sync them through
+    "calendar_events": (CalendarEvent, CalendarEventRead, CalendarEvent.trip_id),
+}
+
+# Postgres hands out sequence values when rows are inserted, not when they
+# commit, so a cursor could pass an id whose transaction is still open.
+# Holding this lock from the first logged change to the commit makes ids
+# become visible in order. SQLite already runs one writer at a time.
+CHANGE_LOG_LOCK = 0x5C4A46
+
+
+async def _lock_log(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK)))
+
+
+async def record_changes(
+    db: AsyncSession, trip_id: int, kind: str, op: str, ids, user_id: int | None = None
+):
+    """Log that rows of ``kind`` were upserted or deleted, in the caller's transaction.
+
+    Each row keeps only its latest entry. Pass ``user_id`` for entries
+    only that user should see.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    await _lock_log(db)
+    audience = Change.user_id.is_(None) if user_id is None else Change.user_id == user_id
+    await db.execute(
+        delete(Change).where(
+            Change.trip_id == trip_id, Change.kind == kind, Change.row_id.in_(ids), audience
+        )
+    )
+    await db.execute(insert(Change), [
+        {"trip_id": trip_id, "kind": kind, "row_id": row_id, "op": op, "user_id": user_id}
+        for row_id in ids
+    ])
+
+
+async def record_trip(db: AsyncSession, trip_id: int):
+    """Log a whole new trip, such as a clone, with one INSERT ... SELECT."""
+    await _lock_log(db)
+    now = literal(datetime.now(UTC), Change.created_at.type)
+    selects = [
+        select(trip_column, literal(kind), model.id, literal("upsert"), now).where(trip_column == trip_id)
+        for kind, (model, _, trip_column) in SYNCED.items()
+    ]
+    columns = [Change.trip_id, Change.kind, Change.row_id, Change.op, Change.created_at]
+    await db.execute(insert(Change).from_select(columns, union_all(*selects)))
+
+
+async def record_trip_deleted(db: AsyncSession, trip_id: int, user_ids):
+    """Replace everything logged for a trip with a tombstone for each user who could see it."""
+    await _lock_log(db)
+    await db.execute(delete(Change).where(Change.trip_id == trip_id))
+    await db.execute(insert(Change), [
+        {"trip_id": trip_id, "kind": "trips", "row_id": trip_id, "op": "delete", "user_id": user_id}
+        for user_id in user_ids
+    ])
+
+
+def _accessible_trips(user_id: int):
+    return union(
+        select(Trips.id).where(Trips.user_id == user_id),
+        select(collaborations.c.trip_id).where(collaborations.c.user_id == user_id),
+    )
+
+
+async def get_changes(db: AsyncSession, user_id: int, since: int, limit: int) -> dict:
+    """Rows changed after cursor ``since`` in trips ``user_id`` can see, oldest change first.
+
+    Upserts carry the current row, deletes only its id. Pass the returned
+    ``cursor`` as the next ``since``; ``has_more`` says another batch is
+    waiting.
+    """
+    stmt = (
+        select(Change.id, Change.kind, Change.row_id, Change.op)
+        .where(
+            Change.id > since,
+            or_(
+                and_(Change.user_id.is_(None), Change.trip_id.in_(_accessible_trips(user_id))),
+                Change.user_id == user_id,
+            ),
+        )
+        .order_by(Change.id)
+        .limit(limit + 1)
+    )
+    entries = list(await db.execute(stmt))
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # A row logged for everyone and for this user alone keeps its later op
+    latest = {}
+    for entry in entries:
+        latest[(entry.kind, entry.row_id)] = entry.op
+    upserts, deletes = {}, {}
+    for (kind, row_id), op in latest.items():
+        (upserts if op == "upsert" else deletes).setdefault(kind, []).append(row_id)
+    for kind, ids in upserts.items():
+        model, schema, _ = SYNCED[kind]
+        rows = await db.execute(
+            select(*schema_columns(model, schema)).where(model.id.in_(ids)).order_by(model.id)
+        )
+        upserts[kind] = [dict(row) for row in rows.mappings()]
+    return {
+        "cursor": entries[-1].id if entries else since,
+        "has_more": has_more,
+        "upserts": upserts,
+        "deletes": deletes,
+    }
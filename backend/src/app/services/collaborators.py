@@ -0,0 +1,106 @@
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collaboration import collaborations
+from app.models.trips import Trips
+from app.models.user import User
+from app.services.changes import record_changes
+from app.services.realtime import publish_change
+
+_COLUMNS = (User.id, User.username, collaborations.c.role, collaborations.c.created_at)
+
+
+async def trip_role(db: AsyncSession, trip_id: int, user_id: int) -> str | None:
+    """``"owner"``, the collaborator's role, or None when the user has no access to the trip."""
+    owner = await db.scalar(select(Trips.user_id).filter(Trips.id == trip_id))
+    if owner == user_id:
+        return "owner"
+    return await db.scalar(
+        select(collaborations.c.role).filter(
+            collaborations.c.trip_id == trip_id, collaborations.c.user_id == user_id
+        )
+    )
+
+
+READ_ROLES = ("owner", "editor", "viewer")
+WRITE_ROLES = ("owner", "editor")
+OWNER_ROLES = ("owner",)
+
+
+async def check_trip_access(
+    db: AsyncSession, trip_id: int, user_id: int | None, roles: tuple[str, ...], open_unshared: bool = True
+) -> None:
+    """Raise unless the user holds one of ``roles`` on a shared trip.
+
+    Trips that are not shared keep the open access the rest of the trip
+    routes have, unless ``open_unshared`` is False. Otherwise the caller
+    must be signed in (401), able to see the trip (404) and hold one of
+    ``roles`` (403).
+    """
+    role = None if user_id is None else await trip_role(db, trip_id, user_id)
+    if role in roles:
+        return
+    if open_unshared and not await db.scalar(select(exists().where(collaborations.c.trip_id == trip_id))):
+        return
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sign in to use a shared trip",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if role is None:
+        # Trips the user cannot see are reported as missing
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with ID {trip_id} not found")
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"A trip {role} cannot do this")
+
+
+async def check_write_access(
+    db: AsyncSession, trip_id: int, user_id: int | None, open_unshared: bool = True
+) -> None:
+    """Only the owner and editors change a shared trip; viewers get a 403."""
+    await check_trip_access(db, trip_id, user_id, WRITE_ROLES, open_unshared)
+
+
+async def list_collaborators(db: AsyncSession, trip_id: int):
+    result = await db.execute(
+        select(*_COLUMNS)
+        .join(collaborations, collaborations.c.user_id == User.id)
+        .filter(collaborations.c.trip_id == trip_id)
+        .order_by(collaborations.c.created_at, User.id)
+    )
+    return result.mappings().all()
+
+
+async def add_collaborator(db: AsyncSession, trip_id: int, user_id: int, role: str):
+    """Share the trip with ``user_id``, or change the role they already have."""
+    changed = await db.execute(
+        update(collaborations)
+        .where(collaborations.c.trip_id == trip_id, collaborations.c.user_id == user_id)
+        .values(role=role)
+    )
+    if not changed.rowcount:
+        await db.execute(collaborations.insert().values(trip_id=trip_id, user_id=user_id, role=role))
+        # The trip now syncs to them; it is new to their client
+        await record_changes(db, trip_id, "trips", "upsert", [trip_id], user_id=user_id)
+    await db.commit()
+    await publish_change(trip_id, "collaborations", "upsert", [user_id])
+    result = await db.execute(
+        select(*_COLUMNS)
+        .join(collaborations, collaborations.c.user_id == User.id)
+        .filter(collaborations.c.trip_id == trip_id, User.id == user_id)
+    )
+    return result.mappings().one()
+
+
+async def remove_collaborator(db: AsyncSession, trip_id: int, user_id: int) -> bool:
+    removed = await db.execute(
+        delete(collaborations)
+        .where(collaborations.c.trip_id == trip_id, collaborations.c.user_id == user_id)
+    )
+    if removed.rowcount:
+        await record_changes(db, trip_id, "trips", "delete", [trip_id], user_id=user_id)
+    await db.commit()
+    if removed.rowcount:
+        await publish_change(trip_id, "collaborations", "delete", [user_id])
+    return bool(removed.rowcount)
@@ -0,0 +1,172 @@
+import heapq
+from collections import deque
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.responses import iter_row_batches
+from app.models.calendar_event import DURATION_BUCKETS, CalendarEvent
+from app.models.itinerary import Itinerary
+from app.models.trips import Trips
+from app.schemas.conflict import Conflict, ConflictItem
+
+settings = get_settings()
+
+_EVENT_COLUMNS = (CalendarEvent.id, CalendarEvent.title, CalendarEvent.start_date, CalendarEvent.end_date)
+_ITINERARY_COLUMNS = (Itinerary.id, Itinerary.trip_id, Itinerary.name, Itinerary.time)
+
+
+def _slot() -> timedelta:
+    return timedelta(minutes=settings.CONFLICT_ITINERARY_SLOT_MINUTES)
+
+
+def _event_item(row) -> ConflictItem:
+    return ConflictItem(id=row.id, title=row.title, start=row.start_date, end=row.end_date)
+
+
+def _itinerary_item(row) -> ConflictItem:
+    return ConflictItem(id=row.id, title=row.name, start=row.time)
+
+
+def event_overlap_query(
+    user_id: int, start: datetime, end: datetime, longest: int, exclude_id: int | None = None
+):
+    """Events of ``user_id`` overlapping ``[start, end)``, in start order.
+
+    An overlapping event starts before ``end`` and, being no longer than its
+    duration bucket's bound, no earlier than ``start - bound``. Each bucket
+    up to the one holding the user's ``longest`` event is one range on
+    ``(user_id, duration_bucket, start_date)``, so a handful of multi-week
+    events only widen the scan over the longest bucket, not over every event.
+    """
+    branches = []
+    for bucket, bound in enumerate((*DURATION_BUCKETS, longest)):
+        if bucket and DURATION_BUCKETS[bucket - 1] >= longest:
+            break  # no event is this long
+        stmt = select(*_EVENT_COLUMNS).filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.duration_bucket == bucket,
+            CalendarEvent.start_date >= start - timedelta(seconds=min(bound, longest)),
+            CalendarEvent.start_date < end,
+            CalendarEvent.end_date > start,
+        )
+        if exclude_id is not None:
+            stmt = stmt.filter(CalendarEvent.id != exclude_id)
+        branches.append(stmt)
+    if len(branches) == 1:
+        return branches[0].order_by(CalendarEvent.start_date, CalendarEvent.id)
+    rows = union_all(*branches).subquery()
+    return select(rows).order_by(rows.c.start_date, rows.c.id)
+
+
+async def longest_event_seconds(db: AsyncSession, user_id: int) -> int | None:
+    return await db.scalar(
+        select(func.max(CalendarEvent.duration_seconds)).filter(CalendarEvent.user_id == user_id)
+    )
+
+
+async def find_event_conflicts(
+    db: AsyncSession, user_id: int, start: datetime, end: datetime, exclude_id: int | None = None
+) -> list[ConflictItem]:
+    """Events of ``user_id`` overlapping ``[start, end)``.
+
+    Index range scans per duration bucket (see :func:`event_overlap_query`):
+    O(log n + k) work, plus the events of the longest bucket that start
+    within its bound before ``start``.
+    """
+    if start is None or end is None:
+        return []
+    longest = await longest_event_seconds(db, user_id)
+    if longest is None:
+        return []
+    stmt = event_overlap_query(user_id, start, end, longest, exclude_id)
+    return [_event_item(row) for row in await db.execute(stmt)]
+
+
+async def find_itinerary_conflicts(
+    db: AsyncSession, trip_id: int, time: datetime, exclude_id: int | None = None
+) -> list[ConflictItem]:
+    """Items of the trip scheduled less than one slot before or after ``time``."""
+    slot = _slot()
+    stmt = (
+        select(*_ITINERARY_COLUMNS)
+        .filter(Itinerary.trip_id == trip_id, Itinerary.time > time - slot, Itinerary.time < time + slot)
+        .order_by(Itinerary.time, Itinerary.id)
+    )
+    if exclude_id is not None:
+        stmt = stmt.filter(Itinerary.id != exclude_id)
+    return [_itinerary_item(row) for row in await db.execute(stmt)]
+
+
+async def _event_pairs(batches: AsyncIterator[list[dict]]) -> AsyncIterator[Conflict]:
+    # Sweep in start order, keeping the events still running in a min-heap by end
+    active = []
+    async for batch in batches:
+        for row in batch:
+            while active and active[0][0] <= row["start_date"]:
+                heapq.heappop(active)
+            item = ConflictItem(id=row["id"], title=row["title"], start=row["start_date"], end=row["end_date"])
+            for _, _, other in sorted(active, key=lambda entry: (entry[2].start, entry[2].id)):
+                if other.start < item.end:
+                    yield Conflict(kind="event", first=other, second=item)
+            if row["end_date"] > row["start_date"]:
+                heapq.heappush(active, (row["end_date"], row["id"], item))
+
+
+async def _itinerary_pairs(batches: AsyncIterator[list[dict]]) -> AsyncIterator[Conflict]:
+    # Items arrive ordered by (trip_id, time); keep the ones within a slot of the current one
+    slot, window = _slot(), deque()
+    async for batch in batches:
+        for row in batch:
+            while window and (
+                window[0][0] != row["trip_id"] or window[0][1].start <= row["time"] - slot
+            ):
+                window.popleft()
+            item = ConflictItem(id=row["id"], title=row["name"], start=row["time"])
+            for _, other in window:
+                yield Conflict(kind="itinerary", trip_id=row["trip_id"], first=other, second=item)
+            window.append((row["trip_id"], item))
+
+
+async def iter_user_conflicts(
+    sessionmaker: async_sessionmaker,
+    user_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Conflict]:
+    """Every overlapping pair among the user's events and trip itineraries.
+
+    Both passes stream rows in start order from a server-side cursor and
+    sweep them once, so the cost is O(n log n + k) and memory is bounded by
+    the events running at the same time rather than by n.
+    """
+    events = (
+        select(*_EVENT_COLUMNS)
+        .filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.start_date.is_not(None),
+            CalendarEvent.end_date.is_not(None),
+        )
+        .order_by(CalendarEvent.start_date, CalendarEvent.id)
+    )
+    items = (
+        select(*_ITINERARY_COLUMNS)
+        .join(Trips, Trips.id == Itinerary.trip_id)
+        .filter(Trips.user_id == user_id, Trips.is_template.is_(False))
+        .order_by(Itinerary.trip_id, Itinerary.time, Itinerary.id)
+    )
+    if date_from:
+        events = events.filter(CalendarEvent.end_date > date_from)
+        items = items.filter(Itinerary.time >= date_from)
+    if date_to:
+        events = events.filter(CalendarEvent.start_date < date_to)
+        items = items.filter(Itinerary.time < date_to)
+
+    async for conflict in _event_pairs(iter_row_batches(sessionmaker, events, batch_size)):
+        yield conflict
+    async for conflict in _itinerary_pairs(iter_row_batches(sessionmaker, items, batch_size)):
+        yield conflict
@@ -1,40 +1,236 @@
-from sqlalchemy.orm import Session
-from app.models.destinations import Destination
-from app.schemas.destinations import DestinationCreate
+from datetime import UTC, datetime
 
-def get_destinations_by_trip(trip_id: int, db: Session):
-    return db.query(Destination).filter(Destination.trip_id == trip_id).all()
+from fastapi import HTTPException, status
+from sqlalchemy import column, func, select, table, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.pagination import PageParams, paginate
+from app.core.responses import schema_columns
+from app.core.geocoding import bounding_boxes, haversine_km
+from app.core.routing import distance_matrix, path_length, solve_path
+from app.core.solver_pool import run_in_solver_pool
+from app.models.destinations import Destinations
+from app.models.trips import Trips
+from app.schemas.destinations import (
+    DestinationCreate, DestinationPatch, DestinationResponse, RouteOptimizeRequest,
+)
+from app.services.geocoding import drop_stale_coordinates, locate
+from app.services.read_cache import invalidate_trip, read_cache, trip_namespace
+from app.services.changes import record_changes
+from app.services.patch import patch_row
+from app.services.realtime import publish_change
+from app.services.search import index_rows, unindex_rows
 
-def create_trip_destination(
+def destinations_query(trip_id: int):
+    return select(Destinations).filter(Destinations.trip_id == trip_id)
+
+async def get_destinations_by_trip(trip_id: int, db: AsyncSession, page: PageParams | None = None):
+    page = page or PageParams()
+
+    async def load():
+        stmt = destinations_query(trip_id).with_only_columns(
+            *schema_columns(Destinations, DestinationResponse)
+        )
+        return await paginate(db, stmt, Destinations.order, Destinations.id, page, rows=True)
+
+    return await read_cache.get_or_load(
+        trip_namespace(trip_id), f"destinations:{page.limit}:{page.cursor}", load
+    )
+
+async def create_trip_destination(
     trip_id: int,
     destination_data: DestinationCreate,
-    db: Session
+    db: AsyncSession
 ):
-    destination = Destination(**destination_data.dict(), trip_id=trip_id)
+    values = destination_data.model_dump()
+    await locate(db, [values])
+    destination = Destinations(**values, trip_id=trip_id)
     db.add(destination)
-    db.commit()
-    db.refresh(destination)
+    await db.flush()
+    await index_rows(db, Destinations, [destination.id])
+    await record_changes(db, trip_id, "destinations", "upsert", [destination.id])
+    await db.commit()
+    await db.refresh(destination)
+    await invalidate_trip(trip_id)
+    await publish_change(trip_id, "destinations", "upsert", [destination.id])
     return destination
 
 
 
 
-def get_destination(destination_id: int, db: Session):
-    return db.query(Destination).filter(Destination.id == destination_id).first()
+async def get_destination(destination_id: int, db: AsyncSession):
+    return await db.get(Destinations, destination_id)
 
 
-def update_destination(destination_id: int, destination: DestinationCreate, db: Session):
-    db_dest = db.query(Destination).filter(Destination.id == destination_id).first()
+async def update_destination(destination_id: int, destination: DestinationCreate, db: AsyncSession):
+    db_dest = await db.get(Destinations, destination_id)
     if db_dest:
-        for key, value in destination.dict().items():
+        values = destination.model_dump()
+        drop_stale_coordinates(values, db_dest)
+        await locate(db, [values])
+        for key, value in values.items():
             setattr(db_dest, key, value)
-        db.commit()
-        db.refresh(db_dest)
+        db_dest.version = Destinations.version + 1
+        await db.flush()
+        await index_rows(db, Destinations, [destination_id])
+        await record_changes(db, db_dest.trip_id, "destinations", "upsert", [destination_id])
+        await db.commit()
+        await db.refresh(db_dest)
+        await invalidate_trip(db_dest.trip_id)
+        await publish_change(db_dest.trip_id, "destinations", "upsert", [destination_id])
     return db_dest
 
-def delete_destination(destination_id: int, db: Session):
-    db_dest = db.query(Destination).filter(Destination.id == destination_id).first()
+async def patch_destination(destination_id: int, patch: DestinationPatch, db: AsyncSession):
+    row = await patch_row(
+        db, Destinations, DestinationResponse, Destinations.id == destination_id, patch.changes(), patch.version
+    )
+    if row:
+        await index_rows(db, Destinations, [destination_id])
+        await record_changes(db, row["trip_id"], "destinations", "upsert", [destination_id])
+        await db.commit()
+        await invalidate_trip(row["trip_id"])
+        await publish_change(row["trip_id"], "destinations", "upsert", [destination_id])
+    return row
+
+async def delete_destination(destination_id: int, db: AsyncSession):
+    db_dest = await db.get(Destinations, destination_id)
     if db_dest:
-        db.delete(db_dest)
-        db.commit()
+        await db.delete(db_dest)
+        await unindex_rows(db, Destinations, [destination_id])
+        await record_changes(db, db_dest.trip_id, "destinations", "delete", [destination_id])
+        await db.commit()
+        await invalidate_trip(db_dest.trip_id)
+        await publish_change(db_dest.trip_id, "destinations", "delete", [destination_id])
     return db_dest
+
+
+NEARBY_MAX_RADIUS_KM = 2000
+_rtree = table(
+    "destinations_rtree", column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon")
+)
+
+
+def _nearby_query(dialect: str, user_id: int, south: float, west: float, north: float, east: float):
+    stmt = (
+        select(*schema_columns(Destinations, DestinationResponse))
+        .join(Trips, Trips.id == Destinations.trip_id)
+    )
+    if dialect == "sqlite":
+        in_box = select(_rtree.c.id).where(
+            _rtree.c.max_lat >= south, _rtree.c.min_lat <= north,
+            _rtree.c.max_lon >= west, _rtree.c.min_lon <= east,
+        )
+        # "+ 0" keeps SQLite from entering through the user's trips, which
+        # would read every destination they own instead of only those in the box
+        return stmt.where(Destinations.id.in_(in_box), Trips.user_id + 0 == user_id)
+    # Matches the partial GiST index of migration 0009
+    point = func.point(Destinations.longitude, Destinations.latitude)
+    return stmt.where(
+        Destinations.latitude.is_not(None),
+        Destinations.longitude.is_not(None),
+        point.op("<@")(func.box(func.point(west, south), func.point(east, north))),
+        Trips.user_id == user_id,
+    )
+
+async def nearby_destinations(
+    db: AsyncSession,
+    user_id: int,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: int,
+    trip_id: int | None = None,
+) -> list[dict]:
+    """The user's destinations within ``radius_km`` of a point, nearest first.
+
+    Each bounding box of the circle is a single spatial-index range query,
+    so only nearby candidates are read; exact great-circle distances then
+    filter and order them.
+    """
+    candidates = {}
+    for box in bounding_boxes(latitude, longitude, radius_km):
+        stmt = _nearby_query(db.bind.dialect.name, user_id, *box)
+        if trip_id is not None:
+            stmt = stmt.where(Destinations.trip_id == trip_id)
+        for row in (await db.execute(stmt)).mappings():
+            candidates[row["id"]] = row
+
+    nearby = []
+    for row in candidates.values():
+        distance = haversine_km(latitude, longitude, row["latitude"], row["longitude"])
+        if distance <= radius_km:
+            nearby.append({**row, "distance_km": round(distance, 3)})
+    nearby.sort(key=lambda row: (row["distance_km"], row["id"]))
+    return nearby[:limit]
+
+
+def _route_stop(stops: dict, destination_id: int | None, end: str) -> int | None:
+    if destination_id is None:
+        return None
+    if destination_id not in stops:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The {end} must be one of the trip's destinations with coordinates",
+        )
+    return stops[destination_id]
+
+
+def _solve_route(latitudes, longitudes, start, end, time_limit):
+    matrix = distance_matrix(latitudes, longitudes)
+    return matrix, solve_path(matrix, start, end, time_limit=time_limit)
+
+
+async def optimize_route(db: AsyncSession, trip_id: int, options: RouteOptimizeRequest) -> dict:
+    """Reorder a trip's destinations into a short route and store it in ``order``.
+
+    Destinations with coordinates are routed; the rest follow in their
+    current order. Every ``order`` is rewritten as a zero-padded position
+    in one executemany UPDATE, so list order and route order agree. The
+    distance matrix and the solve run in the solver pool, off the event loop.
+    """
+    current = list(await db.scalars(
+        destinations_query(trip_id).order_by(Destinations.order, Destinations.id)
+    ))
+    routed = [row for row in current if row.latitude is not None and row.longitude is not None]
+    unrouted = [row for row in current if row.latitude is None or row.longitude is None]
+    max_stops = get_settings().ROUTE_MAX_STOPS
+    if len(routed) > max_stops:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Routes are limited to {max_stops} destinations with coordinates",
+        )
+    stops = {row.id: index for index, row in enumerate(routed)}
+    start = _route_stop(stops, options.start_id, "start")
+    end = _route_stop(stops, options.end_id, "end")
+    if start is not None and start == end and len(routed) > 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The start and end must differ")
+
+    matrix, path = await run_in_solver_pool(
+        _solve_route, [row.latitude for row in routed], [row.longitude for row in routed],
+        start, end, options.time_limit_ms / 1000,
+    )
+    ordered = [routed[stop] for stop in path] + unrouted
+
+    unrouted_ids = [row.id for row in unrouted]
+    width = len(str(len(ordered)))
+    now = datetime.now(UTC)
+    if ordered:
+        await db.execute(update(Destinations).values(version=Destinations.version + 1), [
+            {"id": row.id, "order": f"{position:0{width}d}", "updated_at": now}
+            for position, row in enumerate(ordered, start=1)
+        ])
+        ordered = list(await db.scalars(
+            destinations_query(trip_id)
+            .order_by(Destinations.order, Destinations.id)
+            .execution_options(populate_existing=True)
+        ))
+        await record_changes(db, trip_id, "destinations", "upsert", [row.id for row in ordered])
+    await db.commit()
+    await invalidate_trip(trip_id)
+    await publish_change(trip_id, "destinations", "upsert", [row.id for row in ordered])
+    return {
+        "distance_km": round(path_length(matrix, path), 3),
+        "previous_distance_km": round(path_length(matrix, range(len(routed))), 3),
+        "unrouted": unrouted_ids,
+        "destinations": ordered,
+    }
@@ -0,0 +1,82 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, get_settings
+from app.core.geocoding import DEFAULT_GAZETTEER, Coordinates, GazetteerResolver, Resolver, normalize_location
+from app.models.geocode import GeocodedLocation
+
+
+def build_resolver(settings: Settings) -> Resolver:
+    return GazetteerResolver(settings.GEOCODER_GAZETTEER_PATH or DEFAULT_GAZETTEER)
+
+
+settings = get_settings()
+resolver: Resolver = build_resolver(settings)
+
+# Answers already read from or written to geocoded_locations; None marks a miss
+_MISSING = object()
+location_cache = TTLCache(maxsize=settings.GEOCODE_CACHE_SIZE, ttl=24 * 3600)
+
+
+def _insert_ignore(dialect: str):
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert(GeocodedLocation).on_conflict_do_nothing(index_elements=["query"])
+
+
+async def geocode_many(db: AsyncSession, locations) -> dict[str, Coordinates | None]:
+    """Coordinates for each location string, memoized per normalized string.
+
+    Lookups go through the in-process cache, then one query against the
+    persistent cache, and only then the resolver. New answers, misses
+    included, are stored in the caller's transaction.
+    """
+    keys = {location: normalize_location(location) for location in locations if location}
+    found, unknown = {}, set()
+    for key in set(keys.values()):
+        cached = location_cache.get(key, _MISSING)
+        if cached is _MISSING:
+            unknown.add(key)
+        else:
+            found[key] = cached
+    if unknown:
+        rows = await db.execute(
+            select(GeocodedLocation.query, GeocodedLocation.latitude, GeocodedLocation.longitude)
+            .where(GeocodedLocation.query.in_(unknown))
+        )
+        for key, latitude, longitude in rows:
+            found[key] = None if latitude is None else (latitude, longitude)
+            unknown.discard(key)
+        # Resolve each new key through one of the strings that produced it
+        originals = {key: location for location, key in keys.items()}
+        new_rows = []
+        for key in sorted(unknown):
+            found[key] = resolver.resolve(originals[key])
+            latitude, longitude = found[key] or (None, None)
+            new_rows.append({"query": key, "latitude": latitude, "longitude": longitude})
+        if new_rows:
+            await db.execute(_insert_ignore(db.bind.dialect.name), new_rows)
+        for key in originals:
+            location_cache.set(key, found[key])
+    return {location: found[key] for location, key in keys.items()}
+
+
+async def locate(db: AsyncSession, rows: list[dict]):
+    """Fill in latitude/longitude from ``location`` on rows that do not carry coordinates."""
+    pending = [
+        row for row in rows
+        if row.get("location") and (row.get("latitude") is None or row.get("longitude") is None)
+    ]
+    if not pending:
+        return
+    points = await geocode_many(db, [row["location"] for row in pending])
+    for row in pending:
+        row["latitude"], row["longitude"] = points[row["location"]] or (None, None)
+
+
+def drop_stale_coordinates(values: dict, previous):
+    """Forget coordinates carried over unchanged from a row whose location has changed."""
+    point = (values.get("latitude"), values.get("longitude"))
+    if values.get("location") != previous.location and point == (previous.latitude, previous.longitude):
+        values["latitude"] = values["longitude"] = None
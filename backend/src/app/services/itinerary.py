@@ -1,19 +1,198 @@
-from sqlalchemy.orm import Session
+import math
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import UTC, date, datetime, time, timedelta
+from fastapi import HTTPException, status
+import numpy as np
+from app.core import ical
+from app.core.config import get_settings
+from app.core.pagination import PageParams, paginate
+from app.core.responses import schema_columns
+from app.core.routing import distance_matrix
+from app.core.scheduling import Planner, Task, free_gaps
+from app.core.solver_pool import run_in_solver_pool
+from app.models.dates import Dates
 from app.models.itinerary import Itinerary
-from app.schemas.itinerary import ItineraryCreate
-
-def create_itinerary(db: Session, itinerary: ItineraryCreate, trip_id: int):
-    db_itinerary = Itinerary(
-        trip_id=trip_id,
-        name=itinerary.name,
-        time=itinerary.time,
-        description=itinerary.description,
-        location=itinerary.location,
-    )
+from app.schemas.itinerary import ItineraryCreate, ItineraryRead, ScheduleRequest
+from app.services.read_cache import invalidate_trip, read_cache, trip_namespace
+from app.services.changes import record_changes
+from app.services.realtime import publish_change
+from app.services.geocoding import locate
+from app.services.search import index_rows
+from app.services.calendar_view import overlapping_events
+
+async def create_itinerary(db: AsyncSession, itinerary: ItineraryCreate, trip_id: int):
+    values = itinerary.model_dump()
+    await locate(db, [values])
+    db_itinerary = Itinerary(**values, trip_id=trip_id)
     db.add(db_itinerary)
-    db.commit()
-    db.refresh(db_itinerary)
+    await db.flush()
+    await index_rows(db, Itinerary, [db_itinerary.id])
+    await record_changes(db, trip_id, "itineraries", "upsert", [db_itinerary.id])
+    await db.commit()
+    await db.refresh(db_itinerary)
+    await invalidate_trip(trip_id)
+    await publish_change(trip_id, "itineraries", "upsert", [db_itinerary.id])
     return db_itinerary
 
-def get_itineraries_by_trip(db: Session, trip_id: int):
-    return db.query(Itinerary).filter(Itinerary.trip_id == trip_id).all()
+def itineraries_query(trip_id: int, time_from: datetime | None = None, time_to: datetime | None = None):
+    stmt = select(Itinerary).filter(Itinerary.trip_id == trip_id)
+    if time_from:
+        stmt = stmt.filter(Itinerary.time >= time_from)
+    if time_to:
+        stmt = stmt.filter(Itinerary.time < time_to)
+    return stmt
+
+async def get_itineraries_by_trip(
+    db: AsyncSession,
+    trip_id: int,
+    page: PageParams | None = None,
+    time_from: datetime | None = None,
+    time_to: datetime | None = None,
+):
+    page = page or PageParams()
+
+    async def load():
+        stmt = itineraries_query(trip_id, time_from, time_to)
+        stmt = stmt.with_only_columns(*schema_columns(Itinerary, ItineraryRead))
+        return await paginate(db, stmt, Itinerary.time, Itinerary.id, page, rows=True)
+
+    return await read_cache.get_or_load(
+        trip_namespace(trip_id), f"itinerary:{time_from}:{time_to}:{page.limit}:{page.cursor}", load
+    )
+
+
+def itinerary_ics_query(trip_id: int):
+    return itineraries_query(trip_id).with_only_columns(
+        Itinerary.id, Itinerary.name, Itinerary.time, Itinerary.description,
+        Itinerary.location, Itinerary.updated_at,
+    ).order_by(Itinerary.time, Itinerary.id)
+
+def itinerary_to_vevent(row: dict) -> str:
+    return ical.vevent(
+        uid=f"itinerary-{row['id']}@waymark",
+        start=row["time"],
+        summary=row["name"],
+        description=row["description"],
+        location=row["location"],
+        stamp=row["updated_at"],
+    )
+
+
+def _minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _merge(intervals) -> list[tuple[int, int]]:
+    merged = []
+    for low, high in sorted(intervals):
+        if merged and low <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def _travel_minutes(items, options: ScheduleRequest) -> list[list[int]]:
+    latitudes = [np.nan if item.latitude is None else item.latitude for item in items]
+    longitudes = [np.nan if item.longitude is None else item.longitude for item in items]
+    hours = distance_matrix(latitudes, longitudes) / options.travel_speed_kmh
+    minutes = np.where(np.isnan(hours), options.default_travel_minutes, np.ceil(hours * 60))
+    np.fill_diagonal(minutes, 0)
+    return minutes.astype(int).tolist()
+
+
+def _plan(tasks, items, options: ScheduleRequest, gaps, day_start: int, day_end: int):
+    planner = Planner(
+        tasks, _travel_minutes(items, options), gaps, day_start, day_end, step=options.granularity_minutes,
+    )
+    return planner, planner.solve(time_limit=options.time_limit_ms / 1000)
+
+
+async def _trip_days(db: AsyncSession, trip) -> tuple[date, date]:
+    dates = await db.scalar(select(Dates).filter(Dates.trip_id == trip.id))
+    if dates:
+        return dates.start_date, dates.end_date
+    if trip.start_date and trip.end_date:
+        return trip.start_date.date(), trip.end_date.date()
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The trip has no dates to schedule into")
+
+
+async def schedule_itinerary(db: AsyncSession, trip, options: ScheduleRequest) -> dict:
+    """Give the trip's items times that fit its dates, hours and the owner's calendar.
+
+    Items are packed day by day (see ``core.scheduling``); fixed items and
+    the owner's calendar events are treated as busy. New times are written
+    in one executemany UPDATE; items that do not fit are left as they were.
+    The travel matrix and the solve run in the solver pool, off the event loop.
+    """
+    first, last = await _trip_days(db, trip)
+    day_start, day_end = _minute_of_day(options.day_start), _minute_of_day(options.day_end)
+    if day_end <= day_start or last < first:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The day must end after it starts")
+    origin = datetime.combine(first, time())
+    days = (last - first).days + 1
+
+    items = list(await db.scalars(itineraries_query(trip.id).order_by(Itinerary.time, Itinerary.id)))
+    max_items = get_settings().SCHEDULE_MAX_ITEMS
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Scheduling is limited to {max_items} itinerary items",
+        )
+    hints = {hint.id: hint for hint in options.items}
+    unknown = set(hints) - {item.id for item in items}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Items {sorted(unknown)} are not part of trip {trip.id}",
+        )
+
+    def offset(value: datetime, up: bool = False) -> int:
+        return math.ceil((value - origin) / timedelta(minutes=1)) if up else (value - origin) // timedelta(minutes=1)
+
+    busy, tasks = [], []
+    for rank, item in enumerate(items):
+        hint = hints.get(item.id)
+        duration = hint.duration_minutes if hint and hint.duration_minutes else options.default_duration_minutes
+        if hint and hint.fixed:
+            busy.append((offset(item.time), offset(item.time) + duration))
+            continue
+        tasks.append(Task(
+            id=item.id,
+            index=rank,
+            duration=duration,
+            opens=_minute_of_day(hint.opens) if hint and hint.opens else None,
+            closes=_minute_of_day(hint.closes) if hint and hint.closes else None,
+            priority=hint.priority if hint else 0,
+            rank=rank,
+        ))
+    if options.avoid_calendar and trip.user_id is not None:
+        window_end = origin + timedelta(days=days)
+        for event in await overlapping_events(db, trip.user_id, origin, window_end):
+            busy.append((offset(event.start_date), offset(event.end_date, up=True)))
+
+    planner, starts = await run_in_solver_pool(
+        _plan, tasks, items, options, free_gaps(days, day_start, day_end, _merge(busy)), day_start, day_end,
+    )
+
+    if starts:
+        now = datetime.now(UTC)
+        await db.execute(update(Itinerary).values(version=Itinerary.version + 1), [
+            {"id": item_id, "time": origin + timedelta(minutes=start), "updated_at": now}
+            for item_id, start in starts.items()
+        ])
+        items = list(await db.scalars(
+            itineraries_query(trip.id)
+            .order_by(Itinerary.time, Itinerary.id)
+            .execution_options(populate_existing=True)
+        ))
+        await record_changes(db, trip.id, "itineraries", "upsert", starts)
+    await db.commit()
+    await invalidate_trip(trip.id)
+    await publish_change(trip.id, "itineraries", "upsert", starts)
+    return {
+        "items": items,
+        "unscheduled": [task.id for task in planner.unplaced],
+        "travel_minutes": sum(planner.travel_time(order) for order in planner.days.values()),
+    }
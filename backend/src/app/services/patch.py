@@ -0,0 +1,41 @@
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import schema_columns
+from app.services.geocoding import locate
+
+
+async def patch_row(db: AsyncSession, model, schema, where, values: dict, version: int | None = None):
+    """Write ``values`` to the row matching ``where`` with one UPDATE ... RETURNING.
+
+    The row's version is bumped. When ``version`` is given, the row is only
+    written if it is still at that version; if someone else changed it
+    first, a 409 carries the current row so the client can merge and retry.
+    Returns the updated row as a dict, or ``None`` when no row matches.
+    """
+    columns = schema_columns(model, schema)
+    # A new location without new coordinates is geocoded again
+    if "latitude" in model.__table__.c and "location" in values and not {"latitude", "longitude"} & values.keys():
+        values["latitude"] = values["longitude"] = None
+        await locate(db, [values])
+
+    stmt = update(model).where(where).values(**values, version=model.version + 1).returning(*columns)
+    if version is not None:
+        stmt = stmt.where(model.version == version)
+    row = (await db.execute(stmt)).mappings().first()
+    if row is not None:
+        return dict(row)
+
+    # Only a failed write pays for telling a missing row from a stale version
+    current = (await db.execute(select(*columns).where(where))).mappings().first()
+    if current is None:
+        return None
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": f"Changed by someone else since version {version}",
+            "current": jsonable_encoder(dict(current)),
+        },
+    )
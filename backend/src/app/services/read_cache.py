@@ -0,0 +1,48 @@
+from app.core.cache import ExternalBackend, MemoryBackend, ReadCache
+from app.core.config import Settings, get_settings
+
+
+def build_backend(settings: Settings):
+    if settings.READ_CACHE_URL:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("READ_CACHE_URL requires the 'redis' package") from exc
+        return ExternalBackend(redis.from_url(settings.READ_CACHE_URL))
+    if settings.WEB_CONCURRENCY > 1:
+        raise RuntimeError("WEB_CONCURRENCY above 1 requires a shared READ_CACHE_URL")
+    return MemoryBackend(maxsize=settings.READ_CACHE_SIZE, ttl=settings.READ_CACHE_TTL_SECONDS)
+
+
+settings = get_settings()
+read_cache = ReadCache(build_backend(settings), ttl=settings.READ_CACHE_TTL_SECONDS)
+
+
+# A trip's namespace covers the trip row and its destination and itinerary
+# lists; a user's covers their trip and template lists, and their calendar
+# namespace the free/busy and day views built from their events. Exchange
+# rates are shared by every trip, so they have one namespace of their own.
+RATES_NAMESPACE = "rates"
+
+def trip_namespace(trip_id: int) -> str:
+    return f"trip:{trip_id}"
+
+
+def user_namespace(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def calendar_namespace(user_id: int) -> str:
+    return f"calendar:{user_id}"
+
+
+async def invalidate_trip(trip_id: int):
+    await read_cache.invalidate(trip_namespace(trip_id))
+
+
+async def invalidate_user(user_id: int):
+    await read_cache.invalidate(user_namespace(user_id))
+
+
+async def invalidate_calendar(*user_ids: int):
+    await read_cache.invalidate(*(calendar_namespace(user_id) for user_id in user_ids))
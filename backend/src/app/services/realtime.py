@@ -0,0 +1,23 @@
+from app.core.config import get_settings
+from app.core.pubsub import Broker, LocalBroker
+
+settings = get_settings()
+broker: Broker = LocalBroker()
+
+
+def trip_channel(trip_id: int) -> str:
+    return f"trip:{trip_id}"
+
+
+async def publish_change(trip_id: int, kind: str, op: str, ids):
+    """Tell the trip's live connections that rows of ``kind`` were upserted or deleted.
+
+    Call after the commit, so a client refetching on the event sees the write.
+    """
+    ids = list(ids)
+    if ids:
+        await broker.publish(trip_channel(trip_id), {"kind": kind, "op": op, "ids": ids})
+
+
+def subscribe_trip(trip_id: int):
+    return broker.subscribe(trip_channel(trip_id), settings.LIVE_QUEUE_SIZE)
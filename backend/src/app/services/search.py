@@ -0,0 +1,133 @@
+import re
+from functools import reduce
+
+from sqlalchemy import column, delete, func, insert, literal, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import Page, PageParams, paginate
+from app.models.destinations import Destinations
+from app.models.itinerary import Itinerary
+from app.models.search import SearchDocument
+from app.models.trips import Trips
+
+# What each kind of document is built from: model, title and body columns
+SEARCHABLE = {
+    "trip": (Trips, Trips.title, (Trips.description,)),
+    "destination": (Destinations, Destinations.name, (Destinations.location, Destinations.description)),
+    "itinerary": (Itinerary, Itinerary.name, (Itinerary.location, Itinerary.description)),
+}
+KINDS = {model: kind for kind, (model, _, _) in SEARCHABLE.items()}
+
+MAX_TERMS = 8
+_DOCUMENT_COLUMNS = ("kind", "entity_id", "trip_id", "user_id", "title", "body")
+
+# Same expression as the GIN index created by migration 0008
+PG_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(body, ''))"
+_fts = table("search_documents_fts", column("rowid"))
+_fts_ref = literal_column("search_documents_fts")
+
+
+def _trip_id(model):
+    return model.id if model is Trips else model.trip_id
+
+
+def _documents(kind: str):
+    """SELECT producing the search documents of every row of ``kind``."""
+    model, title, body = SEARCHABLE[kind]
+    text = reduce(lambda left, right: left + " " + right, (func.coalesce(part, "") for part in body))
+    stmt = select(literal(kind), model.id, _trip_id(model), Trips.user_id, title, text)
+    if model is not Trips:
+        stmt = stmt.select_from(model).join(Trips, Trips.id == model.trip_id)
+    return stmt.where(Trips.user_id.is_not(None))
+
+
+# Writers call these before committing, so documents change in the same
+# transaction as the rows they describe.
+
+async def index_rows(db: AsyncSession, model, ids):
+    """(Re)build the documents of the given rows; models that are not searchable are ignored."""
+    kind = KINDS.get(model)
+    if kind is None or not ids:
+        return
+    ids = list(ids)
+    await unindex_rows(db, model, ids)
+    await db.execute(
+        insert(SearchDocument).from_select(_DOCUMENT_COLUMNS, _documents(kind).where(model.id.in_(ids)))
+    )
+
+
+async def unindex_rows(db: AsyncSession, model, ids):
+    kind = KINDS.get(model)
+    if kind is None or not ids:
+        return
+    await db.execute(
+        delete(SearchDocument).where(SearchDocument.kind == kind, SearchDocument.entity_id.in_(list(ids)))
+    )
+
+
+async def index_trip(db: AsyncSession, trip_id: int):
+    """Rebuild every document of a trip, e.g. after its owner changed or it was cloned."""
+    await unindex_trip(db, trip_id)
+    for kind, (model, _, _) in SEARCHABLE.items():
+        stmt = _documents(kind).where(_trip_id(model) == trip_id)
+        await db.execute(insert(SearchDocument).from_select(_DOCUMENT_COLUMNS, stmt))
+
+
+async def unindex_trip(db: AsyncSession, trip_id: int):
+    await db.execute(delete(SearchDocument).where(SearchDocument.trip_id == trip_id))
+
+
+def search_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+
+def _sqlite_match(user_id: int, terms: list[str]) -> str:
+    # Every term is quoted, so user input cannot use FTS5 query syntax
+    return " AND ".join([f'user_id : "{user_id}"', *(f'"{term}"*' for term in terms)])
+
+
+# The document id breaks ties between equal ranks for keyset pagination
+_document_id = SearchDocument.id.label("document_id")
+
+
+def _search_query(dialect: str, user_id: int, q: str, terms: list[str]):
+    columns = (
+        SearchDocument.kind, SearchDocument.entity_id.label("id"), SearchDocument.trip_id,
+        SearchDocument.title, _document_id,
+    )
+    if dialect == "sqlite":
+        # bm25: title matches weigh ten times body matches; lower is better
+        rank = func.bm25(_fts_ref, 10.0, 1.0, 0.0).label("rank")
+        return (
+            select(*columns, rank)
+            .select_from(_fts)
+            .join(SearchDocument, SearchDocument.id == _fts.c.rowid)
+            .where(_fts_ref.op("MATCH")(_sqlite_match(user_id, terms)), SearchDocument.user_id == user_id)
+        ), rank
+    # Postgres: prefix full-text matches, plus titles within trigram distance for typos
+    document = literal_column(PG_DOCUMENT)
+    query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    rank = (-(func.ts_rank(document, query) + func.similarity(SearchDocument.title, q))).label("rank")
+    return (
+        select(*columns, rank)
+        .where(
+            SearchDocument.user_id == user_id,
+            or_(document.op("@@")(query), SearchDocument.title.op("%")(q)),
+        )
+    ), rank
+
+
+async def search(
+    db: AsyncSession, user_id: int, q: str, kind: str | None = None, page: PageParams | None = None
+) -> Page:
+    """Ranked page of the user's documents matching every term of ``q`` as a prefix."""
+    terms = search_terms(q)
+    if not terms:
+        return Page(items=[])
+    stmt, rank = _search_query(db.bind.dialect.name, user_id, q, terms)
+    if kind is not None:
+        stmt = stmt.where(SearchDocument.kind == kind)
+    result = await paginate(db, stmt, rank, _document_id, page or PageParams(), rows=True)
+    for item in result.items:
+        del item["document_id"]
+    return result
@@ -1,32 +1,234 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, String, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from datetime import UTC, datetime, timedelta
+from app.core.pagination import PageParams, paginate
+from app.core.responses import schema_columns
+from app.models.budget import Budget
+from app.models.calendar_event import CalendarEvent
+from app.models.collaboration import collaborations
+from app.models.dates import Dates
+from app.models.destinations import Destinations
+from app.models.itinerary import Itinerary
 from app.models.trips import Trips
-from app.schemas.trips import TripCreate
+from app.schemas.trips import Trip, TripClone, TripCreate, TripPatch
+from app.services.search import index_rows, index_trip, unindex_trip
+from app.services.changes import record_changes, record_trip, record_trip_deleted
+from app.services.patch import patch_row
+from app.services.realtime import publish_change
+from app.services.read_cache import (
+    invalidate_calendar, invalidate_trip, invalidate_user, read_cache, trip_namespace, user_namespace,
+)
 
-def create_user_trip(db: Session, trip: TripCreate, user_id: int):
-    db_trip = Trips(**trip.dict(), user_id=user_id)
+# Relationships that can be eager-loaded with a trip, by their API name.
+# Each one costs exactly one extra SELECT ... WHERE trip_id IN (...) query.
+TRIP_RELATIONSHIPS = {
+    "destinations": Trips.destinations,
+    "itineraries": Trips.itineraries,
+    "budgets": Trips.budgets,
+    "calendar_events": Trips.calendar_events,
+    "dates": Trips.dates,
+    "collaborators": Trips.collaborators,
+}
+
+# Other people's calendars and accounts: only embedded for callers with a role on the trip
+PRIVATE_RELATIONSHIPS = ("calendar_events", "collaborators")
+
+async def create_user_trip(db: AsyncSession, trip: TripCreate, user_id: int):
+    db_trip = Trips(**trip.model_dump(), user_id=user_id)
     db.add(db_trip)
-    db.commit()
-    db.refresh(db_trip)
+    await db.flush()
+    await index_rows(db, Trips, [db_trip.id])
+    await record_changes(db, db_trip.id, "trips", "upsert", [db_trip.id])
+    await db.commit()
+    await db.refresh(db_trip)
+    await invalidate_user(user_id)
     return db_trip
 
-def get_user_trips(db: Session, user_id: int):
-    return db.query(Trips).filter(Trips.user_id == user_id).all()
 
-def get_trip_by_id(db: Session, trip_id: int):
-    return db.query(Trips).filter(Trips.id == trip_id).first()
+async def _cached_trip_page(db: AsyncSession, user_id: int, key: str, stmt, page: PageParams):
+    async def load():
+        result = await paginate(db, stmt, Trips.start_date, Trips.id, page)
+        result.items = [Trip.model_validate(t) for t in result.items]
+        return result
+
+    return await read_cache.get_or_load(
+        user_namespace(user_id), f"{key}:{page.limit}:{page.cursor}", load
+    )
+
+def user_trips_query(user_id: int, date_from: datetime | None = None, date_to: datetime | None = None):
+    stmt = select(Trips).filter(Trips.user_id == user_id, Trips.is_template.is_(False))
+    if date_from:
+        stmt = stmt.filter(Trips.start_date >= date_from)
+    if date_to:
+        stmt = stmt.filter(Trips.start_date < date_to)
+    return stmt
+
+def trip_rows_query(user_id: int, date_from: datetime | None = None, date_to: datetime | None = None):
+    """Every matching trip as plain columns, in list order, for streaming."""
+    return (
+        user_trips_query(user_id, date_from, date_to)
+        .with_only_columns(*schema_columns(Trips, Trip))
+        .order_by(Trips.start_date.asc().nulls_first(), Trips.id)
+    )
+
+async def get_user_trips(
+    db: AsyncSession,
+    user_id: int,
+    page: PageParams | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    expand: tuple[str, ...] = (),
+):
+    page = page or PageParams()
+    stmt = user_trips_query(user_id, date_from, date_to)
+    if not expand:
+        return await _cached_trip_page(db, user_id, f"trips:{date_from}:{date_to}", stmt, page)
+    # Embedded children are not covered by the user namespace, so skip the cache
+    stmt = stmt.options(*(selectinload(TRIP_RELATIONSHIPS[name]) for name in expand))
+    return await paginate(db, stmt, Trips.start_date, Trips.id, page)
+
+async def get_user_templates(db: AsyncSession, user_id: int, page: PageParams | None = None):
+    stmt = select(Trips).filter(Trips.user_id == user_id, Trips.is_template.is_(True))
+    return await _cached_trip_page(db, user_id, "templates", stmt, page or PageParams())
 
-def update_trip(db: Session, trip_id: int, trip_data: TripCreate):
-    db_trip = db.query(Trips).filter(Trips.id == trip_id).first()
+async def get_trip_by_id(db: AsyncSession, trip_id: int):
+    async def load():
+        db_trip = await db.get(Trips, trip_id)
+        return Trip.model_validate(db_trip) if db_trip else None
+
+    return await read_cache.get_or_load(trip_namespace(trip_id), "trip", load)
+
+async def get_trip_full(
+    db: AsyncSession, trip_id: int, relationships: tuple[str, ...] = tuple(TRIP_RELATIONSHIPS)
+):
+    stmt = (
+        select(Trips)
+        .filter(Trips.id == trip_id)
+        .options(*(selectinload(TRIP_RELATIONSHIPS[name]) for name in relationships))
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+async def update_trip(db: AsyncSession, trip_id: int, trip_data: TripCreate):
+    return await _write_trip(db, trip_id, trip_data.model_dump())
+
+async def patch_trip(db: AsyncSession, trip_id: int, patch: TripPatch):
+    return await _write_trip(db, trip_id, patch.changes(), patch.version)
+
+async def _write_trip(db: AsyncSession, trip_id: int, values: dict, version: int | None = None):
+    db_trip = await patch_row(db, Trips, Trip, Trips.id == trip_id, values, version)
     if db_trip:
-        for key, value in trip_data.dict().items():
-            setattr(db_trip, key, value)
-        db.commit()
-        db.refresh(db_trip)
+        await index_trip(db, trip_id)
+        await record_changes(db, trip_id, "trips", "upsert", [trip_id])
+        await db.commit()
+        await invalidate_trip(trip_id)
+        await invalidate_user(db_trip["user_id"])
+        await publish_change(trip_id, "trips", "upsert", [trip_id])
     return db_trip
 
-def delete_trip(db: Session, trip_id: int):
-    db_trip = db.query(Trips).filter(Trips.id == trip_id).first()
+async def delete_trip(db: AsyncSession, trip_id: int):
+    db_trip = await db.get(Trips, trip_id)
     if db_trip:
-        db.delete(db_trip)
-        db.commit()
+        # The trip's events go with it, and they may belong to collaborators
+        event_owners = list(await db.scalars(
+            select(CalendarEvent.user_id).filter(CalendarEvent.trip_id == trip_id).distinct()
+        ))
+        audience = [db_trip.user_id, *await db.scalars(
+            select(collaborations.c.user_id).filter(collaborations.c.trip_id == trip_id)
+        )]
+        await unindex_trip(db, trip_id)
+        await record_trip_deleted(db, trip_id, audience)
+        await db.delete(db_trip)
+        await db.commit()
+        await invalidate_trip(trip_id)
+        await invalidate_user(db_trip.user_id)
+        await invalidate_calendar(*event_owners)
+        await publish_change(trip_id, "trips", "delete", [trip_id])
     return db_trip
+
+
+# Rows copied along with a trip. Calendar events and collaborators belong to
+# users rather than to the plan itself and are not copied.
+CLONED_MODELS = (Destinations, Itinerary, Dates, Budget)
+
+
+def _shift(column, delta: timedelta, dialect: str):
+    """``column`` moved by ``delta``, computed in SQL so rows never leave the database."""
+    if isinstance(column.type, Date):
+        if dialect == "sqlite":
+            return func.date(column, f"{delta.days:+d} days")
+        return column + delta.days
+    if dialect == "sqlite":
+        # Keep SQLAlchemy's "YYYY-MM-DD HH:MM:SS.ffffff" storage format
+        seconds = int(delta.total_seconds())
+        return func.strftime("%Y-%m-%d %H:%M:%f", column, f"{seconds:+d} seconds", type_=String) + "000"
+    return column + delta
+
+
+def _copy_select(model, source_id, values: dict, shift: timedelta, day_shift: timedelta, dialect: str):
+    """SELECT producing a copy of ``model``'s rows for ``source_id`` with ``values`` overridden."""
+    columns = [column for column in model.__table__.columns if not column.primary_key]
+    selected = []
+    for column in columns:
+        if column.key in values:
+            selected.append(literal(values[column.key], column.type).label(column.key))
+        elif isinstance(column.type, Date) and day_shift:
+            selected.append(_shift(column, day_shift, dialect).label(column.key))
+        elif isinstance(column.type, DateTime) and shift:
+            selected.append(_shift(column, shift, dialect).label(column.key))
+        else:
+            selected.append(column)
+    source_column = model.__table__.c.id if model is Trips else model.__table__.c.trip_id
+    return columns, select(*selected).where(source_column == source_id)
+
+
+async def clone_trip(db: AsyncSession, trip_id: int, options: TripClone):
+    """Copy a trip and its destinations, itinerary, dates and budget server-side.
+
+    Every table is copied with a single ``INSERT ... SELECT`` inside one
+    transaction, so the cost does not grow with round-trips per row. When
+    ``start_date`` is given, all timestamps in the copy move by the offset
+    between the new and the original start.
+    """
+    source = await db.get(Trips, trip_id)
+    if source is None:
+        return None
+
+    shift = day_shift = timedelta(0)
+    if options.start_date is not None and source.start_date is not None:
+        start_date = options.start_date
+        if start_date.tzinfo is not None:
+            start_date = start_date.astimezone(UTC).replace(tzinfo=None)
+        original = source.start_date.replace(tzinfo=None)
+        shift = start_date - original
+        day_shift = timedelta(days=(start_date.date() - original.date()).days)
+
+    dialect = db.bind.dialect.name
+    now = datetime.now(UTC)
+    trip_values = {"is_template": options.as_template}
+    if options.title is not None:
+        trip_values["title"] = options.title
+    if options.user_id is not None:
+        trip_values["user_id"] = options.user_id
+    for key in ("created_at", "updated_at"):
+        trip_values[key] = now
+    trip_values["version"] = 1  # copies start their own history
+
+    columns, stmt = _copy_select(Trips, trip_id, trip_values, shift, day_shift, dialect)
+    new_id = (await db.execute(
+        insert(Trips).from_select(columns, stmt).returning(Trips.id)
+    )).scalar_one()
+
+    for model in CLONED_MODELS:
+        values = {"trip_id": new_id, "version": 1}
+        values.update({key: now for key in ("created_at", "updated_at") if key in model.__table__.c})
+        columns, stmt = _copy_select(model, trip_id, values, shift, day_shift, dialect)
+        await db.execute(insert(model).from_select(columns, stmt))
+
+    await index_trip(db, new_id)
+    await record_trip(db, new_id)
+    await db.commit()
+    clone = await db.get(Trips, new_id)
+    await invalidate_user(clone.user_id)
+    return clone
@@ -1,18 +1,23 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_password_hash
+from app.core.cache import TTLCache
 from app.core.config import get_settings
-from app.core.security import verify_password
+from app.core.security import hash_password_async, verify_and_update_password
 from app.models.user import User
-from app.schemas.user import UserCreate
+from app.schemas.user import Principal, UserCreate
 
 settings = get_settings()
 
+# Authenticated principals keyed by token subject (username)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
 
 
 # User CRUD operations
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await hash_password_async(user.password)
     verification_code = "1234"  # TODO: Implement verification code
 
     db_user = User(
@@ -22,20 +27,62 @@ def create_user(db: Session, user: UserCreate):
         verification_code=verification_code,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username=username)
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    if not valid:
         return False
+    if new_hash:
+        # Stored hash predates the current bcrypt cost; upgrade it transparently
+        user.password_hash = new_hash
+        await db.commit()
     return user
 
 
-def get_user_by_username(db: Session, username: str):
-    user = db.query(User).filter(User.username == username).first()
-    return user
+async def get_user_by_username(db: AsyncSession, username: str):
+    result = await db.execute(select(User).filter(User.username == username))
+    return result.scalars().first()
+
+
+async def get_principal(db: AsyncSession, username: str):
+    """Return the cached principal for ``username``, loading it on a miss.
+
+    Inactive or unknown users are never cached and yield ``None``.
+    """
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+    user = await get_user_by_username(db, username=username)
+    if not user or not user.is_active:
+        return None
+    principal = Principal.model_validate(user)
+    principal_cache.set(username, principal)
+    return principal
+
+
+def invalidate_principal(username: str):
+    principal_cache.pop(username)
+
+
+# Credentials or account status changed: drop the cached principal
+_PRINCIPAL_FIELDS = ("username", "email", "password_hash", "is_active", "is_verified")
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_change(mapper, connection, target):
+    state = inspect(target)
+    if state.deleted or any(
+        state.attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS
+    ):
+        invalidate_principal(target.username)
+        history = state.attrs.username.history
+        for old_username in history.deleted or ():
+            invalidate_principal(old_username)
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+TEST_DATABASE_PATH = os.path.join(tempfile.gettempdir(), "waymark_test.db")
+TEST_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
+
+# Point the application engine at the scratch database before it is created
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DATABASE_PATH}"
+# Cheap bcrypt cost keeps registration/login tests fast
+os.environ["BCRYPT_ROUNDS"] = "5"
+os.environ["JWT_ALGORITHM"] = "HS256"
+
+from app.core.auth import create_access_token  # noqa: E402
+from app.core.migrations import upgrade_database  # noqa: E402
+from app.dependencies import get_db, get_sessionmaker  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+# NullPool: TestClient may run each request on its own event loop
+engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+# Build the schema through the migrations, exactly as deployments do
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(TEST_DATABASE_PATH + suffix):
+        os.remove(TEST_DATABASE_PATH + suffix)
+upgrade_database()
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_sessionmaker] = lambda: TestingSessionLocal
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", help="also run tests marked benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timing checks on large data, skipped unless --run-benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Wall-clock assertions are only meaningful on a quiet machine, so they are opt-in
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; pass --run-benchmarks to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def db_session():
+    return TestingSessionLocal
+
+
+@pytest.fixture
+def db_engine():
+    return engine
+
+
+@pytest.fixture
+def db_path():
+    return TEST_DATABASE_PATH
+
+
+@pytest.fixture
+def make_user(db_session):
+    """Create a user with a unique name; for tests that need more than one."""
+    def make():
+        async def create():
+            async with db_session() as db:
+                name = f"user_{uuid.uuid4().hex[:12]}"
+                user = User(username=name, email=f"{name}@example.com", password_hash="x")
+                db.add(user)
+                await db.commit()
+                await db.refresh(user)
+                return user
+
+        return asyncio.run(create())
+
+    return make
+
+
+@pytest.fixture
+def headers_for():
+    """Bearer headers for any user."""
+    return lambda user: {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def auth_headers(user, headers_for):
+    return headers_for(user)
@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.core.tokens import TokenService
+from app.main import app
+
+
+def make_service(**overrides):
+    options = {"DATABASE_URL": "sqlite://", "SECRET_KEY": "test-secret", **overrides}
+    return TokenService(Settings(**options))
+
+
+def pem(private_key):
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def test_hs256_roundtrip_sets_kid_and_jti():
+    service = make_service()
+    token = service.create_access_token({"sub": "alice"})
+    assert jwt.get_unverified_header(token)["kid"] == "primary"
+    payload = service.decode(token)
+    assert payload["sub"] == "alice"
+    assert payload["jti"]
+
+
+@pytest.mark.parametrize("algorithm, key", [
+    ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+])
+def test_asymmetric_algorithms(algorithm, key):
+    service = make_service(JWT_ALGORITHM=algorithm, JWT_PRIVATE_KEY=pem(key))
+    token = service.create_access_token({"sub": "bob"})
+    assert service.decode(token)["sub"] == "bob"
+
+
+def test_rs256_requires_private_key():
+    service = make_service(JWT_ALGORITHM="RS256")
+    with pytest.raises(ValueError):
+        service.create_access_token({"sub": "bob"})
+
+
+def test_rotated_key_still_verifies_old_tokens():
+    old = make_service(SECRET_KEY="old-secret", JWT_KEY_ID="2024")
+    token = old.create_access_token({"sub": "carol"})
+    current = make_service(SECRET_KEY="new-secret", JWT_KEY_ID="2025", JWT_PREVIOUS_KEYS={"2024": "old-secret"})
+    assert current.decode(token)["sub"] == "carol"
+    with pytest.raises(jwt.InvalidTokenError):
+        make_service(SECRET_KEY="new-secret", JWT_KEY_ID="2025").decode(token)
+
+
+def test_verified_tokens_are_cached_until_expiry():
+    service = make_service()
+    token = service.create_access_token({"sub": "dave"}, timedelta(seconds=1))
+    service.decode(token)
+    service.decode(token)
+    assert service.cache.hits == 1
+    time.sleep(1.1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        service.decode(token)
+
+
+def test_tampered_token_is_rejected():
+    service = make_service()
+    token = service.create_access_token({"sub": "erin"})
+    header, payload, signature = token.split(".")
+    with pytest.raises(jwt.InvalidTokenError):
+        service.decode(f"{header}.{payload}.{signature[::-1]}")
+
+
+def test_login_and_read_current_user():
+    client = TestClient(app)
+    client.post(
+        "/auth/register",
+        json={"username": "tokenuser", "email": "tokenuser@example.com", "password": "testpassword"},
+    )
+    response = client.post("/auth/token", data={"username": "tokenuser", "password": "testpassword"})
+    assert response.status_code == 200, response.text
+    token = response.json()["access_token"]
+
+    me = client.get("/auth/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200
+    assert me.json()["username"] == "tokenuser"
+    assert "password_hash" not in me.json()
+
+    bad = client.get("/auth/users/me", headers={"Authorization": "Bearer not-a-token"})
+    assert bad.status_code == 401
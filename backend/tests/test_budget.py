@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from app.core.config import get_settings
 from app.main import app
 
 client = TestClient(app)
@@ -53,3 +54,46 @@ def test_delete_budget():
     response = client.delete(f"/budget/{created_budget_id}")
     assert response.status_code == 200
     assert response.json()["detail"] == "Budget deleted successfully"
+
+
+def test_budget_summary_groups_and_converts(monkeypatch, user, auth_headers):
+    trip = client.post("/users/1/trips", json={
+        "title": "Euro trip",
+        "start_date": "2025-07-01T00:00:00",
+        "end_date": "2025-07-10T00:00:00",
+        "base_currency": "EUR",
+    }).json()
+    assert client.put("/exchange-rates/EUR", json={"units_per_usd": 0.5}).status_code == 401
+    assert client.put("/exchange-rates/EUR", headers=auth_headers, json={"units_per_usd": 0.5}).status_code == 403
+    monkeypatch.setattr(get_settings(), "ADMIN_USERNAMES", [user.username])
+    client.put("/exchange-rates/EUR", headers=auth_headers, json={"units_per_usd": 0.5})
+    client.put("/exchange-rates/JPY", headers=auth_headers, json={"units_per_usd": 100})
+    for amount, currency, category in [
+        (10, "EUR", "Food"), (20, "EUR", "Food"), (40, "USD", "Food"),
+        (1000, "JPY", "Travel"), (5, "GBP", "Travel"),
+    ]:
+        client.post(f"/trips/{trip['id']}/budget", json={"amount": amount, "currency": currency, "category": category})
+
+    response = client.get(f"/trips/{trip['id']}/budget/summary")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["base_currency"] == "EUR"
+    groups = {(g["category"], g["currency"]): g for g in summary["groups"]}
+    assert groups[("Food", "EUR")]["total"] == 30
+    assert groups[("Food", "EUR")]["count"] == 2
+    assert groups[("Food", "USD")]["converted_total"] == 20
+    assert groups[("Travel", "GBP")]["converted_total"] is None
+    assert summary["by_category"] == {"Food": 50, "Travel": 5}
+    assert summary["total"] == 55
+    assert summary["missing_rates"] == ["GBP"]
+
+    in_usd = client.get(f"/trips/{trip['id']}/budget/summary", params={"base_currency": "USD"}).json()
+    assert in_usd["by_category"]["Food"] == 100
+
+    # A new rate reaches summaries right away, not when a cached copy expires
+    client.put("/exchange-rates/EUR", headers=auth_headers, json={"units_per_usd": 1})
+    assert client.get(f"/trips/{trip['id']}/budget/summary").json()["by_category"]["Food"] == 70
+
+
+def test_budget_summary_unknown_trip():
+    assert client.get("/trips/987654/budget/summary").status_code == 404
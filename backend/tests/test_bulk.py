@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def trip_id():
+    response = client.post("/users/1/trips", json={
+        "title": "Bulk trip",
+        "start_date": "2025-08-01T00:00:00",
+        "end_date": "2025-08-05T00:00:00",
+    })
+    return response.json()["id"]
+
+
+def itinerary_items(count):
+    start = datetime(2025, 8, 1, 8)
+    return [
+        {"name": f"Item {i}", "time": (start + timedelta(minutes=15 * i)).isoformat()}
+        for i in range(count)
+    ]
+
+
+def test_import_200_items_in_one_request(trip_id, db_engine):
+    writes = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            writes.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.post(f"/trips/{trip_id}/itinerary/batch", json={"create": itinerary_items(200)})
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200, response.text
+    created = response.json()["created"]
+    assert len(created) == 200
+    assert all(item["trip_id"] == trip_id and item["id"] for item in created)
+    # Multi-row INSERT ... RETURNING instead of one statement per item
+    assert len(writes) < 5
+    assert len(client.get(f"/trips/{trip_id}/itinerary", params={"limit": 500}).json()) == 200
+
+
+def test_batch_update_and_delete(trip_id):
+    created = client.post(f"/trips/{trip_id}/itinerary/batch", json={"create": itinerary_items(3)}).json()["created"]
+    first, second, third = (item["id"] for item in created)
+
+    response = client.post(f"/trips/{trip_id}/itinerary/batch", json={
+        "update": [{"id": first, "name": "Renamed"}, {"id": second, "location": "Lisbon"}],
+        "delete": [third],
+    })
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert [item["name"] for item in result["updated"]] == ["Renamed", "Item 1"]
+    assert result["updated"][1]["location"] == "Lisbon"
+    assert result["deleted"] == [third]
+
+    names = [item["name"] for item in client.get(f"/trips/{trip_id}/itinerary").json()]
+    assert names == ["Renamed", "Item 1"]
+
+
+def test_invalid_items_are_reported_and_nothing_is_written(trip_id, db_session):
+    existing = client.post(f"/trips/{trip_id}/budget/batch", json={
+        "create": [{"amount": 10, "currency": "USD", "category": "Food"}],
+    }).json()["created"][0]
+
+    response = client.post(f"/trips/{trip_id}/budget/batch", json={
+        "create": [
+            {"amount": 5, "currency": "USD", "category": "Food"},
+            {"amount": "lots", "currency": "USD", "category": "Food"},
+            {"currency": "USD"},
+        ],
+        "update": [{"id": existing["id"], "amount": "free"}, {"id": 999999, "amount": 1}],
+        "delete": [888888],
+    })
+    assert response.status_code == 422
+    errors = response.json()["detail"]
+    assert [(e["op"], e["index"]) for e in errors] == [
+        ("create", 1), ("create", 2), ("update", 0), ("update", 1), ("delete", 0),
+    ]
+    assert errors[3]["detail"] == "Not found"
+
+    budget = client.get(f"/trips/{trip_id}/budget").json()
+    assert [(b["id"], b["amount"]) for b in budget] == [(existing["id"], 10)]
+
+
+def test_rows_of_other_trips_cannot_be_touched(trip_id):
+    other = client.post("/users/1/trips", json={
+        "title": "Other", "start_date": "2025-08-01T00:00:00", "end_date": "2025-08-02T00:00:00",
+    }).json()["id"]
+    foreign = client.post(f"/trips/{other}/destinations/batch", json={
+        "create": [{"name": "Porto", "location": "Portugal"}],
+    }).json()["created"][0]
+
+    response = client.post(f"/trips/{trip_id}/destinations/batch", json={"delete": [foreign["id"]]})
+    assert response.status_code == 422
+    assert client.post("/trips/987654/destinations/batch", json={}).status_code == 404
@@ -0,0 +1,191 @@
+import asyncio
+import pickle
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.cache import ExternalBackend, MemoryBackend, ReadCache, TTLCache
+from app.core.config import get_settings
+from app.main import app
+from app.services.read_cache import build_backend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_counts_hits_and_misses():
+    cache = TTLCache(maxsize=2, ttl=10)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=5, timer=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    clock.now = 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+class FakeStore:
+    """Stands in for a Redis client: async get/set/delete on bytes."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        assert isinstance(value, bytes) and ex >= 1
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.parametrize("backend", [MemoryBackend, lambda: ExternalBackend(FakeStore())])
+def test_read_cache_loads_once_and_invalidates_namespace(backend):
+    cache = ReadCache(backend(), ttl=30)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    async def scenario():
+        assert await cache.get_or_load("trip:1", "detail", load) == {"value": 1}
+        assert await cache.get_or_load("trip:1", "detail", load) == {"value": 1}
+        assert await cache.get_or_load("trip:2", "detail", load) == {"value": 2}
+        await cache.invalidate("trip:1")
+        assert await cache.get_or_load("trip:1", "detail", load) == {"value": 3}
+        assert await cache.get_or_load("trip:2", "detail", load) == {"value": 2}
+
+    asyncio.run(scenario())
+    assert cache.hits == 2 and cache.misses == 3
+
+
+def test_several_workers_need_a_shared_cache():
+    settings = get_settings().model_copy(update={"WEB_CONCURRENCY": 4, "READ_CACHE_URL": None})
+    with pytest.raises(RuntimeError, match="READ_CACHE_URL"):
+        build_backend(settings)
+    assert isinstance(build_backend(settings.model_copy(update={"WEB_CONCURRENCY": 1})), MemoryBackend)
+
+
+def test_external_backend_pickles_values_under_a_prefix():
+    store = FakeStore()
+    backend = ExternalBackend(store, prefix="test:")
+    asyncio.run(backend.set("k", [1, 2], ttl=0.5))
+    assert pickle.loads(store.data["test:k"]) == [1, 2]
+    assert asyncio.run(backend.get("k")) == [1, 2]
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ReadCache(MemoryBackend(), ttl=30)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "trip"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("trip:1", "detail", load) for _ in range(20)))
+
+    assert asyncio.run(scenario()) == ["trip"] * 20
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached():
+    cache = ReadCache(MemoryBackend(), ttl=30)
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_load("trip:1", "detail", load) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(scenario()))
+    assert asyncio.run(cache.get_or_load("trip:1", "detail", lambda: asyncio.sleep(0, "ok"))) == "ok"
+
+
+def test_cancelled_leader_hands_the_load_to_a_waiter():
+    cache = ReadCache(MemoryBackend(), ttl=30)
+    calls = []
+
+    async def load():
+        calls.append("load")
+        await asyncio.sleep(0.01)
+        return "trip"
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_load("trip:1", "detail", load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load("trip:1", "detail", load))
+        await asyncio.sleep(0)
+        # A client disconnecting cancels only its own request
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(scenario()) == "trip"
+    assert calls == ["load", "load"]
+
+
+def test_trip_reads_are_cached_until_a_write(db_engine, monkeypatch, auth_headers):
+    client = TestClient(app)
+    trip_id = client.post("/users/1/trips", json={
+        "title": "Cached trip", "start_date": "2025-09-01T00:00:00", "end_date": "2025-09-02T00:00:00",
+    }).json()["id"]
+    client.post(f"/trips/{trip_id}/destinations", json={"name": "Rome", "location": "Italy"})
+    client.get(f"/trips/{trip_id}")
+    client.get(f"/trips/{trip_id}/destinations")
+
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(f"/trips/{trip_id}").json()["title"] == "Cached trip"
+        assert [d["name"] for d in client.get(f"/trips/{trip_id}/destinations").json()] == ["Rome"]
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    # Both reads, and the destinations ETag, come from the cache
+    assert statements == []
+
+    client.post(f"/trips/{trip_id}/destinations", json={"name": "Florence", "location": "Italy"})
+    client.put(f"/trips/{trip_id}", json={
+        "title": "Renamed", "start_date": "2025-09-01T00:00:00", "end_date": "2025-09-02T00:00:00",
+    })
+    assert client.get(f"/trips/{trip_id}").json()["title"] == "Renamed"
+    assert len(client.get(f"/trips/{trip_id}/destinations").json()) == 2
+    monkeypatch.setattr(get_settings(), "METRICS_ENABLED", True)
+    assert client.get("/metrics/read-cache", headers=auth_headers).json()["hits"] >= 2
@@ -0,0 +1,100 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def add_event(headers, title, start, end, **extra):
+    response = client.post("/events/", headers=headers, json={
+        "title": title, "start_date": f"2025-08-{start}:00", "end_date": f"2025-08-{end}:00", **extra,
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def freebusy(headers, **params):
+    params = {"from": "2025-08-01T00:00:00", "to": "2025-08-03T00:00:00", **params}
+    response = client.get("/events/freebusy", headers=headers, params=params)
+    assert response.status_code == 200
+    return [(span["start"][8:16], span["end"][8:16]) for span in response.json()["busy"]]
+
+
+def test_freebusy_merges_overlapping_events(auth_headers):
+    add_event(auth_headers, "Hike", "01T09:00", "01T12:00")
+    add_event(auth_headers, "Picnic", "01T11:00", "01T13:10")
+    add_event(auth_headers, "Nap", "01T13:10", "01T14:00")
+    add_event(auth_headers, "Dinner", "01T19:05", "01T20:00")
+    add_event(auth_headers, "Night train", "01T23:00", "02T07:00")
+    add_event(auth_headers, "Earlier", "07T09:00", "07T10:00")
+
+    assert freebusy(auth_headers) == [
+        ("01T09:00", "01T14:00"), ("01T19:05", "01T20:00"), ("01T23:00", "02T07:00"),
+    ]
+    assert freebusy(auth_headers, granularity=30) == [
+        ("01T09:00", "01T14:00"), ("01T19:00", "01T20:00"), ("01T23:00", "02T07:00"),
+    ]
+    assert freebusy(auth_headers, to="2025-08-02T00:00:00", **{"from": "2025-08-01T12:30:00"}) == [
+        ("01T12:30", "01T14:00"), ("01T19:05", "01T20:00"), ("01T23:00", "02T00:00"),
+    ]
+
+
+def test_days_bucket_events_and_busy_time(auth_headers):
+    add_event(auth_headers, "Museum", "10T10:00", "10T12:00")
+    add_event(auth_headers, "Gallery", "10T11:00", "10T13:00")
+    add_event(auth_headers, "Ferry", "10T22:00", "11T02:00")
+    add_event(auth_headers, "Check-in", "12T00:00", "12T00:00")
+
+    response = client.get("/events/days", headers=auth_headers, params={"from": "2025-08-09", "to": "2025-08-13"})
+    assert response.status_code == 200
+    days = {day["day"]: day for day in response.json()}
+    assert list(days) == ["2025-08-09", "2025-08-10", "2025-08-11", "2025-08-12"]
+    assert days["2025-08-09"]["event_count"] == 0
+    assert [e["title"] for e in days["2025-08-10"]["events"]] == ["Museum", "Gallery", "Ferry"]
+    assert days["2025-08-10"]["busy_seconds"] == 5 * 3600
+    assert [e["title"] for e in days["2025-08-11"]["events"]] == ["Ferry"]
+    assert days["2025-08-11"]["busy_seconds"] == 2 * 3600
+    assert days["2025-08-12"]["event_count"] == 1 and days["2025-08-12"]["busy_seconds"] == 0
+
+
+def test_cached_views_follow_event_writes(auth_headers):
+    params = {"from": "2025-08-20", "to": "2025-08-21"}
+    assert client.get("/events/days", headers=auth_headers, params=params).json()[0]["event_count"] == 0
+
+    event = add_event(auth_headers, "Concert", "20T20:00", "20T22:00")
+    assert client.get("/events/days", headers=auth_headers, params=params).json()[0]["event_count"] == 1
+
+    client.delete(f"/events/{event['id']}", headers=auth_headers)
+    assert client.get("/events/days", headers=auth_headers, params=params).json()[0]["event_count"] == 0
+
+
+def test_trip_deletion_clears_its_events_from_views(user, auth_headers):
+    trip = client.post(f"/users/{user.id}/trips", json={
+        "title": "Oslo", "start_date": "2025-08-25T00:00:00", "end_date": "2025-08-26T00:00:00",
+    }).json()
+    add_event(auth_headers, "Fjord tour", "25T10:00", "25T12:00", trip_id=trip["id"])
+    params = {"from": "2025-08-25T00:00:00", "to": "2025-08-26T00:00:00"}
+    assert client.get("/events/freebusy", headers=auth_headers, params=params).json()["busy"]
+
+    client.delete(f"/trips/{trip['id']}")
+    assert client.get("/events/freebusy", headers=auth_headers, params=params).json()["busy"] == []
+
+
+def test_ranges_with_an_offset_are_read_as_utc(auth_headers):
+    add_event(auth_headers, "Boat", "15T09:00", "15T10:00")
+    add_event(auth_headers, "Lunch", "15T12:30", "15T13:30")
+
+    # 11:00-14:00 at +02:00 is 09:00-12:00 UTC, which holds the boat and not lunch
+    local = {"from": "2025-08-15T11:00:00+02:00", "to": "2025-08-15T14:00:00+02:00"}
+    assert freebusy(auth_headers, **local) == [("15T09:00", "15T10:00")]
+    assert freebusy(auth_headers, **{"from": "2025-08-15T09:30:00Z", "to": "2025-08-15T13:00:00Z"}) == [
+        ("15T09:30", "15T10:00"), ("15T12:30", "15T13:00"),
+    ]
+
+
+def test_invalid_ranges(auth_headers):
+    backwards = {"from": "2025-08-02T00:00:00", "to": "2025-08-01T00:00:00"}
+    assert client.get("/events/freebusy", headers=auth_headers, params=backwards).status_code == 400
+    too_long = {"from": "2025-01-01", "to": "2027-01-01"}
+    assert client.get("/events/days", headers=auth_headers, params=too_long).status_code == 400
+    assert client.get("/events/days", params={"from": "2025-08-01", "to": "2025-08-02"}).status_code == 401
@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.auth import create_access_token
+from app.core.pubsub import LocalBroker
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def team(make_user):
+    owner, editor, stranger = (
+        (user, create_access_token({"sub": user.username})) for user in (make_user() for _ in range(3))
+    )
+    trip_id = client.post(f"/users/{owner[0].id}/trips", json={
+        "title": "Shared", "start_date": "2025-09-01T00:00:00", "end_date": "2025-09-05T00:00:00",
+    }).json()["id"]
+    return trip_id, owner, editor, stranger
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {user[1]}"}
+
+
+def test_changes_coalesce_per_row():
+    async def scenario():
+        broker = LocalBroker()
+        subscription = broker.subscribe("trip:1", maxsize=3)
+        await broker.publish("trip:1", {"kind": "destinations", "op": "upsert", "ids": [1, 2]})
+        await broker.publish("trip:1", {"kind": "destinations", "op": "upsert", "ids": [1]})
+        await broker.publish("trip:2", {"kind": "destinations", "op": "upsert", "ids": [9]})
+        await broker.publish("trip:1", {"kind": "budget", "op": "delete", "ids": [5]})
+        # Row 1 changed twice but is sent once, after row 2
+        assert await subscription.next_batch() == [
+            {"kind": "destinations", "op": "upsert", "ids": [2, 1]},
+            {"kind": "budget", "op": "delete", "ids": [5]},
+        ]
+
+        # Falling more than maxsize rows behind collapses to one resync
+        await broker.publish("trip:1", {"kind": "itineraries", "op": "upsert", "ids": [1, 2, 3, 4]})
+        await broker.publish("trip:1", {"kind": "itineraries", "op": "upsert", "ids": [5]})
+        assert await subscription.next_batch() == [{"op": "resync"}]
+
+        waiting = asyncio.create_task(subscription.next_batch())
+        await asyncio.sleep(0)
+        subscription.close()
+        assert await waiting == [] and not broker.channels
+
+    asyncio.run(scenario())
+
+
+def test_sharing_a_trip(team):
+    trip_id, owner, editor, stranger = team
+    added = client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": editor[0].username},
+    )
+    assert added.status_code == 200 and added.json()["role"] == "editor"
+    changed = client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner),
+        json={"username": editor[0].username, "role": "viewer"},
+    )
+    assert changed.json()["role"] == "viewer"
+
+    listed = client.get(f"/trips/{trip_id}/collaborators", headers=auth(editor)).json()
+    assert [(row["username"], row["role"]) for row in listed] == [(editor[0].username, "viewer")]
+    assert client.get(f"/trips/{trip_id}/collaborators", headers=auth(stranger)).status_code == 404
+    assert client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(editor), json={"username": stranger[0].username},
+    ).status_code == 403
+    assert client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": "nobody_at_all"},
+    ).status_code == 404
+    assert client.delete(f"/trips/{trip_id}/collaborators/{owner[0].id}", headers=auth(editor)).status_code == 403
+
+    assert client.delete(f"/trips/{trip_id}/collaborators/{editor[0].id}", headers=auth(editor)).status_code == 200
+    assert client.get(f"/trips/{trip_id}/collaborators", headers=auth(owner)).json() == []
+
+
+def test_roles_decide_who_changes_a_shared_trip(team):
+    trip_id, owner, editor, viewer = team
+    # Before it is shared a trip keeps the open access of the other trip routes
+    destination = client.post(f"/trips/{trip_id}/destinations", json={"name": "Quay", "location": "Harbour"}).json()
+    client.post(f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": editor[0].username})
+    client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": viewer[0].username, "role": "viewer"},
+    )
+
+    item = client.post(
+        f"/trips/{trip_id}/itinerary", headers=auth(editor), json={"name": "Walk", "time": "2025-09-02T10:00:00"},
+    )
+    assert item.status_code == 200
+    budget = client.post(
+        f"/trips/{trip_id}/budget", headers=auth(owner), json={"amount": 30, "currency": "EUR", "category": "Food"},
+    ).json()
+    dates = {"start_date": "2025-09-01", "end_date": "2025-09-05"}
+    assert client.post(f"/trips/{trip_id}/dates", headers=auth(editor), json=dates).status_code == 200
+
+    writes = [
+        ("post", f"/trips/{trip_id}/destinations", {"name": "Cove", "location": "Harbour"}),
+        ("put", f"/destinations/{destination['id']}", {"name": "Quay 2", "location": "Harbour"}),
+        ("patch", f"/destinations/{destination['id']}", {"version": 1, "name": "Quay 3"}),
+        ("post", f"/trips/{trip_id}/destinations/batch", {"delete": [destination["id"]]}),
+        ("post", f"/trips/{trip_id}/destinations/optimize", {}),
+        ("patch", f"/itinerary/{item.json()['id']}", {"version": 1, "name": "Run"}),
+        ("post", f"/trips/{trip_id}/itinerary/schedule", {}),
+        ("put", f"/budget/{budget['id']}", {"amount": 40}),
+        ("delete", f"/budget/{budget['id']}", None),
+        ("patch", f"/trips/{trip_id}/dates", {"version": 1, "end_date": "2025-09-06"}),
+    ]
+    for method, url, body in writes:
+        kwargs = {} if body is None else {"json": body}
+        assert client.request(method, url, headers=auth(viewer), **kwargs).status_code == 403, url
+        assert client.request(method, url, **kwargs).status_code == 401, url
+
+    # Reads stay open to viewers, and the rows are unchanged
+    assert client.get(f"/destinations/{destination['id']}").json()["name"] == "Quay"
+    assert client.patch(
+        f"/destinations/{destination['id']}", headers=auth(editor), json={"version": 1, "name": "Quay 3"},
+    ).json()["version"] == 2
+    assert client.delete(f"/budget/{budget['id']}", headers=auth(owner)).status_code == 200
+    assert client.delete(f"/itinerary/{item.json()['id']}", headers=auth(editor)).status_code == 200
+
+    # Someone the trip is not shared with cannot see it to change it
+    client.delete(f"/trips/{trip_id}/collaborators/{viewer[0].id}", headers=auth(owner))
+    assert client.post(
+        f"/trips/{trip_id}/destinations", headers=auth(viewer), json={"name": "Cove", "location": "Harbour"},
+    ).status_code == 404
+
+
+def test_only_the_owner_deletes_a_shared_trip(team):
+    trip_id, owner, editor, viewer = team
+    client.post(f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": editor[0].username})
+    client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": viewer[0].username, "role": "viewer"},
+    )
+    trip = client.get(f"/trips/{trip_id}").json()
+    fields = {key: trip[key] for key in ("title", "start_date", "end_date")}
+
+    writes = [
+        ("put", {**fields, "title": "Taken over"}),
+        ("patch", {"version": trip["version"], "title": "Taken over"}),
+        ("delete", None),
+    ]
+    for method, body in writes:
+        kwargs = {} if body is None else {"json": body}
+        assert client.request(method, f"/trips/{trip_id}", headers=auth(viewer), **kwargs).status_code == 403, method
+        assert client.request(method, f"/trips/{trip_id}", **kwargs).status_code == 401, method
+    assert client.get(f"/trips/{trip_id}").json()["title"] == "Shared"
+
+    # Editors change the trip, and viewers may still copy it
+    patched = client.patch(f"/trips/{trip_id}", headers=auth(editor), json={"version": trip["version"], "title": "Edited"})
+    assert patched.status_code == 200
+    assert client.post(f"/trips/{trip_id}/clone", headers=auth(viewer), json={}).status_code == 201
+    assert client.post(f"/trips/{trip_id}/clone", json={}).status_code == 401
+
+    assert client.delete(f"/trips/{trip_id}", headers=auth(editor)).status_code == 403
+    assert client.delete(f"/trips/{trip_id}", headers=auth(owner)).status_code == 200
+
+
+def test_only_trip_editors_attach_events(team):
+    trip_id, owner, editor, outsider = team
+    event = {"title": "Ferry", "start_date": "2025-09-02T08:00:00", "end_date": "2025-09-02T09:00:00", "trip_id": trip_id}
+    body = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:ferry@example.com\r\nSUMMARY:Ferry\r\n"
+        "DTSTART:20250902T080000Z\r\nDTEND:20250902T090000Z\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    # Not shared yet, but still only the owner's to add to
+    assert client.post("/events/", headers=auth(outsider), json=event).status_code == 404
+    assert client.post(
+        "/events/import.ics", headers=auth(outsider), params={"trip_id": trip_id}, content=body,
+    ).status_code == 404
+    assert client.post("/events/", headers=auth(owner), json=event).status_code == 200
+
+    client.post(f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": editor[0].username})
+    client.post(
+        f"/trips/{trip_id}/collaborators", headers=auth(owner),
+        json={"username": outsider[0].username, "role": "viewer"},
+    )
+    assert client.post("/events/", headers=auth(editor), json=event).status_code == 200
+    assert client.post("/events/", headers=auth(outsider), json=event).status_code == 403
+    assert client.post(
+        "/events/import.ics", headers=auth(outsider), params={"trip_id": trip_id}, content=body,
+    ).status_code == 403
+    assert client.post("/events/", headers=auth(outsider), json={**event, "trip_id": None}).status_code == 200
+
+
+def test_live_trip_channel(team):
+    trip_id, owner, editor, stranger = team
+    client.post(f"/trips/{trip_id}/collaborators", headers=auth(owner), json={"username": editor[0].username})
+
+    # One portal for every call, so writes and the socket share an event loop
+    with TestClient(app) as live:
+        for token in ("", stranger[1]):
+            with pytest.raises(WebSocketDisconnect) as closed:
+                with live.websocket_connect(f"/trips/{trip_id}/live?token={token}"):
+                    pass
+            assert closed.value.code == 1008
+
+        with live.websocket_connect(f"/trips/{trip_id}/live?token={editor[1]}") as socket:
+            destination = live.post(
+                f"/trips/{trip_id}/destinations", headers=auth(owner), json={"name": "Pier", "location": "Dock"},
+            ).json()
+            live.put(
+                f"/destinations/{destination['id']}", headers=auth(editor), json={"name": "Pier 2", "location": "Dock"},
+            )
+            live.post(
+                f"/trips/{trip_id}/budget", headers=auth(editor),
+                json={"amount": 12, "currency": "USD", "category": "Food"},
+            )
+            live.post(
+                f"/trips/{trip_id}/dates", headers=auth(owner), json={"start_date": "2025-09-01", "end_date": "2025-09-05"},
+            )
+            live.delete(f"/destinations/{destination['id']}", headers=auth(owner))
+
+            # However the sends were batched, each row's latest change arrives
+            latest, batches = {}, 0
+            while latest.get(("destinations", destination["id"])) != "delete" or len(latest) < 3:
+                for change in socket.receive_json():
+                    for row_id in change["ids"]:
+                        latest[change["kind"], row_id] = change["op"]
+                batches += 1
+            assert {kind for kind, _ in latest} == {"destinations", "budget", "dates"} and batches <= 5
+
+            live.delete(f"/trips/{trip_id}", headers=auth(owner))
+            assert socket.receive_json()[-1] == {"kind": "trips", "op": "delete", "ids": [trip_id]}
+            with pytest.raises(WebSocketDisconnect):
+                socket.receive_json()
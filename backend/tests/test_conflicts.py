@@ -0,0 +1,141 @@
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import sqlite
+
+from app.main import app
+from app.models.calendar_event import CalendarEvent
+from app.services import conflicts
+
+client = TestClient(app)
+
+
+def add_event(headers, title, start, end):
+    response = client.post("/events/", headers=headers, json={
+        "title": title, "start_date": f"2025-07-01T{start}:00", "end_date": f"2025-07-01T{end}:00",
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_new_event_reports_overlapping_events(auth_headers):
+    long = add_event(auth_headers, "Conference", "08:00", "18:00")
+    add_event(auth_headers, "Breakfast", "07:00", "08:00")
+    assert add_event(auth_headers, "Early", "06:00", "07:00")["conflicts"] == []
+
+    lunch = add_event(auth_headers, "Lunch", "12:00", "13:00")
+    assert [item["id"] for item in lunch["conflicts"]] == [long["id"]]
+
+    overlap = add_event(auth_headers, "Call", "12:30", "14:00")
+    assert [item["title"] for item in overlap["conflicts"]] == ["Conference", "Lunch"]
+
+    # Each duration bucket is searched back by its own bound
+    residency = client.post("/events/", headers=auth_headers, json={
+        "title": "Residency", "start_date": "2025-06-10T00:00:00", "end_date": "2025-07-05T00:00:00",
+    }).json()
+    assert [item["title"] for item in residency["conflicts"]] == ["Early", "Breakfast", "Conference", "Lunch", "Call"]
+    late = add_event(auth_headers, "Late", "22:00", "23:00")
+    assert [item["id"] for item in late["conflicts"]] == [residency["id"]]
+
+
+def test_new_itinerary_item_reports_items_in_the_same_slot(user):
+    trip = client.post(f"/users/{user.id}/trips", json={
+        "title": "Lisbon", "start_date": "2025-07-01T00:00:00", "end_date": "2025-07-03T00:00:00",
+    }).json()
+    url = f"/trips/{trip['id']}/itinerary"
+
+    first = client.post(url, json={"name": "Tram 28", "time": "2025-07-01T10:00:00"}).json()
+    assert first["conflicts"] == []
+    assert client.post(url, json={"name": "Lunch", "time": "2025-07-01T10:30:00"}).json()["conflicts"] == []
+    clash = client.post(url, json={"name": "Castle", "time": "2025-07-01T10:10:00"}).json()
+    assert {item["title"] for item in clash["conflicts"]} == {"Tram 28", "Lunch"}
+
+
+def test_user_conflicts_lists_every_pair(user, auth_headers):
+    add_event(auth_headers, "A", "09:00", "12:00")
+    add_event(auth_headers, "B", "10:00", "11:00")
+    add_event(auth_headers, "C", "11:30", "13:00")
+    add_event(auth_headers, "D", "13:00", "14:00")
+    trip = client.post(f"/users/{user.id}/trips", json={
+        "title": "Porto", "start_date": "2025-07-02T00:00:00", "end_date": "2025-07-03T00:00:00",
+    }).json()
+    for name, time in (("Bridge", "09:00"), ("Cellar", "09:20"), ("Market", "11:00")):
+        client.post(f"/trips/{trip['id']}/itinerary", json={"name": name, "time": f"2025-07-02T{time}:00"})
+
+    response = client.get("/users/me/conflicts", headers=auth_headers)
+    assert response.status_code == 200
+    pairs = [(c["kind"], c["first"]["title"], c["second"]["title"]) for c in response.json()]
+    assert pairs == [
+        ("event", "A", "B"), ("event", "A", "C"), ("itinerary", "Bridge", "Cellar"),
+    ]
+
+    limited = client.get("/users/me/conflicts", headers=auth_headers, params={"limit": 1})
+    assert len(limited.json()) == 1
+    window = client.get("/users/me/conflicts", headers=auth_headers, params={"to": "2025-07-02T00:00:00"})
+    assert [c["kind"] for c in window.json()] == ["event", "event"]
+    assert client.get("/users/me/conflicts").status_code == 401
+
+
+def test_event_lookup_is_an_index_range_scan(db_session, user):
+    # Compile the same statement the service runs and ask SQLite how it executes it
+    async def explain():
+        async with db_session() as db:
+            # A three-week longest event brings in every duration bucket
+            stmt = conflicts.event_overlap_query(
+                user.id, datetime(2025, 7, 1, 9), datetime(2025, 7, 1, 10), 21 * 24 * 3600
+            )
+            sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+            return [row[-1] for row in await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    searches = [detail for detail in asyncio.run(explain()) if detail.startswith("SEARCH")]
+    assert len(searches) == 4
+    for detail in searches:
+        assert "USING INDEX ix_calendar_events_user_id_bucket_start_date" in detail
+        assert "duration_bucket=?" in detail and "start_date>" in detail and "start_date<" in detail
+
+
+@pytest.mark.benchmark
+def test_overlap_checks_scale_to_100k_events(db_session, make_user):
+    # Checks against 100k events should cost about what they cost against 1k,
+    # even with a four-week event in the calendar
+    rng = random.Random(17)
+    origin = datetime(2024, 1, 1)
+
+    async def fill(user_id, count):
+        rows = []
+        for _ in range(count):
+            start = origin + timedelta(minutes=rng.randrange(2 * 365 * 24 * 4) * 15)
+            length = timedelta(minutes=rng.choice([15, 30, 60, 90, 180, 24 * 60, 3 * 24 * 60]))
+            rows.append({"title": "Busy", "user_id": user_id, "start_date": start, "end_date": start + length})
+        rows.append({"title": "Sabbatical", "user_id": user_id,
+                     "start_date": origin + timedelta(days=300), "end_date": origin + timedelta(days=328)})
+        async with db_session() as db:
+            await db.execute(insert(CalendarEvent), rows)
+            await db.commit()
+
+    async def time_checks(user_id, checks=300):
+        timings, found = [], 0
+        async with db_session() as db:
+            for _ in range(checks):
+                start = origin + timedelta(minutes=rng.randrange(2 * 365 * 24 * 4) * 15)
+                began = time.perf_counter()
+                found += len(await conflicts.find_event_conflicts(db, user_id, start, start + timedelta(hours=1)))
+                timings.append(time.perf_counter() - began)
+        return statistics.median(timings), statistics.quantiles(timings, n=20)[-1], found / checks
+
+    small, large = make_user(), make_user()
+    asyncio.run(fill(small.id, 1_000))
+    asyncio.run(fill(large.id, 100_000))
+    small_median, _, _ = asyncio.run(time_checks(small.id))
+    median, p95, per_check = asyncio.run(time_checks(large.id))
+    print(
+        f"\n1k events: median {small_median * 1000:.2f} ms; 100k events: median {median * 1000:.2f} ms, "
+        f"p95 {p95 * 1000:.2f} ms, {per_check:.1f} conflicts per check"
+    )
+    assert median < 3 * small_median + 0.002 and p95 < 0.05
@@ -0,0 +1,72 @@
+from sqlalchemy import create_engine, text
+
+from app.core.config import Settings
+from app.core.database import engine_options, install_sqlite_pragmas, pool_status, to_async_url
+
+
+def test_sqlite_url_uses_aiosqlite():
+    assert to_async_url("sqlite:///./sql_app.db") == "sqlite+aiosqlite:///./sql_app.db"
+
+
+def test_postgres_url_uses_asyncpg():
+    url = to_async_url("postgresql://waymark:secret@db:5432/waymark")
+    assert url == "postgresql+asyncpg://waymark:secret@db:5432/waymark"
+
+
+def test_postgres_driver_is_replaced():
+    url = to_async_url("postgresql+psycopg2://waymark:secret@db/waymark")
+    assert url.startswith("postgresql+asyncpg://")
+
+
+def test_unknown_backend_is_left_alone():
+    assert to_async_url("mysql://u:p@h/db") == "mysql://u:p@h/db"
+
+
+def make_settings(**overrides):
+    return Settings(DATABASE_URL="sqlite://", SECRET_KEY="test", **overrides)
+
+
+def test_sqlite_engine_has_no_pool_tuning():
+    options = engine_options("sqlite:///./sql_app.db", make_settings())
+    assert options == {"connect_args": {"check_same_thread": False}}
+
+
+def test_postgres_pool_comes_from_settings():
+    settings = make_settings(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=7, DB_STATEMENT_TIMEOUT_MS=250)
+    options = engine_options("postgresql://u:p@db/waymark", settings)
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=250"}
+
+
+def test_asyncpg_statement_timeout_uses_server_settings():
+    options = engine_options("postgresql+asyncpg://u:p@db/waymark", make_settings())
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "15000"
+
+
+def test_sqlite_pragmas_are_applied(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    install_sqlite_pragmas(engine, make_settings(SQLITE_BUSY_TIMEOUT_MS=1234))
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert pool_status(engine)["checkedout"] == 0
+    engine.dispose()
+
+
+def test_pool_metrics_endpoint(monkeypatch, auth_headers):
+    from fastapi.testclient import TestClient
+    from app.core.config import get_settings
+    from app.main import app
+
+    client = TestClient(app)
+    # Disabled unless configured, and never shown to anonymous callers
+    assert client.get("/metrics/db", headers=auth_headers).status_code == 404
+    monkeypatch.setattr(get_settings(), "METRICS_ENABLED", True)
+    assert client.get("/metrics/db").status_code == 401
+
+    response = client.get("/metrics/db", headers=auth_headers)
+    assert response.status_code == 200
+    assert "pool" in response.json()
@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+
+from app.core.geocoding import GazetteerResolver, bounding_boxes, haversine_km, normalize_location
+from app.main import app
+from app.models.geocode import GeocodedLocation
+from app.services import geocoding
+
+client = TestClient(app)
+LISBON = (38.7223, -9.1393)
+
+
+@pytest.fixture
+def counting_resolver(monkeypatch):
+    calls = []
+    bundled = GazetteerResolver()
+
+    class Counting:
+        def resolve(self, location):
+            calls.append(location)
+            return bundled.resolve(location)
+
+    monkeypatch.setattr(geocoding, "resolver", Counting())
+    geocoding.location_cache.clear()
+    return calls
+
+
+def create_trip(user_id):
+    return client.post(f"/users/{user_id}/trips", json={
+        "title": "Iberia", "start_date": "2025-10-01T00:00:00", "end_date": "2025-10-10T00:00:00",
+    }).json()
+
+
+def add_destination(trip_id, name, location, **extra):
+    response = client.post(f"/trips/{trip_id}/destinations", json={"name": name, "location": location, **extra})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_gazetteer_lookup():
+    gazetteer = GazetteerResolver()
+    assert normalize_location("  São  Paulo! ") == "sao paulo"
+    assert gazetteer.resolve("Chiado, Lisbon") == LISBON
+    assert gazetteer.resolve("Lisboa") == LISBON
+    assert gazetteer.resolve("lisbon portugal") == LISBON
+    assert gazetteer.resolve("ZÜRICH") == (47.3769, 8.5417)
+    assert gazetteer.resolve("Atlantis") is None
+
+
+def test_distance_and_boxes():
+    assert haversine_km(*LISBON, 41.1579, -8.6291) == pytest.approx(274, abs=2)
+    [(south, west, north, east)] = bounding_boxes(*LISBON, 100)
+    assert south < LISBON[0] < north and west < LISBON[1] < east
+    # Circles across the antimeridian split in two, and ones reaching a pole span every longitude
+    assert [box[1:4:2] for box in bounding_boxes(0, 179.9, 100)] == [
+        (pytest.approx(179.0, abs=0.1), 180.0), (-180.0, pytest.approx(-179.2, abs=0.1)),
+    ]
+    assert bounding_boxes(89.5, 0, 100)[0][1:4:2] == (-180.0, 180.0)
+
+
+def test_locations_are_geocoded_once_and_cached(db_session, user, counting_resolver):
+    trip = create_trip(user.id)
+    first = add_destination(trip["id"], "Old town", "Alfama, Lisbon")
+    assert (first["latitude"], first["longitude"]) == LISBON
+    add_destination(trip["id"], "Old town again", "alfama,  LISBON")
+    unknown = add_destination(trip["id"], "Somewhere", "Atlantis")
+    assert unknown["latitude"] is None
+    add_destination(trip["id"], "Somewhere else", "atlantis")
+    assert counting_resolver == ["Alfama, Lisbon", "Atlantis"]
+
+    # The answers, misses included, persist across processes
+    async def stored():
+        async with db_session() as db:
+            stmt = select(GeocodedLocation).where(GeocodedLocation.query.in_(["alfama lisbon", "atlantis"]))
+            rows = await db.execute(stmt)
+            return {row.query: row.latitude for row in rows.scalars()}
+
+    assert asyncio.run(stored()) == {"alfama lisbon": LISBON[0], "atlantis": None}
+    geocoding.location_cache.clear()
+    add_destination(trip["id"], "Old town, third time", "Alfama, Lisbon")
+    assert counting_resolver == ["Alfama, Lisbon", "Atlantis"]
+
+
+def test_explicit_and_updated_coordinates(user):
+    trip = create_trip(user.id)
+    pinned = add_destination(trip["id"], "Cabo da Roca", "Sintra coast", latitude=38.7804, longitude=-9.4989)
+    assert (pinned["latitude"], pinned["longitude"]) == (38.7804, -9.4989)
+
+    moved = client.put(f"/destinations/{pinned['id']}", json={**pinned, "location": "Porto"}).json()
+    assert (moved["latitude"], moved["longitude"]) == (41.1579, -8.6291)
+
+    item = client.post(f"/trips/{trip['id']}/itinerary", json={
+        "name": "Flight", "time": "2025-10-01T08:00:00", "location": "Madrid",
+    }).json()
+    assert (item["latitude"], item["longitude"]) == (40.4168, -3.7038)
+    batch = client.post(f"/trips/{trip['id']}/destinations/batch", json={
+        "create": [{"name": "Capital", "location": "Madrid"}],
+        "update": [{"id": moved["id"], "location": "Seville"}],
+    }).json()
+    assert batch["created"][0]["latitude"] == 40.4168
+    assert batch["updated"][0]["latitude"] == 37.3891
+
+
+def test_nearby_uses_the_spatial_index(db_engine, db_path, user, auth_headers, make_user):
+    other = make_user()
+    trip = create_trip(user.id)
+    for name in ("Lisbon", "Porto", "Madrid"):
+        add_destination(trip["id"], name, name)
+    add_destination(create_trip(other.id)["id"], "Other Lisbon", "Lisbon")
+
+    def nearby(radius, **params):
+        response = client.get("/destinations/nearby", headers=auth_headers, params={
+            "lat": 38.7, "lon": -9.1, "radius": radius, **params,
+        })
+        assert response.status_code == 200
+        return [(row["name"], round(row["distance_km"])) for row in response.json()]
+
+    assert nearby(50) == [("Lisbon", 4)]
+    assert nearby(400) == [("Lisbon", 4), ("Porto", 276)]
+    assert [name for name, _ in nearby(600)] == ["Lisbon", "Porto", "Madrid"]
+    assert nearby(600, limit=1) == [("Lisbon", 4)]
+    assert client.get("/destinations/nearby", params={"lat": 0, "lon": 0, "radius": 1}).status_code == 401
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "destinations_rtree" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        nearby(50)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    connection = sqlite3.connect(db_path)
+    plan = " | ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {statements[0][0]}", statements[0][1]))
+    connection.close()
+    # The box is an R-tree range scan, and destinations are fetched by primary key from its ids
+    assert "SCAN destinations_rtree VIRTUAL TABLE INDEX 2:" in plan, plan
+    assert "SEARCH destinations USING INTEGER PRIMARY KEY" in plan, plan
+    assert "ix_trips_user_id" not in plan, plan
@@ -0,0 +1,109 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.core.http_cache import _matches, make_etag
+from app.main import app
+from app.models.destinations import Destinations
+from app.services.read_cache import invalidate_trip
+
+client = TestClient(app)
+
+
+def make_trip():
+    return client.post("/users/1/trips", json={
+        "title": "Cached", "start_date": "2025-07-01T00:00:00", "end_date": "2025-07-03T00:00:00",
+    }).json()["id"]
+
+
+def test_etag_comparison_is_weak():
+    etag = make_etag("trips", 1)
+    assert etag.startswith('W/"')
+    assert _matches(etag, etag)
+    assert _matches(etag.removeprefix("W/"), etag)
+    assert _matches(f'"other", {etag}', etag)
+    assert _matches("*", etag)
+    assert not _matches('W/"other"', etag)
+
+
+def test_itinerary_list_revalidates_from_the_cached_page(db_engine):
+    trip_id = make_trip()
+    url = f"/trips/{trip_id}/itinerary"
+    created = client.post(f"/trips/{trip_id}/itinerary/batch", json={"create": [
+        {"name": "Museum", "time": "2025-07-01T10:00:00"},
+        {"name": "Dinner", "time": "2025-07-01T19:00:00"},
+    ]}).json()["created"]
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        cached = client.get(url, headers={"If-None-Match": etag})
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    # The tag comes from the cached page, so revalidating ran no query
+    assert statements == []
+
+    # Different pages have different validators
+    assert client.get(url, params={"limit": 1}).headers["ETag"] != etag
+
+    client.put(f"/itinerary/{created[0]['id']}", json={"name": "Gallery", "time": "2025-07-01T10:00:00"})
+    updated = client.get(url, headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()[0]["name"] == "Gallery"
+
+    etag = updated.headers["ETag"]
+    client.post(f"/trips/{trip_id}/itinerary/batch", json={"update": [{"id": created[1]["id"], "name": "Supper"}]})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get(url).headers["ETag"]
+    client.delete(f"/itinerary/{created[1]['id']}")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_list_etag_follows_the_body_it_is_sent_with(db_session):
+    trip_id = make_trip()
+    url = f"/trips/{trip_id}/destinations"
+    destination = client.post(url, json={"name": "Quay", "location": "Harbour"}).json()
+    first = client.get(url)
+
+    # A write this worker has not seen yet: the cached body is served, and so is its tag
+    async def write_elsewhere():
+        async with db_session() as db:
+            await db.execute(update(Destinations).values(name="Pier", version=Destinations.version + 1))
+            await db.commit()
+
+    asyncio.run(write_elsewhere())
+    stale = client.get(url)
+    assert stale.json()[0]["version"] == 1 and stale.headers["ETag"] == first.headers["ETag"]
+
+    asyncio.run(invalidate_trip(trip_id))
+    fresh = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert fresh.status_code == 200 and fresh.json()[0]["version"] == destination["version"] + 1
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+
+
+def test_trip_and_dates_revalidate():
+    trip_id = make_trip()
+    client.post(f"/trips/{trip_id}/dates", json={"start_date": "2025-07-01", "end_date": "2025-07-03"})
+
+    for url in (f"/trips/{trip_id}", f"/trips/{trip_id}/dates"):
+        etag = client.get(url).headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    etag = client.get(f"/trips/{trip_id}").headers["ETag"]
+    client.put(f"/trips/{trip_id}", json={
+        "title": "Renamed", "start_date": "2025-07-01T00:00:00", "end_date": "2025-07-03T00:00:00",
+    })
+    assert client.get(f"/trips/{trip_id}", headers={"If-None-Match": etag}).status_code == 200
+
+    assert "ETag" not in client.get("/trips/987654").headers
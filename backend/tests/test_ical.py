@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import ical
+from app.main import app
+
+client = TestClient(app)
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(chunks):
+    return [event async for event in ical.iter_vevents(chunks)]
+
+
+def test_long_lines_fold_and_parse_back_from_any_chunking():
+    description = "Café, museum; then dinner\nby the river " * 6
+    text = (
+        "BEGIN:VCALENDAR\r\n"
+        + ical.vevent("x@waymark", datetime(2025, 6, 1, 9), "Day ☀", description=description,
+                      end=datetime(2025, 6, 1, 17))
+        + "END:VCALENDAR\r\n"
+    )
+    assert all(len(line.encode()) <= 75 for line in text.split("\r\n"))
+
+    for size in (1, 7, 4096):
+        [event] = asyncio.run(collect(chunked(text.encode(), size)))
+        assert ical.unescape_text(event["DESCRIPTION"][1]) == description
+        assert ical.unescape_text(event["SUMMARY"][1]) == "Day ☀"
+        assert ical.parse_datetime(event["DTEND"][1]) == datetime(2025, 6, 1, 17)
+
+
+def test_parse_values():
+    assert ical.parse_line('DTSTART;TZID="Europe/Paris":20250601T100000') == (
+        "DTSTART", {"TZID": "Europe/Paris"}, "20250601T100000"
+    )
+    assert ical.parse_datetime("20250601", {"VALUE": "DATE"}) == datetime(2025, 6, 1)
+    assert ical.parse_datetime("20250601T100000Z") == datetime(2025, 6, 1, 10)
+    assert ical.parse_duration("P1DT2H30M") == timedelta(days=1, hours=2, minutes=30)
+    with pytest.raises(ical.ICalendarError):
+        ical.parse_datetime("tomorrow")
+
+
+def test_events_export_import_roundtrip(auth_headers):
+    for hour in range(3):
+        client.post("/events/", headers=auth_headers, json={
+            "title": f"Tour {hour}", "description": "Meet, then walk",
+            "start_date": f"2025-06-0{hour + 1}T10:00:00", "end_date": f"2025-06-0{hour + 1}T12:00:00",
+        })
+
+    export = client.get("/events/export.ics", headers=auth_headers)
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("text/calendar")
+    assert export.text.startswith("BEGIN:VCALENDAR\r\n") and export.text.endswith("END:VCALENDAR\r\n")
+    assert export.text.count("BEGIN:VEVENT") == 3
+    assert "DESCRIPTION:Meet\\, then walk" in export.text
+
+    # Polling with the validators is answered without a body
+    last_modified = export.headers["Last-Modified"]
+    assert client.get("/events/export.ics", headers={**auth_headers, "If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/events/export.ics", headers={**auth_headers, "If-None-Match": export.headers["ETag"]}).status_code == 304
+
+    result = client.post("/events/import.ics", headers=auth_headers, content=export.content)
+    assert result.json() == {"imported": 3, "errors": []}
+    events = client.get("/events/", headers=auth_headers).json()
+    assert [e["title"] for e in events] == ["Tour 0", "Tour 0", "Tour 1", "Tour 1", "Tour 2", "Tour 2"]
+    assert client.get("/events/export.ics", headers={**auth_headers, "If-None-Match": export.headers["ETag"]}).status_code == 200
+
+
+def test_import_skips_invalid_events(auth_headers):
+    body = (
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:All day\r\nDTSTART;VALUE=DATE:20250701\r\nDURATION:P1D\r\n"
+        "BEGIN:VALARM\r\nDESCRIPTION:Reminder\r\nEND:VALARM\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:No start\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nDTSTART:20250702T090000\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    result = client.post("/events/import.ics", headers=auth_headers, content=body).json()
+    assert result["imported"] == 1
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+
+    [event] = client.get("/events/", headers=auth_headers).json()
+    assert event["start_date"] == "2025-07-01T00:00:00"
+    assert event["end_date"] == "2025-07-02T00:00:00"
+    assert event["description"] is None
+
+    assert client.post("/events/import.ics", headers=auth_headers, content="BEGIN:VEVENT\r\nnonsense\r\n").status_code == 400
+    assert client.post("/events/import.ics", headers=auth_headers, params={"trip_id": 987654}, content=body).status_code == 404
+
+
+def test_itinerary_export():
+    trip_id = client.post("/users/1/trips", json={
+        "title": "Lisbon", "start_date": "2025-08-01T00:00:00", "end_date": "2025-08-03T00:00:00",
+    }).json()["id"]
+    client.post(f"/trips/{trip_id}/itinerary/batch", json={"create": [
+        {"name": "Tram 28", "time": "2025-08-01T09:00:00", "location": "Martim Moniz"},
+        {"name": "Pastéis", "time": "2025-08-01T08:00:00"},
+    ]})
+
+    export = client.get(f"/trips/{trip_id}/itinerary.ics")
+    assert "X-WR-CALNAME:Lisbon" in export.text
+    [first, second] = asyncio.run(collect(chunked(export.content, 50)))
+    assert ical.unescape_text(first["SUMMARY"][1]) == "Pastéis"
+    assert second["LOCATION"][1] == "Martim Moniz"
+    assert second["DTSTART"][1] == "20250801T090000"
+    assert client.get("/trips/987654/itinerary.ics").status_code == 404
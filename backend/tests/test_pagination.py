@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def trip_id():
+    response = client.post("/users/1/trips", json={
+        "title": "Paged trip",
+        "start_date": "2025-06-01T00:00:00",
+        "end_date": "2025-06-10T00:00:00",
+    })
+    return response.json()["id"]
+
+
+def collect(url, **params):
+    items, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=query)
+        assert response.status_code == 200, response.text
+        items.extend(response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return items, pages
+
+
+def test_itinerary_pages_follow_time_order(trip_id):
+    start = datetime(2025, 6, 1, 9)
+    # Inserted out of order, with a tie on time to exercise the id tiebreak
+    for offset in [5, 1, 3, 3, 0, 4, 2]:
+        client.post(f"/trips/{trip_id}/itinerary", json={
+            "name": f"Stop {offset}",
+            "time": (start + timedelta(hours=offset)).isoformat(),
+        })
+
+    items, pages = collect(f"/trips/{trip_id}/itinerary", limit=2)
+    assert pages == 4
+    assert [item["name"] for item in items] == [
+        "Stop 0", "Stop 1", "Stop 2", "Stop 3", "Stop 3", "Stop 4", "Stop 5"
+    ]
+    assert len({item["id"] for item in items}) == 7
+
+    window, _ = collect(
+        f"/trips/{trip_id}/itinerary",
+        **{"from": (start + timedelta(hours=2)).isoformat(), "to": (start + timedelta(hours=4)).isoformat()},
+    )
+    assert [item["name"] for item in window] == ["Stop 2", "Stop 3", "Stop 3"]
+
+
+def test_destinations_with_null_order_are_paged(trip_id):
+    for name, order in [("B", "2"), ("None1", None), ("A", "1"), ("None2", None)]:
+        client.post(f"/trips/{trip_id}/destinations", json={"name": name, "location": "X", "order": order})
+
+    items, _ = collect(f"/trips/{trip_id}/destinations", limit=1)
+    assert [item["name"] for item in items] == ["None1", "None2", "A", "B"]
+
+
+def test_budget_category_filter(trip_id):
+    for category, amount in [("Food", 10), ("Travel", 200), ("Food", 15)]:
+        client.post(f"/trips/{trip_id}/budget", json={"amount": amount, "currency": "USD", "category": category})
+
+    items, _ = collect(f"/trips/{trip_id}/budget", category="Food", limit=1)
+    assert [item["amount"] for item in items] == [10, 15]
+
+
+def test_invalid_cursor_is_rejected(trip_id):
+    response = client.get(f"/trips/{trip_id}/itinerary", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_limit_is_bounded():
+    response = client.get("/users/1/trips", params={"limit": 100000})
+    assert response.status_code == 422
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def capture_statements(db_engine, call):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()).upper())
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = call()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_patch_trip_is_one_conditional_update(user, db_engine):
+    trip = client.post(f"/users/{user.id}/trips", json={
+        "title": "Coast", "description": "By train",
+        "start_date": "2025-11-01T00:00:00", "end_date": "2025-11-04T00:00:00",
+    }).json()
+    assert trip["version"] == 1
+
+    response, statements = capture_statements(
+        db_engine, lambda: client.patch(f"/trips/{trip['id']}", json={"version": 1, "title": "Coast road"}),
+    )
+    assert response.status_code == 200
+    patched = response.json()
+    assert (patched["title"], patched["description"], patched["version"]) == ("Coast road", "By train", 2)
+    assert patched["updated_at"] > trip["updated_at"]
+    # Only the sharing check reads first; the UPDATE itself checks the version and returns the row
+    statements = [statement for statement in statements if "FROM COLLABORATIONS" not in statement]
+    assert statements[0].startswith("UPDATE TRIPS SET") and "RETURNING" in statements[0]
+    assert not any(statement.startswith("SELECT") and "FROM TRIPS" in statement for statement in statements)
+
+    stale = client.patch(f"/trips/{trip['id']}", json={"version": 1, "title": "Lost edit"})
+    assert stale.status_code == 409
+    assert stale.json()["detail"]["current"]["title"] == "Coast road"
+    assert stale.json()["detail"]["current"]["version"] == 2
+
+    assert client.patch(f"/trips/{trip['id']}", json={"version": 2, "start_date": None}).status_code == 422
+    assert client.patch(f"/trips/{trip['id']}", json={"title": "No version"}).status_code == 422
+    assert client.patch("/trips/999999", json={"version": 1, "title": "Nowhere"}).status_code == 404
+
+    # Full updates skip the check but still move the version on
+    replaced = client.put(f"/trips/{trip['id']}", json={**trip, "title": "Replaced"}).json()
+    assert (replaced["title"], replaced["version"]) == ("Replaced", 3)
+
+
+def test_patch_trip_rows(user):
+    trip_id = client.post(f"/users/{user.id}/trips", json={
+        "title": "Iberia", "start_date": "2025-10-01T00:00:00", "end_date": "2025-10-10T00:00:00",
+    }).json()["id"]
+
+    destination = client.post(f"/trips/{trip_id}/destinations", json={"name": "Old town", "location": "Madrid"}).json()
+    moved = client.patch(f"/destinations/{destination['id']}", json={"version": 1, "location": "Porto"}).json()
+    assert (moved["name"], moved["latitude"], moved["longitude"], moved["version"]) == ("Old town", 41.1579, -8.6291, 2)
+    assert client.patch(f"/destinations/{destination['id']}", json={"version": 1, "name": "X"}).status_code == 409
+    assert client.patch(f"/destinations/{destination['id']}", json={"version": 2, "name": None}).status_code == 422
+    renamed = client.put(f"/destinations/{destination['id']}", json={"name": "Ribeira", "location": "Porto"}).json()
+    assert renamed["version"] == 3
+
+    item = client.post(f"/trips/{trip_id}/itinerary", json={"name": "Tram", "time": "2025-10-02T09:00:00"}).json()
+    later = client.patch(f"/itinerary/{item['id']}", json={"version": 1, "time": "2025-10-02T11:00:00"}).json()
+    assert (later["name"], later["time"], later["version"]) == ("Tram", "2025-10-02T11:00:00", 2)
+    assert client.patch("/itinerary/999999", json={"version": 1, "name": "X"}).status_code == 404
+
+    budget = client.post(f"/trips/{trip_id}/budget", json={"amount": 20, "currency": "EUR", "category": "Food"}).json()
+    assert client.patch(f"/budget/{budget['id']}", json={"version": 1, "amount": 25}).json()["amount"] == 25
+    conflict = client.patch(f"/budget/{budget['id']}", json={"version": 1, "amount": 30})
+    assert conflict.status_code == 409 and conflict.json()["detail"]["current"]["amount"] == 25
+    batch = client.post(f"/trips/{trip_id}/budget/batch", json={"update": [{"id": budget["id"], "amount": 40}]}).json()
+    assert batch["updated"][0]["version"] == 3
+
+    client.post(f"/trips/{trip_id}/dates", json={"start_date": "2025-10-01", "end_date": "2025-10-10"})
+    dates = client.patch(f"/trips/{trip_id}/dates", json={"version": 1, "end_date": "2025-10-12"}).json()
+    assert (dates["start_date"], dates["end_date"], dates["version"]) == ("2025-10-01", "2025-10-12", 2)
+
+    # A copy starts its own history
+    clone_id = client.post(f"/trips/{trip_id}/clone", json={}).json()["id"]
+    full = client.get(f"/trips/{clone_id}/full").json()
+    assert {row["version"] for kind in ("destinations", "itineraries", "budgets", "dates") for row in full[kind]} == {1}
@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.main import app
+from app.models.itinerary import Itinerary
+from app.schemas.itinerary import ItineraryRead
+
+client = TestClient(app)
+
+
+def test_row_fast_path_matches_schema_serialization(db_session):
+    trip_id = client.post("/users/1/trips", json={
+        "title": "Fast", "start_date": "2025-10-01T00:00:00", "end_date": "2025-10-02T00:00:00",
+    }).json()["id"]
+    client.post(f"/trips/{trip_id}/itinerary/batch", json={"create": [
+        {"name": f"Stop {i}", "time": f"2025-10-01T{i:02d}:30:00.250000", "location": "Here" if i % 2 else None}
+        for i in range(5)
+    ]})
+
+    response = client.get(f"/trips/{trip_id}/itinerary", params={"limit": 3})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers and "ETag" in response.headers
+
+    async def load():
+        async with db_session() as db:
+            rows = await db.scalars(
+                select(Itinerary).filter(Itinerary.trip_id == trip_id).order_by(Itinerary.time).limit(3)
+            )
+            return [ItineraryRead.model_validate(row).model_dump(mode="json") for row in rows]
+
+    assert response.json() == asyncio.run(load())
+
+    rest = client.get(
+        f"/trips/{trip_id}/itinerary", params={"cursor": response.headers["X-Next-Cursor"]}
+    ).json()
+    assert [item["name"] for item in rest] == ["Stop 3", "Stop 4"]
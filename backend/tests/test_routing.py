@@ -0,0 +1,118 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.geocoding import haversine_km
+from app.core.routing import distance_matrix, nearest_neighbour, path_length, solve_path
+from app.main import app
+
+client = TestClient(app)
+
+# West to east along the Iberian coast, posted out of order below
+STOPS = {
+    "Lisbon": (38.7223, -9.1393),
+    "Seville": (37.3891, -5.9845),
+    "Malaga": (36.7213, -4.4214),
+    "Valencia": (39.4699, -0.3763),
+    "Barcelona": (41.3874, 2.1686),
+}
+
+
+@pytest.fixture
+def trip_id():
+    response = client.post("/users/1/trips", json={
+        "title": "Coastal run",
+        "start_date": "2025-07-01T00:00:00",
+        "end_date": "2025-07-10T00:00:00",
+    })
+    return response.json()["id"]
+
+
+def random_points(count, seed=7):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(35, 45, count), rng.uniform(-10, 10, count)
+
+
+def test_distance_matrix_matches_haversine():
+    latitudes, longitudes = random_points(6)
+    matrix = distance_matrix(latitudes, longitudes)
+    assert matrix[1, 4] == pytest.approx(haversine_km(latitudes[1], longitudes[1], latitudes[4], longitudes[4]))
+    assert np.allclose(matrix, matrix.T) and not matrix.diagonal().any()
+
+
+@pytest.mark.parametrize("start, end", [(None, None), (0, None), (None, 5), (2, 6)])
+def test_small_routes_are_near_optimal(start, end):
+    for seed in range(5):
+        matrix = distance_matrix(*random_points(8, seed=seed))
+        path = solve_path(matrix, start, end)
+        assert sorted(path) == list(range(8))
+        assert start is None or path[0] == start
+        assert end is None or path[-1] == end
+        candidates = (
+            order for order in itertools.permutations(range(8))
+            if (start is None or order[0] == start) and (end is None or order[-1] == end)
+        )
+        # A local search, so allow a little over the brute-force optimum
+        assert path_length(matrix, path) <= 1.1 * min(path_length(matrix, order) for order in candidates)
+
+
+def test_hundreds_of_stops_improve_on_greedy():
+    matrix = distance_matrix(*random_points(600))
+    greedy = nearest_neighbour(matrix, 0, 599)
+    path = solve_path(matrix, start=0, end=599, time_limit=1.0)
+    assert sorted(path) == list(range(600)) and (path[0], path[-1]) == (0, 599)
+    assert path_length(matrix, path) < path_length(matrix, greedy)
+    # With no time to search, the starting path comes back as it was
+    assert solve_path(matrix, start=0, end=599, time_limit=0) == greedy
+
+
+@pytest.mark.benchmark
+def test_hundreds_of_stops_within_a_second():
+    matrix = distance_matrix(*random_points(600))
+    started = time.perf_counter()
+    solve_path(matrix, start=0, end=599, time_limit=1.0)
+    elapsed = time.perf_counter() - started
+    print(f"\n600 stops: {elapsed:.3f} s with a 1 s limit")
+    assert elapsed < 1.5
+
+
+def test_optimize_trip_destinations(trip_id, monkeypatch):
+    ids = {}
+    for name in ("Valencia", "Lisbon", "Barcelona", "Seville", "Malaga"):
+        latitude, longitude = STOPS[name]
+        ids[name] = client.post(f"/trips/{trip_id}/destinations", json={
+            "name": name, "location": name, "latitude": latitude, "longitude": longitude,
+        }).json()["id"]
+    ids["Nowhere"] = client.post(
+        f"/trips/{trip_id}/destinations", json={"name": "Nowhere", "location": "Atlantis", "order": "0"},
+    ).json()["id"]
+
+    response = client.post(f"/trips/{trip_id}/destinations/optimize")
+    assert response.status_code == 200
+    route = response.json()
+    names = [row["name"] for row in route["destinations"]]
+    assert names[:5] in (list(STOPS), list(reversed(STOPS)))
+    assert names[5] == "Nowhere" and route["unrouted"] == [ids["Nowhere"]]
+    assert route["distance_km"] < route["previous_distance_km"]
+
+    listed = client.get(f"/trips/{trip_id}/destinations").json()
+    assert [row["name"] for row in listed] == names
+    assert [row["order"] for row in listed] == ["1", "2", "3", "4", "5", "6"]
+
+    pinned = client.post(f"/trips/{trip_id}/destinations/optimize", json={
+        "start_id": ids["Seville"], "end_id": ids["Lisbon"],
+    }).json()
+    names = [row["name"] for row in pinned["destinations"]]
+    assert (names[0], names[4], names[5]) == ("Seville", "Lisbon", "Nowhere")
+
+    for body in ({"start_id": ids["Nowhere"]}, {"start_id": ids["Lisbon"], "end_id": ids["Lisbon"]}):
+        assert client.post(f"/trips/{trip_id}/destinations/optimize", json=body).status_code == 400
+    assert client.post("/trips/999999/destinations/optimize").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "ROUTE_MAX_STOPS", 4)
+    too_many = client.post(f"/trips/{trip_id}/destinations/optimize")
+    assert too_many.status_code == 422 and "4 destinations" in too_many.json()["detail"]
@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.routing import distance_matrix
+from app.core.scheduling import DAY, Planner, Task, free_gaps
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_free_gaps_skip_busy_time():
+    busy = [(8 * 60, 10 * 60), (12 * 60, 13 * 60), (DAY + 17 * 60, DAY + 30 * 60)]
+    assert free_gaps(2, 9 * 60, 18 * 60, busy) == [
+        (10 * 60, 12 * 60), (13 * 60, 18 * 60), (DAY + 9 * 60, DAY + 17 * 60),
+    ]
+
+
+def test_local_search_cuts_travel():
+    # Stops on a line at 0, 3, 1, 2; the greedy pass keeps that order
+    positions = [0, 3, 1, 2]
+    travel = [[abs(a - b) * 20 for b in positions] for a in positions]
+    tasks = [Task(id=index, index=index, duration=30, rank=index) for index in range(4)]
+    planner = Planner(tasks, travel, free_gaps(1, 9 * 60, 18 * 60, []), 9 * 60, 18 * 60)
+    starts = planner.solve()
+    assert [task.id for task in planner.days[0]] in ([0, 2, 3, 1], [1, 3, 2, 0])
+    assert planner.travel_time(planner.days[0]) == 60
+    assert sorted(starts.values()) == [540, 590, 640, 690]
+
+
+def test_a_day_that_does_not_fit_is_reported_unplaced():
+    tasks = [Task(id=index, index=index, duration=5 * 60, rank=index) for index in range(3)]
+    planner = Planner(tasks, [[0] * 3] * 3, free_gaps(1, 9 * 60, 18 * 60, []), 9 * 60, 18 * 60)
+    # Stand in for a pass that overfills the day: 15 hours of items in 9
+    planner.greedy = lambda: planner.days.update({0: list(tasks)})
+    assert planner.solve() == {}
+    assert planner.days[0] == [] and sorted(task.id for task in planner.unplaced) == [0, 1, 2]
+
+
+def hundreds_of_items(count=300, days=30):
+    rng = np.random.default_rng(11)
+    travel = np.ceil(distance_matrix(rng.uniform(38.6, 38.8, count), rng.uniform(-9.3, -9.0, count)) * 2)
+    tasks = []
+    for index in range(count):
+        opens = int(rng.choice([0, 10 * 60, 14 * 60]))
+        tasks.append(Task(
+            id=index, index=index, duration=int(rng.integers(1, 5)) * 15,
+            opens=opens or None, closes=opens + 6 * 60 if opens else None,
+            priority=int(rng.integers(0, 3)), rank=index,
+        ))
+    busy = [(day * DAY + 12 * 60, day * DAY + 13 * 60) for day in range(days)]
+    return tasks, travel.astype(int).tolist(), busy, free_gaps(days, 9 * 60, 21 * 60, busy)
+
+
+def test_hundreds_of_items_are_packed():
+    tasks, travel, busy, gaps = hundreds_of_items()
+    planner = Planner(tasks, travel, gaps, 9 * 60, 21 * 60, step=5)
+    starts = planner.solve(time_limit=0.1)
+    assert len(starts) + len(planner.unplaced) == len(tasks) and len(starts) > 250
+
+    by_id = {task.id: task for task in tasks}
+    for day, order in planner.days.items():
+        spans = [(starts[task.id], starts[task.id] + task.duration, task) for task in order]
+        for (_, end, before), (start, _, after) in zip(spans, spans[1:]):
+            assert start >= end + planner.travel[before.index][after.index]
+        for start, end, task in spans:
+            low, high = planner._window(by_id[task.id], day)
+            assert low <= start and end <= high and start % 5 == 0
+            assert not any(start < busy_end and busy_start < end for busy_start, busy_end in busy)
+
+    # With no time to search, the greedy plan comes back as it was
+    greedy = Planner(tasks, travel, gaps, 9 * 60, 21 * 60, step=5)
+    greedy.greedy()
+    rushed = Planner(tasks, travel, gaps, 9 * 60, 21 * 60, step=5)
+    rushed.solve(time_limit=0)
+    assert rushed.days == greedy.days and rushed.unplaced == greedy.unplaced
+    assert len(planner.unplaced) <= len(greedy.unplaced)
+
+
+@pytest.mark.benchmark
+def test_hundreds_of_items_stay_interactive():
+    tasks, travel, _, gaps = hundreds_of_items()
+    started = time.perf_counter()
+    Planner(tasks, travel, gaps, 9 * 60, 21 * 60, step=5).solve(time_limit=0.1)
+    elapsed = time.perf_counter() - started
+    print(f"\n300 items over 30 days: {elapsed * 1000:.0f} ms with a 100 ms limit")
+    assert elapsed < 0.2
+
+
+def test_schedule_trip_itinerary(user, auth_headers, monkeypatch):
+    trip_id = client.post(f"/users/{user.id}/trips", json={
+        "title": "Planned", "start_date": "2025-08-01T00:00:00", "end_date": "2025-08-02T00:00:00",
+    }).json()["id"]
+    client.post(f"/trips/{trip_id}/dates", json={"start_date": "2025-08-01", "end_date": "2025-08-01"})
+    assert client.post("/events/", headers=auth_headers, json={
+        "title": "Call", "start_date": "2025-08-01T09:00:00", "end_date": "2025-08-01T12:00:00",
+    }).status_code == 200
+
+    ids = {}
+    for name, when in [("Museum", "07-01T10:00"), ("Breakfast", "07-01T11:00"),
+                       ("Lunch", "08-01T12:00"), ("Marathon", "07-01T12:00")]:
+        ids[name] = client.post(f"/trips/{trip_id}/itinerary", json={
+            "name": name, "time": f"2025-{when}:00",
+        }).json()["id"]
+
+    response = client.post(f"/trips/{trip_id}/itinerary/schedule", json={"items": [
+        {"id": ids["Museum"], "duration_minutes": 120, "opens": "14:00", "closes": "18:00"},
+        {"id": ids["Breakfast"], "priority": 1},
+        {"id": ids["Lunch"], "fixed": True},
+        {"id": ids["Marathon"], "duration_minutes": 13 * 60},
+    ]})
+    assert response.status_code == 200
+    result = response.json()
+    times = {item["name"]: item["time"] for item in result["items"]}
+    # The call and the fixed lunch fill the morning; the museum waits for opening and travel
+    assert times == {
+        "Breakfast": "2025-08-01T13:00:00", "Museum": "2025-08-01T14:15:00",
+        "Lunch": "2025-08-01T12:00:00", "Marathon": "2025-07-01T12:00:00",
+    }
+    assert result["unscheduled"] == [ids["Marathon"]] and result["travel_minutes"] == 15
+
+    listed = client.get(f"/trips/{trip_id}/itinerary").json()
+    assert [item["name"] for item in listed] == ["Marathon", "Lunch", "Breakfast", "Museum"]
+
+    assert client.post(f"/trips/{trip_id}/itinerary/schedule", json={"items": [{"id": 999999}]}).status_code == 400
+    assert client.post(f"/trips/{trip_id}/itinerary/schedule", json={
+        "day_start": "18:00", "day_end": "09:00",
+    }).status_code == 400
+    assert client.post("/trips/999999/itinerary/schedule").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "SCHEDULE_MAX_ITEMS", 3)
+    too_many = client.post(f"/trips/{trip_id}/itinerary/schedule")
+    assert too_many.status_code == 422 and "3 itinerary items" in too_many.json()["detail"]
@@ -0,0 +1,83 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def create_trip(user_id, title, description=None):
+    return client.post(f"/users/{user_id}/trips", json={
+        "title": title, "description": description,
+        "start_date": "2025-09-01T00:00:00", "end_date": "2025-09-10T00:00:00",
+    }).json()
+
+
+def search(headers, q, **params):
+    response = client.get("/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200
+    return [(hit["kind"], hit["title"]) for hit in response.json()]
+
+
+def test_prefix_search_ranks_title_matches_first(user, auth_headers):
+    trip = create_trip(user.id, "Portugal loop", "Ending with a week in Lisbon")
+    client.post(f"/trips/{trip['id']}/destinations", json={
+        "name": "Lisbon", "location": "Portugal", "description": "Tiles, trams and the Gulbenkian museum",
+    })
+    client.post(f"/trips/{trip['id']}/itinerary", json={
+        "name": "Café A Brasileira", "time": "2025-09-02T09:00:00", "location": "Chiado, Lisbon",
+    })
+
+    assert search(auth_headers, "lis") == [
+        ("destination", "Lisbon"), ("itinerary", "Café A Brasileira"), ("trip", "Portugal loop"),
+    ]
+    assert search(auth_headers, "lisbon MUSE") == [("destination", "Lisbon")]
+    assert search(auth_headers, "cafe") == [("itinerary", "Café A Brasileira")]
+    assert search(auth_headers, "lis", kind="trip") == [("trip", "Portugal loop")]
+    assert search(auth_headers, "madrid") == []
+    # Query syntax is not interpreted, and punctuation alone matches nothing
+    assert search(auth_headers, 'lis" OR user_id : *') == []
+    assert search(auth_headers, "?!") == []
+
+
+def test_results_are_private_and_paginated(user, auth_headers, make_user, headers_for):
+    other = make_user()
+    other_headers = headers_for(other)
+    for day in range(3):
+        create_trip(user.id, f"Kyoto temples {day}")
+    create_trip(other.id, "Kyoto food tour")
+
+    assert len(search(other_headers, "kyoto")) == 1
+    first = client.get("/search", headers=auth_headers, params={"q": "kyoto", "limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/search", headers=auth_headers, params={"q": "kyoto", "limit": 2, "cursor": cursor})
+    titles = [hit["title"] for hit in first.json() + second.json()]
+    assert sorted(titles) == [f"Kyoto temples {day}" for day in range(3)]
+    assert "X-Next-Cursor" not in second.headers
+    assert client.get("/search", params={"q": "kyoto"}).status_code == 401
+
+
+def test_index_follows_writes(user, auth_headers):
+    trip = create_trip(user.id, "Andes trek")
+    destination = client.post(f"/trips/{trip['id']}/destinations", json={
+        "name": "Cusco", "location": "Peru",
+    }).json()
+    item = client.post(f"/trips/{trip['id']}/itinerary", json={
+        "name": "Rainbow mountain", "time": "2025-09-03T05:00:00",
+    }).json()
+
+    client.put(f"/destinations/{destination['id']}", json={"name": "Arequipa", "location": "Peru"})
+    assert search(auth_headers, "cusco") == []
+    assert search(auth_headers, "arequipa") == [("destination", "Arequipa")]
+    client.delete(f"/itinerary/{item['id']}")
+    assert search(auth_headers, "rainbow") == []
+
+    client.post(f"/trips/{trip['id']}/itinerary/batch", json={
+        "create": [{"name": "Colca canyon", "time": "2025-09-05T06:00:00"}],
+    })
+    assert search(auth_headers, "colca") == [("itinerary", "Colca canyon")]
+
+    clone = client.post(f"/trips/{trip['id']}/clone", json={"title": "Andes again"}).json()
+    assert search(auth_headers, "colca") == [("itinerary", "Colca canyon")] * 2
+    client.delete(f"/trips/{trip['id']}")
+    client.delete(f"/trips/{clone['id']}")
+    assert search(auth_headers, "peru") == []
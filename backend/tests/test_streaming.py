@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.compression import accepted_encodings, choose_encoding
+from app.core.config import get_settings
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(get_settings(), "STREAM_BATCH_SIZE", 3)
+
+
+def test_trips_stream_as_ndjson_and_json_array(user, small_batches):
+    for day in range(8, 0, -1):
+        client.post(f"/users/{user.id}/trips", json={
+            "title": f"Day {day}", "start_date": f"2025-03-0{day}T00:00:00", "end_date": f"2025-03-0{day}T12:00:00",
+        })
+
+    response = client.get(f"/users/{user.id}/trips/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["title"] for line in lines] == [f"Day {day}" for day in range(1, 9)]
+
+    array = client.get(f"/users/{user.id}/trips/stream", params={"format": "json"})
+    assert array.headers["content-type"] == "application/json"
+    assert array.json() == client.get(f"/users/{user.id}/trips").json()
+
+    empty = client.get(f"/users/{user.id}/trips/stream", params={"format": "json", "from": "2030-01-01T00:00:00"})
+    assert empty.json() == []
+
+
+def test_events_stream_for_current_user(auth_headers, small_batches):
+    for hour in range(5):
+        client.post("/events/", headers=auth_headers, json={
+            "title": f"Event {hour}", "start_date": f"2025-04-01T0{hour}:00:00", "end_date": f"2025-04-01T0{hour}:30:00",
+        })
+
+    response = client.get("/events/stream", headers=auth_headers)
+    assert response.status_code == 200
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == [f"Event {h}" for h in range(5)]
+    assert client.get("/events/stream").status_code == 401
+
+
+def test_large_responses_are_gzipped(user):
+    for i in range(30):
+        client.post(f"/users/{user.id}/trips", json={
+            "title": f"Trip {i}", "description": "x" * 40,
+            "start_date": "2025-05-01T00:00:00", "end_date": "2025-05-02T00:00:00",
+        })
+
+    large = client.get(f"/users/{user.id}/trips", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert len(large.json()) == 30
+
+    streamed = client.get(f"/users/{user.id}/trips/stream", headers={"Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert len(streamed.text.splitlines()) == 30
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_accept_encoding_q_values_are_honoured():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {"gzip": 1.0, "br": 0.0, "deflate": 0.5}
+    assert choose_encoding("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0.1, gzip;q=1", ("br", "gzip")) == "br"
+    assert choose_encoding("*;q=0.5, gzip;q=0", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip;q=0, identity", ("gzip",)) is None
+    assert choose_encoding("", ("br", "gzip")) is None
+
+
+def test_large_responses_prefer_brotli(user):
+    pytest.importorskip("brotli")
+    for i in range(30):
+        client.post(f"/users/{user.id}/trips", json={
+            "title": f"Trip {i}", "description": "x" * 40,
+            "start_date": "2025-05-01T00:00:00", "end_date": "2025-05-02T00:00:00",
+        })
+
+    url = f"/users/{user.id}/trips"
+    large = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert large.headers["content-encoding"] == "br" and large.headers["vary"] == "Accept-Encoding"
+    assert len(large.json()) == 30
+    streamed = client.get(f"{url}/stream", headers={"Accept-Encoding": "br"})
+    assert streamed.headers["content-encoding"] == "br" and len(streamed.text.splitlines()) == 30
+
+    assert client.get(url, headers={"Accept-Encoding": "gzip, br;q=0"}).headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in client.get(url, headers={"Accept-Encoding": "br;q=0, gzip;q=0"}).headers
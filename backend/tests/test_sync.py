@@ -0,0 +1,116 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def people(make_user, headers_for):
+    return [(user, headers_for(user)) for user in (make_user() for _ in range(3))]
+
+
+def new_trip(owner):
+    return client.post(f"/users/{owner[0].id}/trips", json={
+        "title": "Synced", "start_date": "2025-10-01T00:00:00", "end_date": "2025-10-03T00:00:00",
+    }).json()["id"]
+
+
+def sync(user, since=0, limit=None):
+    params = {"since": since} | ({"limit": limit} if limit else {})
+    response = client.get("/sync", headers=user[1], params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sync_sends_latest_state_since_cursor(people):
+    owner, _, stranger = people
+    trip_id = new_trip(owner)
+    destination = client.post(f"/trips/{trip_id}/destinations", json={"name": "Bay", "location": "Coast"}).json()
+    budget = client.post(f"/trips/{trip_id}/budget", json={"amount": 40, "currency": "EUR", "category": "Food"}).json()
+
+    first = sync(owner)
+    assert [row["id"] for row in first["upserts"]["trips"]] == [trip_id]
+    assert [row["name"] for row in first["upserts"]["destinations"]] == ["Bay"]
+    assert first["upserts"]["budget"][0]["amount"] == 40 and not first["has_more"]
+    assert sync(owner, first["cursor"]) == {
+        "cursor": first["cursor"], "has_more": False, "upserts": {}, "deletes": {},
+    }
+
+    # Three edits of one row leave a single entry holding the last state
+    for name in ("Bay 2", "Bay 3", "Bay 4"):
+        client.put(f"/destinations/{destination['id']}", json={"name": name, "location": "Coast"})
+    client.delete(f"/budget/{budget['id']}")
+    delta = sync(owner, first["cursor"])
+    assert [row["name"] for row in delta["upserts"]["destinations"]] == ["Bay 4"]
+    assert delta["deletes"] == {"budget": [budget["id"]]} and list(delta["upserts"]) == ["destinations"]
+
+    assert sync(stranger)["upserts"] == {}
+    assert client.get("/sync").status_code == 401
+
+
+def test_sync_pages_with_has_more(people):
+    owner = people[0]
+    trip_id = new_trip(owner)
+    for index in range(5):
+        client.post(f"/trips/{trip_id}/itinerary", json={"name": f"Stop {index}", "time": "2025-10-01T10:00:00"})
+
+    seen, cursor, batches = [], 0, 0
+    while True:
+        batch = sync(owner, cursor, limit=2)
+        seen += [row["name"] for row in batch["upserts"].get("itineraries", [])]
+        cursor, batches = batch["cursor"], batches + 1
+        if not batch["has_more"]:
+            break
+    assert seen == [f"Stop {index}" for index in range(5)] and batches == 3
+
+
+def test_sync_follows_sharing_and_trip_deletes(people):
+    owner, editor, _ = people
+    trip_id = new_trip(owner)
+    cursor = sync(editor)["cursor"]
+
+    client.post(f"/trips/{trip_id}/collaborators", headers=owner[1], json={"username": editor[0].username})
+    shared = sync(editor, cursor)
+    assert [row["id"] for row in shared["upserts"]["trips"]] == [trip_id]
+    cursor = shared["cursor"]
+
+    client.delete(f"/trips/{trip_id}/collaborators/{editor[0].id}", headers=owner[1])
+    removed = sync(editor, cursor)
+    assert removed["deletes"] == {"trips": [trip_id]} and removed["upserts"] == {}
+
+    # The owner hears about the delete; the trip's other entries are gone
+    cursor = sync(owner)["cursor"]
+    client.post(f"/trips/{trip_id}/collaborators", headers=owner[1], json={"username": editor[0].username})
+    client.delete(f"/trips/{trip_id}", headers=owner[1])
+    for user in (owner, editor):
+        assert sync(user, cursor)["deletes"] == {"trips": [trip_id]}
+    assert trip_id not in [row["id"] for row in sync(owner)["upserts"].get("trips", [])]
+
+
+def test_sync_carries_trip_calendar_events(people):
+    owner, editor, _ = people
+    trip_id = new_trip(owner)
+    client.post(f"/trips/{trip_id}/collaborators", headers=owner[1], json={"username": editor[0].username})
+    cursor = sync(editor)["cursor"]
+
+    event = client.post("/events/", headers=owner[1], json={
+        "title": "Ferry", "start_date": "2025-10-01T08:00:00", "end_date": "2025-10-01T09:00:00", "trip_id": trip_id,
+    }).json()
+    # Events outside any trip belong to no synced trip
+    client.post("/events/", headers=owner[1], json={
+        "title": "Dentist", "start_date": "2025-10-05T08:00:00", "end_date": "2025-10-05T09:00:00",
+    })
+    body = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:tour@example.com\r\nSUMMARY:Tour\r\n"
+        "DTSTART:20251002T100000Z\r\nDTEND:20251002T120000Z\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    client.post("/events/import.ics", headers=editor[1], params={"trip_id": trip_id}, content=body)
+
+    added = sync(editor, cursor)
+    assert [row["title"] for row in added["upserts"]["calendar_events"]] == ["Ferry", "Tour"]
+    assert list(added["upserts"]) == ["calendar_events"]
+
+    client.delete(f"/events/{event['id']}", headers=owner[1])
+    assert sync(editor, added["cursor"])["deletes"] == {"calendar_events": [event["id"]]}
@@ -1,43 +1,29 @@
+import asyncio
+import uuid
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 
 from fastapi.testclient import TestClient
 from app.main import app
-from app.core.database import Base
-from app.dependencies import get_db
 from app.models.user import User
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base.metadata.create_all(bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
-
 @pytest.fixture
 def client():
     with TestClient(app) as c:
         yield c
 
 @pytest.fixture
-def test_user():
-    db = TestingSessionLocal()
-    user = User(email="test@example.com", hashed_password="hashedpassword")
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    db.close()
-    return user
+def test_user(db_session):
+    async def create():
+        async with db_session() as db:
+            name = f"user_{uuid.uuid4().hex[:8]}"
+            user = User(username=name, email=f"{name}@example.com", password_hash="hashedpassword")
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
+            return user
+
+    return asyncio.run(create())
 
 def test_create_trip(client, test_user):
     trip_data = {
@@ -102,3 +88,166 @@ def test_delete_trip(client, test_user):
     response = client.delete(f"/trips/{trip_id}")
     assert response.status_code == 200
     assert "deleted successfully" in response.json()["message"]
+
+
+def count_selects(db_engine, call):
+    from sqlalchemy import event
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = call()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    return response, len(statements)
+
+
+def make_trip_graph(client, user_id, size):
+    trip_data = {
+        "title": "Full trip",
+        "description": "Everything",
+        "start_date": datetime(2025, 6, 1).isoformat(),
+        "end_date": datetime(2025, 6, 9).isoformat(),
+    }
+    trip_id = client.post(f"/users/{user_id}/trips", json=trip_data).json()["id"]
+    for i in range(size):
+        client.post(f"/trips/{trip_id}/destinations", json={"name": f"D{i}", "location": "L", "order": str(i)})
+        client.post(f"/trips/{trip_id}/itinerary", json={"name": f"I{i}", "time": datetime(2025, 6, 1, i).isoformat()})
+        client.post(f"/trips/{trip_id}/budget", json={"amount": i, "currency": "USD", "category": "Food"})
+    client.post(f"/trips/{trip_id}/dates", json={"start_date": "2025-06-01", "end_date": "2025-06-09"})
+    return trip_id
+
+
+def test_get_trip_full_loads_graph_in_fixed_queries(client, test_user, db_engine):
+    small = make_trip_graph(client, test_user.id, 1)
+    large = make_trip_graph(client, test_user.id, 6)
+
+    _, small_queries = count_selects(db_engine, lambda: client.get(f"/trips/{small}/full"))
+    response, large_queries = count_selects(db_engine, lambda: client.get(f"/trips/{large}/full"))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["name"] for d in data["destinations"]] == [f"D{i}" for i in range(6)]
+    assert [i["name"] for i in data["itineraries"]] == [f"I{i}" for i in range(6)]
+    assert len(data["budgets"]) == 6
+    assert data["dates"][0]["start_date"] == "2025-06-01"
+    # Without a role on the trip, other people's events and accounts stay out
+    assert data["calendar_events"] == data["collaborators"] == []
+    # The sharing check, the trip and one query per public relationship, regardless of size
+    assert large_queries == small_queries == 6
+
+
+def test_trip_full_shows_people_only_to_the_trip(client, test_user, make_user, headers_for):
+    trip_id = make_trip_graph(client, test_user.id, 1)
+    friend, outsider = make_user(), make_user()
+    client.post(f"/trips/{trip_id}/collaborators", headers=headers_for(test_user), json={"username": friend.username})
+
+    for viewer in (test_user, friend):
+        data = client.get(f"/trips/{trip_id}/full", headers=headers_for(viewer)).json()
+        assert data["collaborators"] == [{"id": friend.id, "username": friend.username}]
+    assert client.get(f"/trips/{trip_id}/full", headers=headers_for(outsider)).status_code == 404
+    assert client.get(f"/trips/{trip_id}/full").status_code == 401
+
+    url, params = f"/users/{test_user.id}/trips", {"expand": "collaborators"}
+    expanded = client.get(url, params=params, headers=headers_for(test_user)).json()
+    assert expanded[0]["collaborators"] == [{"id": friend.id, "username": friend.username}]
+    assert client.get(url, params=params, headers=headers_for(friend)).status_code == 403
+    assert client.get(url, params={"expand": "calendar_events"}).status_code == 401
+
+
+def test_get_trip_full_missing(client):
+    assert client.get("/trips/987654/full").status_code == 404
+
+
+def test_get_user_trips_expand(client, test_user):
+    make_trip_graph(client, test_user.id, 2)
+
+    plain = client.get(f"/users/{test_user.id}/trips").json()
+    assert "destinations" not in plain[0]
+
+    expanded = client.get(f"/users/{test_user.id}/trips", params={"expand": "destinations,budgets"}).json()
+    assert len(expanded[0]["destinations"]) == 2
+    assert len(expanded[0]["budgets"]) == 2
+    assert "itineraries" not in expanded[0]
+
+    assert client.get(f"/users/{test_user.id}/trips", params={"expand": "secrets"}).status_code == 400
+
+
+def count_writes(db_engine, call):
+    from sqlalchemy import event
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = call()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_clone_trip_copies_graph_with_set_based_inserts(client, test_user, db_engine):
+    source = make_trip_graph(client, test_user.id, 5)
+
+    response, inserts = count_writes(db_engine, lambda: client.post(f"/trips/{source}/clone", json={}))
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone["id"] != source
+    assert clone["title"] == "Full trip"
+    assert clone["user_id"] == test_user.id
+    # The trip plus one INSERT ... SELECT per copied table, per kind of
+    # search document and for the change log, whatever the trip size
+    assert len(inserts) == 5 + 3 + 1
+    assert all("SELECT" in statement.upper() for statement in inserts)
+
+    original = client.get(f"/trips/{source}/full").json()
+    copied = client.get(f"/trips/{clone['id']}/full").json()
+    for key in ("destinations", "itineraries", "budgets", "dates"):
+        assert len(copied[key]) == len(original[key])
+        assert {row["id"] for row in copied[key]}.isdisjoint(row["id"] for row in original[key])
+    assert [i["time"] for i in copied["itineraries"]] == [i["time"] for i in original["itineraries"]]
+
+
+def test_clone_trip_shifts_dates(client, test_user):
+    source = make_trip_graph(client, test_user.id, 2)
+
+    response = client.post(f"/trips/{source}/clone", json={
+        "title": "Next year", "start_date": datetime(2026, 6, 11, 12).isoformat(),
+    })
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone["title"] == "Next year"
+    assert clone["start_date"] == "2026-06-11T12:00:00"
+    assert clone["end_date"] == "2026-06-19T12:00:00"
+
+    copied = client.get(f"/trips/{clone['id']}/full").json()
+    assert [i["time"] for i in copied["itineraries"]] == ["2026-06-11T12:00:00", "2026-06-11T13:00:00"]
+    assert copied["dates"][0]["start_date"] == "2026-06-11"
+    assert copied["dates"][0]["end_date"] == "2026-06-19"
+
+    assert client.post("/trips/987654/clone", json={}).status_code == 404
+
+
+def test_templates_are_listed_separately_and_instantiated_by_cloning(client, test_user):
+    source = make_trip_graph(client, test_user.id, 1)
+    template = client.post(f"/trips/{source}/clone", json={"title": "Weekend", "as_template": True}).json()
+    assert template["is_template"] is True
+
+    trips = client.get(f"/users/{test_user.id}/trips").json()
+    assert template["id"] not in [t["id"] for t in trips]
+    templates = client.get(f"/users/{test_user.id}/templates").json()
+    assert [t["id"] for t in templates] == [template["id"]]
+
+    instance = client.post(f"/trips/{template['id']}/clone", json={"start_date": "2025-09-05T00:00:00"}).json()
+    assert instance["is_template"] is False
+    assert instance["title"] == "Weekend"
+    assert len(client.get(f"/trips/{instance['id']}/full").json()["destinations"]) == 1
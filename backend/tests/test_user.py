@@ -1,6 +1,11 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 from app.main import app
+from app.core.security import hash_password_async, verify_and_update_password
+from app.models.user import User
+from app.services.user import authenticate_user
 
 
 def get_auth_token():
@@ -11,3 +16,69 @@ def get_auth_token():
         "/auth/login",
          data={"username": "testuser", "password": "testpassword"},
     )
+
+
+def test_register_user_hashes_password():
+    client = TestClient(app)
+    response = client.post(
+        "/auth/register",
+        json={"username": "hasher", "email": "hasher@example.com", "password": "supersecret"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["username"] == "hasher"
+
+
+def test_hash_and_verify_run_in_pool():
+    async def roundtrip():
+        hashed = await hash_password_async("testpassword")
+        return hashed, await verify_and_update_password("testpassword", hashed)
+
+    hashed, (valid, new_hash) = asyncio.run(roundtrip())
+    assert hashed.startswith("$2b$05$")
+    assert valid is True
+    assert new_hash is None
+
+
+def test_login_rehashes_outdated_hash(db_session):
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword")
+
+    async def login():
+        async with db_session() as db:
+            db.add(User(username="rehash_me", email="rehash@example.com", password_hash=weak_hash))
+            await db.commit()
+            user = await authenticate_user(db, "rehash_me", "testpassword")
+            wrong = await authenticate_user(db, "rehash_me", "nope")
+            return user, wrong
+
+    user, wrong = asyncio.run(login())
+    assert user.password_hash != weak_hash
+    assert user.password_hash.startswith("$2b$05$")
+    assert wrong is False
+
+
+def test_principal_cache_skips_lookup_until_invalidated(db_session):
+    from app.services.user import get_principal, principal_cache
+
+    async def scenario():
+        async with db_session() as db:
+            user = User(username="cached", email="cached@example.com", password_hash="x")
+            db.add(user)
+            await db.commit()
+
+            first = await get_principal(db, "cached")
+            hits = principal_cache.hits
+            second = await get_principal(db, "cached")
+            assert principal_cache.hits == hits + 1
+            assert second is first
+
+            # Changing the password must evict the cached principal
+            user.password_hash = "y"
+            await db.commit()
+            assert principal_cache.get("cached") is None
+
+            await get_principal(db, "cached")
+            user.is_active = False
+            await db.commit()
+            return await get_principal(db, "cached")
+
+    assert asyncio.run(scenario()) is None